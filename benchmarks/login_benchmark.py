@@ -0,0 +1,43 @@
+"""
+Measures login throughput for each password hasher and work factor, with and without
+the verified-login cache.
+
+Run from the repository root:
+    python -m benchmarks.login_benchmark
+"""
+import time
+from clinic.password_hasher import PBKDF2Hasher, ScryptHasher, SHA256Hasher, VerificationCache, verify_password
+
+HASHERS = (
+    SHA256Hasher(),
+    PBKDF2Hasher(100000),
+    PBKDF2Hasher(300000),
+    PBKDF2Hasher(600000),
+    ScryptHasher(2 ** 14),
+    ScryptHasher(2 ** 15),
+)
+DURATION = 1.0  # Seconds spent measuring each configuration
+
+def logins_per_second(login) -> float:
+    """
+    Calls a login function repeatedly for about DURATION seconds.
+    """
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        login()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+def main():
+    print(f"{'hasher':<24}{'verify (ms)':>12}{'logins/s':>12}{'cached/s':>12}")
+    for hasher in HASHERS:
+        encoded = hasher.hash("123456")
+        uncached = logins_per_second(lambda: verify_password("123456", encoded))
+        cache = VerificationCache()
+        cache.remember("user", "123456", encoded)
+        cached = logins_per_second(lambda: cache.check("user", "123456", encoded))
+        name = encoded.rsplit('$', 2)[0] if '$' in encoded else hasher.algorithm
+        print(f"{name:<24}{1000 / uncached:>12.2f}{uncached:>12.0f}{cached:>12.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Measures the time to navigate from the main menu to another screen and back, when
+every screen is rebuilt as before and when built screens are kept and shown again.
+
+Runs without a display on the offscreen Qt platform. Run from the repository root:
+    python -m benchmarks.navigation_benchmark
+"""
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from clinic.controller import Controller
+from clinic.gui.clinic_gui import ClinicGUI
+from clinic.gui.main_menu_gui import MainMenuGUI
+from clinic.gui.add_patient_gui import AddPatientGUI
+from clinic.gui.appointment_main_menu_gui import AppointMainMenuGUI
+from clinic.gui.open_list_all_patients_gui import ListAllPatientsGUI
+
+PATIENTS = 1000
+ROUNDS = 50  # Round trips measured for each screen
+
+def navigation_ms(app, navigate) -> float:
+    """
+    Navigates to a screen and back ROUNDS times, waiting for each screen to be laid out.
+
+    Return Type:
+    - float: The average milliseconds of one navigation.
+    """
+    navigate()
+    app.processEvents()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        navigate()
+        app.processEvents()
+    return (time.perf_counter() - start) * 1000 / (2 * ROUNDS)
+
+def main():
+    app = QApplication([])
+    with open("clinic/gui/style.qss", "r") as file:
+        app.setStyleSheet(file.read())
+
+    # An in-memory store, so the benchmark leaves the clinic's data untouched
+    controller = Controller(autosave=False)
+    controller.login("user", "123456")
+    for i in range(PATIENTS):
+        controller.create_patient(9790010000 + i, f"Patient {i}", "2000-10-10", "2502031010", f"patient{i}@gmail.com", "300 Moss St, Victoria")
+    controller.set_current_patient(9790010000)
+    window = ClinicGUI(controller)
+    window.controller.logged_in = True
+    window.open_main_menu()
+    window.show()
+
+    print(f"{'screen':<24}{'rebuilt (ms)':>14}{'kept (ms)':>12}")
+    for screen_class in (AddPatientGUI, AppointMainMenuGUI, ListAllPatientsGUI):
+        def rebuild():
+            window.show_screen(screen_class(controller, window))
+            window.show_screen(MainMenuGUI(controller, window))
+
+        def reuse():
+            window.show_cached(screen_class)
+            window.show_cached(MainMenuGUI)
+
+        rebuilt, kept = navigation_ms(app, rebuild), navigation_ms(app, reuse)
+        print(f"{screen_class.__name__:<24}{rebuilt:>14.2f}{kept:>12.2f}")
+    window.close()
+
+if __name__ == '__main__':
+    main()
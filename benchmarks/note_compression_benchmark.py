@@ -0,0 +1,33 @@
+"""
+Compares the size and load time of note record files for each compression mode.
+
+Run from the repository root:
+    python -m benchmarks.note_compression_benchmark
+"""
+import io
+import time
+from benchmarks.synthetic_notes import synthetic_notes
+from clinic.dao.record_format import read_record, write_record
+
+MODES = (None, 'zlib', 'lzma')
+REPEAT = 5
+
+def main():
+    for count in (100, 2000, 10000):
+        data = {'notes': synthetic_notes(count)}
+        print(f'\n{count} notes per patient')
+        print(f"{'mode':<8}{'size (KiB)':>12}{'save (ms)':>12}{'load (ms)':>12}")
+        for mode in MODES:
+            buffer = io.BytesIO()
+            start = time.perf_counter()
+            write_record(buffer, data, mode)
+            save_ms = (time.perf_counter() - start) * 1000
+            content = buffer.getvalue()
+            start = time.perf_counter()
+            for _ in range(REPEAT):
+                read_record(io.BytesIO(content))
+            load_ms = (time.perf_counter() - start) * 1000 / REPEAT
+            print(f"{mode or 'none':<8}{len(content) / 1024:>12.1f}{save_ms:>12.1f}{load_ms:>12.1f}")
+
+if __name__ == '__main__':
+    main()
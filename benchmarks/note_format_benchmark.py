@@ -0,0 +1,47 @@
+"""
+Compares the JSON-lines record format with the pickle files it replaces.
+
+Run from the repository root:
+    python -m benchmarks.note_format_benchmark
+"""
+import io
+import pickle
+import time
+from benchmarks.synthetic_notes import synthetic_notes
+from clinic.dao.record_format import iter_notes, read_record, write_record
+
+REPEAT = 5
+
+def timed(function) -> float:
+    """
+    Returns the average time of a function in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        function()
+    return (time.perf_counter() - start) * 1000 / REPEAT
+
+def main():
+    for count in (100, 2000, 10000):
+        data = {'notes': synthetic_notes(count)}
+        for note in data['notes'][::10]:
+            note.update_details(note.text + " Reviewed.")  # Give some notes a revision history
+        print(f'\n{count} notes per patient')
+        print(f"{'format':<14}{'size (KiB)':>12}{'save (ms)':>12}{'load (ms)':>12}{'first (ms)':>12}")
+
+        content = pickle.dumps(data)
+        save_ms = timed(lambda: pickle.dumps(data))
+        load_ms = timed(lambda: pickle.loads(content))
+        print(f"{'pickle':<14}{len(content) / 1024:>12.1f}{save_ms:>12.1f}{load_ms:>12.1f}{load_ms:>12.1f}")
+
+        for mode in (None, 'zlib'):
+            buffer = io.BytesIO()
+            write_record(buffer, data, mode)
+            content = buffer.getvalue()
+            save_ms = timed(lambda: write_record(io.BytesIO(), data, mode))
+            load_ms = timed(lambda: read_record(io.BytesIO(content)))
+            first_ms = timed(lambda: next(iter_notes(io.BytesIO(content))))
+            print(f"{'jsonl ' + (mode or 'none'):<14}{len(content) / 1024:>12.1f}{save_ms:>12.1f}{load_ms:>12.1f}{first_ms:>12.1f}")
+
+if __name__ == '__main__':
+    main()
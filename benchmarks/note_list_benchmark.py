@@ -0,0 +1,61 @@
+"""
+Measures the time to open a patient record of a given size, when every note is joined
+into one QPlainTextEdit as before and with the note list view, and the time to jump to
+the last note of the list.
+
+Runs without a display on the offscreen Qt platform. Run from the repository root:
+    python -m benchmarks.note_list_benchmark
+"""
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication, QPlainTextEdit
+from clinic.gui.note_list_view import NoteListView
+from benchmarks.synthetic_notes import synthetic_notes
+
+SIZES = (100, 1000, 10000, 50000)
+
+def shown_ms(app, build) -> tuple:
+    """
+    Builds a widget and shows it, waiting for it to be laid out and painted.
+
+    Return Type:
+    - tuple: The widget and the milliseconds it took.
+    """
+    start = time.perf_counter()
+    widget = build()
+    widget.resize(900, 600)
+    widget.show()
+    app.processEvents()
+    return widget, (time.perf_counter() - start) * 1000
+
+def main():
+    app = QApplication([])
+    # Fonts and text layout are set up on first use, outside the measurements
+    warm_up, _ = shown_ms(app, lambda: NoteListView(synthetic_notes(10)))
+    warm_up.close()
+    print(f"{'notes':>8}{'text edit (ms)':>16}{'list view (ms)':>16}{'last note (ms)':>16}")
+    for size in SIZES:
+        notes = list(reversed(synthetic_notes(size)))
+        marker = notes[-1].text[:20]  # Text of the oldest note, found only at the end of the list
+
+        def text_edit():
+            display = QPlainTextEdit()
+            display.setReadOnly(True)
+            display.setPlainText("\n\n".join(f"Note #{note.code}, from {note.timestamp}\n{note.text}" for note in notes))
+            return display
+
+        edit, edit_ms = shown_ms(app, text_edit)
+        edit.close()
+        view, view_ms = shown_ms(app, lambda: NoteListView(notes, highlight="headache"))
+        start = time.perf_counter()
+        view.find(marker, len(notes) - 1)
+        app.processEvents()
+        find_ms = (time.perf_counter() - start) * 1000
+        view.close()
+        print(f"{size:>8}{edit_ms:>16.1f}{view_ms:>16.1f}{find_ms:>16.1f}")
+
+if __name__ == '__main__':
+    main()
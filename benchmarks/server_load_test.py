@@ -0,0 +1,99 @@
+"""
+Load test for the HTTP/JSON API server: concurrent clients reading patients over
+kept-alive connections, over a new connection per request, and in batches.
+
+Runs an in-process server that does not save changes. Run from the repository root:
+    python -m benchmarks.server_load_test
+"""
+import http.client
+import json
+import statistics
+import threading
+import time
+from clinic.controller import Controller
+from clinic.server.clinic_server import ClinicAPI, ClinicServer
+
+CLIENTS = 16
+REQUESTS_PER_CLIENT = 500
+BATCH_SIZE = 50
+PATIENTS = 200
+FIRST_PHN = 9800000000
+
+def call(connection, method, path, body=None, token=None):
+    """
+    Sends one request and returns the status and decoded response.
+    """
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    connection.request(method, path, json.dumps(body) if body is not None else None, headers)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+def run_clients(port, token, client):
+    """
+    Runs CLIENTS threads calling `client(port, token, latencies)` and returns the
+    number of patients read per second and every request latency.
+    """
+    latencies = []
+    threads = [threading.Thread(target=client, args=(port, token, latencies)) for _ in range(CLIENTS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+def keep_alive_client(port, token, latencies):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    for i in range(REQUESTS_PER_CLIENT):
+        start = time.perf_counter()
+        call(connection, 'GET', f'/patients/{FIRST_PHN + i % PATIENTS}', token=token)
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+def new_connection_client(port, token, latencies):
+    for i in range(REQUESTS_PER_CLIENT):
+        start = time.perf_counter()
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        call(connection, 'GET', f'/patients/{FIRST_PHN + i % PATIENTS}', token=token)
+        connection.close()
+        latencies.append(time.perf_counter() - start)
+
+def batch_client(port, token, latencies):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    for i in range(0, REQUESTS_PER_CLIENT, BATCH_SIZE):
+        requests = [{"method": "GET", "path": f'/patients/{FIRST_PHN + (i + j) % PATIENTS}'} for j in range(BATCH_SIZE)]
+        start = time.perf_counter()
+        call(connection, 'POST', '/batch', {"requests": requests}, token)
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+def main():
+    server = ClinicServer(('127.0.0.1', 0), ClinicAPI(Controller(autosave=False)), workers=CLIENTS)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    try:
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        _, response = call(connection, 'POST', '/login', {"username": "user", "password": "123456"})
+        token = response["token"]
+        creates = [{"method": "POST", "path": "/patients", "body": {"phn": FIRST_PHN + i, "name": f"Load Test {i}"}}
+                   for i in range(PATIENTS)]
+        call(connection, 'POST', '/batch', {"requests": creates}, token)
+        connection.close()
+
+        print(f"{CLIENTS} clients x {REQUESTS_PER_CLIENT} patient reads")
+        print(f"{'mode':<16}{'reads/s':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+        for name, client in (("keep-alive", keep_alive_client), ("new connection", new_connection_client),
+                             (f"batch of {BATCH_SIZE}", batch_client)):
+            elapsed, latencies = run_clients(port, token, client)
+            latencies.sort()
+            p50 = statistics.median(latencies) * 1000
+            p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+            print(f"{name:<16}{CLIENTS * REQUESTS_PER_CLIENT / elapsed:>10.0f}{p50:>10.2f}{p99:>10.2f}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
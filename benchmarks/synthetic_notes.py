@@ -0,0 +1,47 @@
+import random
+from datetime import datetime, timedelta
+from clinic.note import Note
+
+VOCABULARY = (
+    "patient reports mild moderate severe pain headache fatigue nausea fever cough "
+    "shortness of breath chest abdominal lower back since two three days weeks "
+    "denies history hypertension diabetes asthma allergies medication prescribed "
+    "ibuprofen acetaminophen amoxicillin dose mg twice daily follow up in clinic "
+    "blood pressure heart rate temperature examination normal unremarkable tender "
+    "referred to specialist imaging ordered lab results pending advised rest fluids"
+).split()
+
+def synthetic_text(rng: random.Random, words: int) -> str:
+    """
+    Builds a clinical-sounding narrative from a fixed vocabulary.
+
+    Parameters:
+    - rng (random.Random): The random generator, seeded for reproducible corpora.
+    - words (int): The number of words in the text.
+
+    Return Type:
+    - str: The generated text.
+    """
+    sentences = []
+    while words > 0:
+        length = min(words, rng.randint(6, 16))
+        sentence = " ".join(rng.choice(VOCABULARY) for _ in range(length))
+        sentences.append(sentence.capitalize() + ".")
+        words -= length
+    return " ".join(sentences)
+
+def synthetic_notes(count: int, words: int = 80, seed: int = 2024) -> list:
+    """
+    Builds a reproducible list of notes for benchmarks.
+
+    Parameters:
+    - count (int): The number of notes.
+    - words (int): The number of words per note.
+    - seed (int): The random seed.
+
+    Return Type:
+    - list: The generated Note objects, oldest first.
+    """
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    return [Note(code, synthetic_text(rng, words), start + timedelta(hours=code)) for code in range(1, count + 1)]
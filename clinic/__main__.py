@@ -1,28 +1,112 @@
+import argparse
+import json
 import os
 import sys
 from clinic.cli.clinic_cli import ClinicCLI
-import clinic.gui.clinic_gui
+from clinic.dao.record_migration import migrate_records
+from clinic.dao.backup_manager import restore
+from clinic.dao.shard_layout import rebalance
+from clinic.dao.change_feed import tail
+from clinic.server.clinic_server import serve
+from datetime import datetime
 
 def main():
 	# You can run either a command-line interface (CLI) 
 	# or a graphical user interface (GUI) to your clinic.
+	if len(sys.argv) > 1 and sys.argv[1] == 'restore':
+		restore_backup(sys.argv[2:])
+		return
+	if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+		serve_api(sys.argv[2:])
+		return
+	if len(sys.argv) > 1 and sys.argv[1] == 'changes':
+		tail_changes(sys.argv[2:])
+		return
+	if len(sys.argv) > 1 and sys.argv[1] == 'rebalance':
+		rebalance_store(sys.argv[2:])
+		return
 	if len(sys.argv) != 2:
 		print('ERROR: wrong number of arguments')
 		print('\nCorrect Command usage:')
 		print('python -m clinic option')
-		print('where option is either cli or gui')
+		print('where option is either cli, gui, serve [--host host] [--port port], changes [--since seq] [--follow], migrate, rebalance shards or restore [--at timestamp]')
 		sys.exit()
 
 	if sys.argv[1] == 'cli':
 		ClinicCLI()
 	elif sys.argv[1] == 'gui':
+		# Imported here so the other options work without PyQt installed
+		import clinic.gui.clinic_gui
 		clinic.gui.clinic_gui.main()
+	elif sys.argv[1] == 'migrate':
+		# Rewrite legacy pickle note records in the JSON-lines record format
+		migrated, skipped = migrate_records()
+		print(f'{migrated} record files migrated, {skipped} already up to date')
 	else:
 		print('ERROR: Wrong argument')
 		print('\nCorrect Command usage:')
 		print('python -m clinic option')
-		print('where option is either cli or gui')
+		print('where option is either cli, gui, serve [--host host] [--port port], changes [--since seq] [--follow], migrate, rebalance shards or restore [--at timestamp]')
 
+def timestamp(value):
+	# argparse type for ISO timestamps such as 2024-11-30T14:00:00
+	try:
+		return datetime.fromisoformat(value)
+	except ValueError:
+		raise argparse.ArgumentTypeError(f'invalid timestamp {value}')
+
+def shard_count(value):
+	# argparse type for a number of shards, at least 1
+	try:
+		shards = int(value)
+	except ValueError:
+		raise argparse.ArgumentTypeError(f'invalid number of shards {value}')
+	if shards < 1:
+		raise argparse.ArgumentTypeError('the number of shards must be at least 1')
+	return shards
+
+def restore_backup(arguments):
+	# Restore the patients and notes as they were at a point in time,
+	# or at the latest logged change when no time is given
+	parser = argparse.ArgumentParser(prog='python -m clinic restore')
+	parser.add_argument('--at', type=timestamp, default=None, help='the time to restore, such as 2024-11-30T14:00:00')
+	options = parser.parse_args(arguments)
+	try:
+		result = restore(options.at)
+	except ValueError as error:
+		print(f'ERROR: {error}')
+		sys.exit(1)
+	print(f"Restored snapshot of {result['snapshot']:%Y-%m-%d %H:%M:%S} and replayed {result['replayed']} changes")
+	print(f"Previous data moved to {result['archive']}")
+
+def rebalance_store(arguments):
+	# Move patients and notes to a layout with the given number of shards
+	parser = argparse.ArgumentParser(prog='python -m clinic rebalance')
+	parser.add_argument('shards', type=shard_count, help='the number of shards, at least 1')
+	options = parser.parse_args(arguments)
+	result = rebalance(options.shards)
+	print(f"Moved {result['patients']} patients and {result['records']} record files from {result['from']} to {result['to']} shards")
+
+def tail_changes(arguments):
+	# Print the changes made to patients and notes, one JSON event per line
+	parser = argparse.ArgumentParser(prog='python -m clinic changes')
+	parser.add_argument('--since', type=int, default=0, help='only show events after this sequence number')
+	parser.add_argument('--follow', action='store_true', help='keep printing new events as they are made')
+	options = parser.parse_args(arguments)
+	try:
+		for event in tail(options.since, options.follow):
+			print(json.dumps(event), flush=True)
+	except KeyboardInterrupt:
+		pass
+
+def serve_api(arguments):
+	# Share one store with every terminal of the clinic through an HTTP/JSON API
+	parser = argparse.ArgumentParser(prog='python -m clinic serve')
+	parser.add_argument('--host', default='127.0.0.1')
+	parser.add_argument('--port', type=int, default=8080)
+	parser.add_argument('--workers', type=int, default=16)
+	options = parser.parse_args(arguments)
+	serve(options.host, options.port, options.workers)
 
 if __name__ == '__main__':
 	main()
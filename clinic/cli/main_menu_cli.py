@@ -104,7 +104,10 @@ class MainMenuCLI():
     def retrieve_patients_by_name(self):
         print('RETRIEVE PATIENTS BY NAME:')
         try:
-            search_string = input('Search for: ')
+            search_string = input('Search for (end with * to list names starting with it): ')
+            if search_string.endswith('*'):
+                self.autocomplete_patients_by_name(search_string[:-1])
+                return
             found_patients = self.controller.retrieve_patients(search_string)
             if found_patients:
                 print('\nPatients found with name %s:\n' % search_string)
@@ -112,9 +115,22 @@ class MainMenuCLI():
                     print(patient)
             else:
                 print('\nNo patients found with name: %s\n' % search_string)
+                similar_patients = self.controller.fuzzy_search_patients(search_string, 10)
+                if similar_patients:
+                    print('Did you mean:\n')
+                    for patient in similar_patients:
+                        print(patient)
         except IllegalAccessException:
             print('\nMUST LOGIN FIRST.')
 
+    def autocomplete_patients_by_name(self, prefix):
+        found_patients = self.controller.autocomplete_patients(prefix, 10)
+        if found_patients:
+            print('\nPatients with names starting with %s:\n' % prefix)
+            for patient in found_patients:
+                print('%d - %s' % (patient.phn, patient.name))
+        else:
+            print('\nNo patients found with names starting with: %s\n' % prefix)
 
     def update_patient(self):
         print('CHANGE PATIENT DATA:')
@@ -1,14 +1,21 @@
-import hashlib
-import json
+import copy
+from contextlib import contextmanager
 from  datetime import datetime
 from clinic.patient import Patient
 from clinic.patient_record import PatientRecord
 from clinic.note import Note
 from clinic.exception import (
-    DuplicateLoginException, IllegalAccessException, IllegalOperationException, InvalidLoginException, InvalidLogoutException,NoCurrentPatientException
+    DuplicateLoginException, IllegalAccessException, IllegalOperationException, InvalidLoginException, InvalidLogoutException,NoCurrentPatientException,
+    VersionConflictException
 )
 from clinic.dao import PatientDAOJSON
+from clinic.dao.patient_dao_json import SCAN_CHUNK_SIZE
 from clinic.dao.note_dao_pickle import NoteDAOPickle
+from clinic.dao.record_cache import DEFAULT_MAX_BYTES
+from clinic.dao.backup_manager import BackupManager
+from clinic.dao.credential_store import CredentialStore, USERS_FILE
+from clinic.dao.change_feed import CHANGES_LOG, ChangeFeed
+from clinic.password_hasher import PBKDF2Hasher, verify_password
 
 class Controller:
     """
@@ -16,19 +23,141 @@ class Controller:
     Handles login, logout, patient management, and note management within a session.
     """
 
-    def __init__(self,autosave = False):
+    def __init__(self,autosave = False, record_cache_bytes = DEFAULT_MAX_BYTES, record_compression = None, password_hasher = None, users_file = USERS_FILE):
         """
         Initializes the Controller instance with default settings.
 
         Parameters:
         - autosave (bool): Determines whether changes to patients are automatically saved.
+        - record_cache_bytes (int): Memory budget, in estimated bytes of note text, for
+          patient records whose notes are kept in memory.
+        - record_compression (str): Compression of note record files ('none', 'zlib', 'lzma'),
+          or None for uncompressed files.
+        - password_hasher (PasswordHasher): The hasher for stored passwords, PBKDF2 by default.
+          Passwords stored with another hasher or work factor are rehashed on login when
+          autosave is on.
+        - users_file (str): The credentials file, one `username,password hash` pair per line.
         """
         self.current_patient = None                  # Stores the currently selected patient in this session
         self.username = None                         # Stores the username of the logged-in user
         self.logged_in = False                       # Boolean indicating if a user is currently logged in
         self.autosave = autosave        
-        self.patient_dao = PatientDAOJSON(autosave)  # Data Access Object for patient management
-        self.users = {}                              # Dictionary to store user credentials
+        self.patient_dao = PatientDAOJSON(autosave, record_cache_bytes, record_compression)  # Data Access Object for patient management
+        self.credentials = CredentialStore.shared(users_file)  # User credentials, reloaded only when the file changes
+        self.password_hasher = password_hasher or PBKDF2Hasher()
+        # Snapshots and mutation log for point-in-time restore, only when changes are persisted
+        self.backup = BackupManager(self.patient_dao) if autosave else None
+        # Events for every change, logged for other processes only when changes are persisted
+        self.change_feed = ChangeFeed(CHANGES_LOG if autosave else None)
+        self.undo_log = None                         # Undoes the changes of the open batch, None outside a batch
+        self.pending_mutations = None                # Backup log entries of the open batch
+
+    def new_session(self) -> 'Controller':
+        """
+        Creates a controller for another user session over the same store.
+
+        The new controller shares the patient DAO, backups, change feed and credentials of this one,
+        but has its own login state and current patient.
+
+        Return Type:
+        - Controller: A logged out controller sharing this controller's store.
+        """
+        session = copy.copy(self)
+        session.current_patient = None
+        session.username = None
+        session.logged_in = False
+        session.undo_log = None
+        session.pending_mutations = None
+        return session
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups operations into one transaction, used as `with controller.batch(): ...`.
+
+        Each operation is validated and applied in memory as usual, but nothing is
+        written until the block ends: then every changed note record is saved once and
+        the patient and backup log entries are appended together and the change events
+        are published. If an operation
+        raises, every change made in the block is undone in memory and nothing is
+        written. The store stays locked for the whole block; a batch opened inside
+        another batch joins it.
+
+        Return Type:
+        - Controller: This controller, for use in the block.
+        """
+        if not self.logged_in:
+            raise IllegalAccessException
+        if self.undo_log is not None:
+            yield self
+            return
+        with self.patient_dao.writing():
+            current_patient = self.current_patient
+            self.undo_log = []
+            self.pending_mutations = []
+            self.patient_dao.begin_batch()
+            try:
+                yield self
+            except BaseException:
+                undo_log, self.undo_log, self.pending_mutations = self.undo_log, None, None
+                for undo in reversed(undo_log):
+                    undo()
+                self.patient_dao.rollback_batch()
+                self.current_patient = current_patient
+                raise
+            mutations, self.undo_log, self.pending_mutations = self.pending_mutations, None, None
+            self.patient_dao.commit_batch()
+            if self.backup is not None and mutations:
+                self.backup.log_many(mutations)
+            self.change_feed.publish(mutations)
+
+    def record_undo(self, undo) -> None:
+        """
+        Remembers how to undo a change if a batch is open.
+
+        Parameters:
+        - undo (callable): Restores the state from before the change.
+
+        Return Type:
+        - None
+        """
+        if self.undo_log is not None:
+            self.undo_log.append(undo)
+
+    def current_note_dao(self):
+        """
+        Returns the note DAO of the current patient, deferring its saves if a batch is open.
+        """
+        note_dao = self.current_patient.get_patient_record().note_dao
+        if self.undo_log is not None:
+            self.patient_dao.defer_record(note_dao)
+        return note_dao
+
+    def log_mutation(self, op: str, **args) -> None:
+        """
+        Records a mutation in the backup log, if backups are enabled, and publishes it on
+        the change feed. Inside a batch, both happen when the batch is committed.
+
+        Parameters:
+        - op (str): The mutation, such as 'create_patient' or 'update_note'.
+        - **args: The arguments needed to replay the mutation.
+
+        Return Type:
+        - None
+        """
+        if self.pending_mutations is not None:
+            self.pending_mutations.append((op, args))
+        else:
+            if self.backup is not None:
+                self.backup.log(op, **args)
+            self.change_feed.publish([(op, args)])
+
+    def log_note(self, op: str, note: 'Note') -> None:
+        """
+        Records a created or updated note of the current patient in the backup log.
+        """
+        self.log_mutation(op, phn=self.current_patient.phn, code=note.code, text=note.text, timestamp=note.timestamp.isoformat(),
+                          version=note.get_version())
       
     def load_patients(self):
         """
@@ -41,18 +170,9 @@ class Controller:
         - dict: A dictionary with usernames as keys and hashed passwords as values, 
           or an empty dictionary if the file is not found.
         """
-        patients={}
-        try:
-            with open('clinic/users.txt', 'r') as file:
-                for line in file:
-                    # Load JSON data and split lines into username and password
-                    data = json.load(file)
-                    names = line.strip().split(',')
-                    patients[names[0]] = names[1]
-        except FileNotFoundError:
-            # Inform the user if the file is missing
-            print("Users file not found.Please create 'users.txt' with user credentials.")
-        return patients
+        # The credential store parses the file and reloads it when it changes
+        self.credentials.refresh()
+        return dict(self.credentials.users)
         
     def login(self, username: str, password: str) -> bool:
         """
@@ -68,41 +188,34 @@ class Controller:
         if self.logged_in:
             # Prevent multiple logins
             raise DuplicateLoginException
-        try:
-                with open('clinic/users.txt', 'r') as file:
-                    for line in file:
-                        # Parse credentials into the users dictionary
-                        names = line.strip().split(',')
-                        self.users[names[0]] = names[1]
-        except FileNotFoundError:
-            print("Users file not found.Please create 'users.txt' with user credentials.")
-        
         # Validate username and password
-        if username in self.users:
-            password_hash = self.get_password_hash(password)
-            if self.users[username] == str(password_hash):
-                self.logged_in = True
-                return True
-            else:
-                raise InvalidLoginException
-        else:
+        stored_hash = self.credentials.get(username)
+        if stored_hash is None:
             raise InvalidLoginException
+        cache = self.credentials.verification_cache
+        if not cache.check(username, password, stored_hash):
+            if not verify_password(password, stored_hash):
+                raise InvalidLoginException
+            if self.autosave and self.password_hasher.needs_rehash(stored_hash):
+                # Upgrade an outdated hash while the plain password is at hand
+                stored_hash = self.get_password_hash(password)
+                self.credentials.set(username, stored_hash)
+            cache.remember(username, password, stored_hash)
+        self.logged_in = True
+        self.username = username
+        return True
 
     def get_password_hash(self, password: str) -> str:
         """
-        Hashes a given password using SHA-256.
+        Hashes a given password with the configured hasher and a new random salt.
 
         Parameters:
         - password (str): The plain text password to hash.
 
         Return Type:
-        - str: The hashed password as a hexadecimal string.
+        - str: The encoded hash, including its algorithm, work factor and salt.
         """
-        # Encode the password and generate its hash
-        encoded_password = password.encode('utf-8')
-        hash_obj = hashlib.sha256(encoded_password)
-        hex_dig = hash_obj.hexdigest()
-        return hex_dig
+        return self.password_hasher.hash(password)
              
     def logout(self) -> bool:
         """
@@ -136,6 +249,21 @@ class Controller:
             # Ensure the user is logged in before searching
             raise IllegalAccessException
         return self.patient_dao.search_patient(phn)
+
+    def search_patients(self, phns: list) -> list:
+        """
+        Retrieves several patients by PHN with one login check and one lock acquisition,
+        for screens and integrations that resolve lists of PHNs.
+
+        Parameters:
+        - phns (list): The PHNs of the patients to search for.
+
+        Return Type:
+        - list: The Patient instances in the order of the PHNs, with None for every PHN not found.
+        """
+        if not self.logged_in:
+            raise IllegalAccessException
+        return self.patient_dao.search_patients(phns)
         
 
     def create_patient(self, phn: int, name: str, birth_date: str, phone: str, email: str, address: str) -> 'Patient':
@@ -156,13 +284,17 @@ class Controller:
         if not self.logged_in:
             # Ensure the user is logged in before creating a patient
             raise IllegalAccessException
-        if phn in self.patient_dao.patients:
-            # Prevent creating a patient with a duplicate PHN
-            raise IllegalOperationException
-        
-        # Create and add the new patient
-        patient = Patient(phn,name,birth_date,phone,email,address,self.autosave)
-        self.patient_dao.create_patient(patient)
+
+        with self.patient_dao.writing():
+            if phn in self.patient_dao.patients:
+                # Prevent creating a patient with a duplicate PHN
+                raise IllegalOperationException
+
+            # Create and add the new patient
+            patient = Patient(phn,name,birth_date,phone,email,address,self.autosave)
+            self.patient_dao.create_patient(patient)
+            self.record_undo(lambda: self.patient_dao.delete_patient(phn))
+            self.log_mutation("create_patient", phn=phn, name=name, birth_date=birth_date, phone=phone, email=email, address=address)
         return patient
 
     def retrieve_patients(self, name: str) -> list:
@@ -180,10 +312,123 @@ class Controller:
             raise IllegalAccessException
         return self.patient_dao.retrieve_patients(name)
 
-    def update_patient(self, old_phn: int, phn=None, name=None, birth_date=None, phone=None, email=None, address=None) -> bool:
+    def scan_patients(self, name: str, chunk_size: int = SCAN_CHUNK_SIZE):
+        """
+        Retrieves the patients whose names contain the search string (case-insensitive),
+        one chunk of the store at a time. The store is released between chunks, so a
+        caller can stop after any chunk without holding up other sessions.
+
+        Parameters:
+        - name (str): The name to search for within patient records.
+        - chunk_size (int): The number of patients checked per chunk.
+
+        Return Type:
+        - iterator: Lists of matching Patient instances, one per chunk.
+        """
+        if not self.logged_in:
+            raise IllegalAccessException
+        return self.patient_dao.scan_patients(name, chunk_size)
+
+    def autocomplete_patients(self, prefix: str, limit: int = 10) -> list:
+        """
+        Retrieves patients whose names start with the given prefix (case-insensitive).
+
+        Parameters:
+        - prefix (str): The beginning of the patient name.
+        - limit (int): The maximum number of patients returned. Defaults to 10.
+
+        Return Type:
+        - list: Up to `limit` matching Patient instances in alphabetical order of name.
+        """
+        if not self.logged_in:
+            raise IllegalAccessException
+        return self.patient_dao.autocomplete_patients(prefix, limit)
+
+    def fuzzy_search_patients(self, name: str, limit: int = 10) -> list:
+        """
+        Retrieves patients whose names approximately match the given name, ranked by closeness.
+        Useful when a misspelled name finds nothing through retrieve_patients.
+
+        Parameters:
+        - name (str): The possibly misspelled patient name.
+        - limit (int): The maximum number of patients returned. Defaults to 10.
+
+        Return Type:
+        - list: Up to `limit` matching Patient instances, closest match first.
+        """
+        if not self.logged_in:
+            raise IllegalAccessException
+        return self.patient_dao.fuzzy_search_patients(name, limit)
+
+    def search_patients_by_phone(self, phone: str) -> list:
+        """
+        Retrieves patients by phone number, ignoring spaces and punctuation.
+
+        Parameters:
+        - phone (str): The phone number to search for.
+
+        Return Type:
+        - list: A list of matching Patient instances, or an empty list if none match.
+        """
+        if not self.logged_in:
+            raise IllegalAccessException
+        return self.patient_dao.search_patients_by_phone(phone)
+
+    def search_patients_by_email(self, email: str) -> list:
+        """
+        Retrieves patients by email address (case-insensitive).
+
+        Parameters:
+        - email (str): The email address to search for.
+
+        Return Type:
+        - list: A list of matching Patient instances, or an empty list if none match.
+        """
+        if not self.logged_in:
+            raise IllegalAccessException
+        return self.patient_dao.search_patients_by_email(email)
+
+    def retrieve_patients_by_birth_date(self, start: str = None, end: str = None) -> list:
+        """
+        Retrieves patients born between two dates, both inclusive.
+
+        Parameters:
+        - start (str): The earliest birth date ('YYYY-MM-DD'), or None for no lower bound.
+        - end (str): The latest birth date ('YYYY-MM-DD'), or None for no upper bound.
+
+        Return Type:
+        - list: A list of matching Patient instances ordered by birth date.
+        """
+        if not self.logged_in:
+            raise IllegalAccessException
+        return self.patient_dao.retrieve_patients_by_birth_date(start, end)
+
+    def query_patients(self, *predicates, order_by: str = None, descending: bool = False, limit: int = None):
+        """
+        Queries patients matching every given predicate, such as NameContains,
+        BirthDateBetween or EmailDomain from clinic.dao.patient_query.
+
+        Parameters:
+        - predicates (Predicate): The conditions every patient must satisfy.
+        - order_by (str): The patient attribute to sort by, or None.
+        - descending (bool): Whether to sort in descending order.
+        - limit (int): The maximum number of patients, or None for no limit.
+
+        Return Type:
+        - PatientQuery: A lazy iterable of matching Patient instances; `explain()` shows the plan.
+        """
+        if not self.logged_in:
+            raise IllegalAccessException
+        return self.patient_dao.query(predicates, order_by, descending, limit)
+
+    def update_patient(self, old_phn: int, phn=None, name=None, birth_date=None, phone=None, email=None, address=None,
+                       expected_version: int = None) -> bool:
         """
         Updates a patient's details. Moves the patient if PHN changes and is unique.
 
+        Passing the version the caller read makes the update fail if someone else changed
+        the patient in the meantime, instead of silently overwriting their change.
+
         Parameters:
         - old_phn (int): The PHN of the patient to update.
         - phn (Optional[int]): The new PHN, if changing.
@@ -192,59 +437,87 @@ class Controller:
         - phone (Optional[str]): The new phone number, if updating.
         - email (Optional[str]): The new email address, if updating.
         - address (Optional[str]): The new address, if updating.
+        - expected_version (Optional[int]): The version of the patient the update is based on,
+          or None to update whatever the current version is.
 
         Return Type:
-        - bool: Returns True if the update is successful, False otherwise.
+        - bool: Returns True if the update is successful, raises VersionConflictException
+          if the patient is no longer at the expected version.
         """
         if not self.logged_in:
             # Ensure the user is logged in before updating a patient
             raise IllegalAccessException
-        
-        if old_phn not in self.patient_dao.patients:
-            # Ensure the patient exists before updating
-            raise IllegalOperationException
-        
-        patient = self.patient_dao.patients.get(old_phn)
 
-         # Check for conflicts if a new PHN is specified
-        if (self.current_patient and phn == self.current_patient.phn) or (phn and phn != old_phn and phn in self.patient_dao.patients):
-            raise IllegalOperationException
-        
-        if phn:
-            self.patient_dao.patients.pop(old_phn)
-            self.patient_dao.patients[phn] = patient
-
-        # Update patient details
-        patient.phn = phn
-        patient.name = name
-        patient.birth_date = birth_date
-        patient.phone = phone
-        patient.email = email
-        patient.address = address
-        self.patient_dao.update_patient(patient.phn,patient)
+        # Check and write under the lock, so no other update lands between the two
+        with self.patient_dao.writing():
+            if old_phn not in self.patient_dao.patients:
+                # Ensure the patient exists before updating
+                raise IllegalOperationException
+
+            patient = self.patient_dao.patients.get(old_phn)
+            if expected_version is not None and patient.version != expected_version:
+                raise VersionConflictException
+            before = (patient.phn, patient.name, patient.birth_date, patient.phone, patient.email, patient.address, patient.version)
+
+             # Check for conflicts if a new PHN is specified
+            if (self.current_patient and phn == self.current_patient.phn) or (phn and phn != old_phn and phn in self.patient_dao.patients):
+                raise IllegalOperationException
+
+            # Update patient details
+            patient.phn = phn
+            patient.name = name
+            patient.birth_date = birth_date
+            patient.phone = phone
+            patient.email = email
+            patient.address = address
+            patient.version += 1
+            # The DAO moves the patient to the new PHN if it changed
+            self.patient_dao.update_patient(old_phn,patient)
+
+            def undo(key=patient.phn):
+                patient.phn, patient.name, patient.birth_date, patient.phone, patient.email, patient.address, patient.version = before
+                self.patient_dao.update_patient(key, patient)
+            self.record_undo(undo)
+            self.log_mutation("update_patient", old_phn=old_phn, phn=phn, name=name, birth_date=birth_date, phone=phone, email=email, address=address,
+                              version=patient.version)
         return True
         
-    def delete_patient(self, phn: int) -> bool:
+    def delete_patient(self, phn: int, expected_version: int = None) -> bool:
         """
         Deletes a patient by their PHN if the user is logged in and the patient exists.
 
         Parameters:
         - phn (int): The PHN of the patient to delete.
+        - expected_version (Optional[int]): The version of the patient the deletion is based on,
+          or None to delete whatever the current version is.
 
         Return Type:
         - bool: Returns True if the patient is successfully deleted, raises an exception otherwise.
         """
         if not self.logged_in:
             raise IllegalAccessException
-         
-        if phn not in self.patient_dao.patients:
-            raise IllegalOperationException
-        
-        if self.current_patient and self.current_patient.phn == phn:
-            raise IllegalOperationException
 
         # Perform the deletion through the DAO
-        self.patient_dao.delete_patient(phn)
+        with self.patient_dao.writing():
+            if phn not in self.patient_dao.patients:
+                raise IllegalOperationException
+
+            if self.current_patient and self.current_patient.phn == phn:
+                raise IllegalOperationException
+
+            patient = self.patient_dao.patients[phn]
+            if expected_version is not None and patient.version != expected_version:
+                raise VersionConflictException
+            self.patient_dao.delete_patient(phn)
+
+            def undo():
+                self.patient_dao.create_patient(patient)
+                note_index = self.patient_dao.clinic_note_index
+                if note_index is not None:
+                    for note in patient.get_patient_record().note_dao.notes:
+                        note_index.add(note.timestamp, (phn, note.code))
+            self.record_undo(undo)
+            self.log_mutation("delete_patient", phn=phn)
         return True
             
     def list_patients(self) -> list:
@@ -259,6 +532,18 @@ class Controller:
         
         return self.patient_dao.list_patients()
 
+    def get_record_cache_stats(self) -> dict:
+        """
+        Returns the counters of the hydrated patient record cache.
+
+        Return Type:
+        - dict: The cache hits, misses, evictions, cached records and bytes in use.
+        """
+        if not self.logged_in:
+            raise IllegalAccessException
+
+        return self.patient_dao.record_cache.stats()
+
     def set_current_patient(self, phn: int) -> bool:
         """
         Sets the current patient in the session by their PHN.
@@ -272,7 +557,7 @@ class Controller:
         if not self.logged_in:
             raise IllegalAccessException
         
-        patient = self.patient_dao.patients.get(phn)
+        patient = self.patient_dao.search_patient(phn)
 
         if patient:
             self.current_patient = patient
@@ -320,7 +605,16 @@ class Controller:
         if self.current_patient is None:
             raise NoCurrentPatientException
         
-        return self.current_patient.create_note(text)
+        with self.patient_dao.writing():
+            note_dao = self.current_note_dao()
+            note = self.current_patient.create_note(text)
+
+            def undo(code=note.code):
+                note_dao.delete_note(code)
+                note_dao.autocounter = code
+            self.record_undo(undo)
+            self.log_note("create_note", note)
+        return note
 
     def search_note(self, code: int) -> 'Note':
         """
@@ -338,7 +632,48 @@ class Controller:
         if self.current_patient is None:
             raise NoCurrentPatientException
         
-        return self.current_patient.search_note(code)
+        with self.patient_dao.reading():
+            return self.current_patient.search_note(code)
+
+    def search_notes(self, codes: list) -> list:
+        """
+        Searches for several notes of the current patient by their codes, with one login
+        check and one pass over the patient's notes.
+
+        Parameters:
+        - codes (list): The unique codes of the notes to search for.
+
+        Return Type:
+        - list: The Note instances in the order of the codes, with None for every code not found.
+        """
+        if not self.logged_in:
+            raise IllegalAccessException
+
+        if self.current_patient is None:
+            raise NoCurrentPatientException
+
+        with self.patient_dao.reading():
+            return self.current_patient.search_notes(codes)
+
+    def note_history(self, code: int) -> list:
+        """
+        Retrieves the revision history of a note for the current patient.
+
+        Parameters:
+        - code (int): The unique code of the note.
+
+        Return Type:
+        - list: (timestamp, text) pairs from the current version to the oldest,
+          or None if the note is not found.
+        """
+        if not self.logged_in:
+            raise IllegalAccessException
+
+        if self.current_patient is None:
+            raise NoCurrentPatientException
+
+        with self.patient_dao.reading():
+            return self.current_patient.note_history(code)
 
     def retrieve_notes(self, search_text: str) -> list:
         """
@@ -356,14 +691,17 @@ class Controller:
         if  self.current_patient is None:
             raise NoCurrentPatientException
         
-        return self.current_patient.retrieve_notes_by_text(search_text)
+        with self.patient_dao.reading():
+            return self.current_patient.retrieve_notes_by_text(search_text)
 
-    def delete_note(self, code: int) -> bool:
+    def delete_note(self, code: int, expected_version: int = None) -> bool:
         """
         Deletes a note by its code for the current patient.
 
         Parameters:
         - code (int): The unique code of the note to delete.
+        - expected_version (Optional[int]): The version of the note the deletion is based on,
+          or None to delete whatever the current version is.
 
         Return Type:
         - bool: Returns True if the note is successfully deleted, raises an exception otherwise.
@@ -374,19 +712,33 @@ class Controller:
         if self.current_patient is None:
             raise NoCurrentPatientException
         
-        return self.current_patient.delete_note(code)
+        with self.patient_dao.writing():
+            note_dao = self.current_note_dao()
+            note = note_dao.search_note(code)
+            if note is not None and expected_version is not None and note.get_version() != expected_version:
+                raise VersionConflictException
+            if note is not None:
+                position = note_dao.notes.index(note)
+                self.record_undo(lambda: note_dao.restore_note(note, position))
+            deleted = self.current_patient.delete_note(code)
+            if deleted:
+                self.log_mutation("delete_note", phn=self.current_patient.phn, code=code)
+        return deleted
         
         
-    def update_note(self, code: int, text: str) -> bool:
+    def update_note(self, code: int, text: str, expected_version: int = None) -> bool:
         """
         Updates a note's content for the current patient.
 
         Parameters:
         - code (int): The unique code of the note to update.
         - text (str): The new content for the note.
+        - expected_version (Optional[int]): The version of the note the update is based on,
+          or None to update whatever the current version is.
 
         Return Type:
-        - bool: Returns True if the note is successfully updated, raises an exception otherwise.
+        - bool: Returns True if the note is successfully updated, raises VersionConflictException
+          if the note is no longer at the expected version.
         """
         if not self.logged_in:
             raise IllegalAccessException
@@ -394,7 +746,19 @@ class Controller:
         if self.current_patient is None:
            raise NoCurrentPatientException
         
-        return self.current_patient.update_note(code, text)
+        with self.patient_dao.writing():
+            note_dao = self.current_note_dao()
+            note = note_dao.search_note(code)
+            if note is not None and expected_version is not None and note.get_version() != expected_version:
+                raise VersionConflictException
+            if note is not None:
+                before = copy.deepcopy(note)
+                self.record_undo(lambda: note_dao.restore_note(before))
+            updated = self.current_patient.update_note(code, text)
+            note = self.current_patient.search_note(code)
+            if updated and note is not None:
+                self.log_note("update_note", note)
+        return updated
        
     def list_notes(self) -> list:
         """
@@ -409,4 +773,63 @@ class Controller:
         if self.current_patient is None:
             raise NoCurrentPatientException
         
-        return self.current_patient.list_notes()
\ No newline at end of file
+        with self.patient_dao.reading():
+            return self.current_patient.list_notes()
+
+    def retrieve_notes_by_timestamp(self, start: datetime = None, end: datetime = None) -> list:
+        """
+        Retrieves the current patient's notes written within an inclusive time range,
+        e.g. the last 30 days.
+
+        Parameters:
+        - start (datetime): The earliest timestamp, or None for no lower bound.
+        - end (datetime): The latest timestamp, or None for no upper bound.
+
+        Return Type:
+        - list: A list of matching Note instances, most recent first.
+        """
+        if not self.logged_in:
+            raise IllegalAccessException
+
+        if self.current_patient is None:
+            raise NoCurrentPatientException
+
+        with self.patient_dao.reading():
+            return self.current_patient.retrieve_notes_by_timestamp(start, end)
+
+    def recent_notes(self, count: int) -> list:
+        """
+        Retrieves the current patient's most recently written notes.
+
+        Parameters:
+        - count (int): The maximum number of notes to return.
+
+        Return Type:
+        - list: Up to `count` Note instances, most recent first.
+        """
+        if not self.logged_in:
+            raise IllegalAccessException
+
+        if self.current_patient is None:
+            raise NoCurrentPatientException
+
+        with self.patient_dao.reading():
+            return self.current_patient.recent_notes(count)
+
+    def retrieve_clinic_notes_by_timestamp(self, start: datetime = None, end: datetime = None, limit: int = None) -> list:
+        """
+        Retrieves the notes of every patient written within an inclusive time range,
+        e.g. all notes written today.
+
+        Parameters:
+        - start (datetime): The earliest timestamp, or None for no lower bound.
+        - end (datetime): The latest timestamp, or None for no upper bound.
+        - limit (int): The maximum number of notes, or None for no limit.
+
+        Return Type:
+        - list: (Patient, Note) pairs, most recent first.
+        """
+        if not self.logged_in:
+            raise IllegalAccessException
+
+        return self.patient_dao.retrieve_notes_by_timestamp(start, end, limit)
@@ -1,4 +1,18 @@
 from .patient_dao_json import PatientDAOJSON
 from .note_dao_pickle import NoteDAOPickle
 from .note_dao import NoteDAO
-from .patient_dao import PatientDAO
\ No newline at end of file
+from .patient_dao import PatientDAO
+from .record_cache import RecordCache
+from .query_cache import QueryCache
+from .name_index import NameIndex
+from .fuzzy_index import FuzzyIndex
+from .secondary_index import HashIndex, SortedIndex
+from .patient_query import (
+    PatientQuery, Predicate, PhnEquals, NameContains, BirthDateBetween, PhoneEquals, EmailEquals, EmailDomain
+)
+from .timestamp_index import TimestampIndex
+from .record_migration import migrate_records
+from .backup_manager import BackupManager, restore
+from .shard_layout import ShardLayout, rebalance
+from .credential_store import CredentialStore
+from .change_feed import ChangeFeed, tail
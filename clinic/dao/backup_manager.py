@@ -0,0 +1,389 @@
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from clinic.dao.patient_encoder import PatientEncoder
+from clinic.dao.patient_decoder import PatientDecoder
+from clinic.dao.file_lock import FileLock, file_signature
+
+BACKUP_DIRECTORY = 'clinic/backups'
+PATIENTS_FILE = 'clinic/patients.json'
+PATIENTS_LOG = 'clinic/patients.log'
+PATIENTS_DIRECTORY = 'clinic/patients'  # Shard files of a sharded layout
+RECORDS_DIRECTORY = 'clinic/records'
+DEFAULT_SNAPSHOT_INTERVAL = 1000  # Logged mutations between two automatic snapshots
+DEFAULT_KEEP_SNAPSHOTS = 10
+TAIL_BYTES = 64 * 1024  # Bytes read from the end of the mutation log to find the last sequence number
+
+class BackupManager:
+    """
+    Keeps point-in-time backups of a patient DAO.
+
+    Every mutation is appended to a mutation log (wal.log) with a sequence number and a
+    timestamp, and a consistent snapshot of the whole store is taken every
+    `snapshot_interval` mutations. A snapshot holds patients.json, hard links to the
+    note record files and a manifest with the last sequence number it contains.
+    Restoring copies the latest snapshot taken before the requested time and replays
+    the logged mutations up to that time.
+
+    Sequence numbers are assigned while holding the store for writing, continuing the
+    last one in the log, so they stay unique when several processes log mutations.
+    Entries older than the oldest kept snapshot are dropped from the log once a new
+    snapshot is complete.
+    """
+
+    def __init__(self, dao, directory: str = BACKUP_DIRECTORY, snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL,
+                 keep_snapshots: int = DEFAULT_KEEP_SNAPSHOTS) -> None:
+        """
+        Initializes the BackupManager, taking a first snapshot if none exists yet.
+
+        Parameters:
+        - dao (PatientDAOJSON): The DAO whose store is backed up.
+        - directory (str): The directory holding the mutation log and snapshots.
+        - snapshot_interval (int): The number of logged mutations between snapshots.
+        - keep_snapshots (int): The number of most recent snapshots to keep.
+
+        Return Type:
+        - None
+        """
+        self.dao = dao
+        self.directory = directory
+        self.wal_filename = os.path.join(directory, 'wal.log')
+        self.snapshot_interval = snapshot_interval
+        self.keep_snapshots = keep_snapshots
+        self.sequence = last_sequence(self.wal_filename)
+        self.wal_signature = file_signature(self.wal_filename)  # The log as of self.sequence
+        self.entries_since_snapshot = 0
+        self.snapshot_thread = None  # Thread writing the latest snapshot to disk, if any
+        if not list_snapshots(directory):
+            self.snapshot(background=False)
+
+    def log(self, op: str, **args) -> int:
+        """
+        Appends a mutation to the log, taking a snapshot when the interval is reached.
+
+        Call this while holding the store for writing, right after applying the mutation,
+        so the log order matches the order in which mutations were applied.
+
+        Parameters:
+        - op (str): The mutation, such as 'create_patient' or 'update_note'.
+        - **args: The JSON-compatible arguments needed to replay the mutation.
+
+        Return Type:
+        - int: The sequence number of the logged mutation.
+        """
+        return self.log_many([(op, args)])
+
+    def log_many(self, mutations: list) -> int:
+        """
+        Appends several mutations to the log with a single write and sync, taking a
+        snapshot when the interval is reached.
+
+        Parameters:
+        - mutations (list): (op, args) pairs, in the order they were applied.
+
+        Return Type:
+        - int: The sequence number of the last logged mutation.
+        """
+        with self.dao.writing():
+            self.sync_sequence()
+            now = datetime.now().isoformat()
+            lines = []
+            for op, args in mutations:
+                self.sequence += 1
+                lines.append(json.dumps({"seq": self.sequence, "time": now, "op": op, "args": args}) + '\n')
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.wal_filename, 'a') as wal:
+                wal.write(''.join(lines))
+                wal.flush()
+                os.fsync(wal.fileno())
+            self.wal_signature = file_signature(self.wal_filename)
+            self.entries_since_snapshot += len(lines)
+            if self.entries_since_snapshot >= self.snapshot_interval:
+                self.snapshot()
+            return self.sequence
+
+    def sync_sequence(self) -> int:
+        """
+        Continues the sequence numbers of mutations other processes logged. Call this
+        while holding the store for writing.
+
+        The end of the log is only read again when the file changed since this manager
+        last wrote or read it.
+
+        Return Type:
+        - int: The sequence number of the last logged mutation.
+        """
+        signature = file_signature(self.wal_filename)
+        if signature != self.wal_signature:
+            self.sequence = last_sequence(self.wal_filename)
+            self.wal_signature = signature
+        return self.sequence
+
+    def snapshot(self, background: bool = True) -> str:
+        """
+        Takes a consistent snapshot of the store.
+
+        The store is only held for writing, with the changes of other processes applied,
+        while the patients are encoded in memory and the record files are hard-linked.
+        Record files are always replaced, never modified, so the links keep their content.
+        Writing the snapshot files happens after the store is released, on a background
+        thread unless `background` is False.
+
+        Parameters:
+        - background (bool): Whether to write the snapshot files on a background thread.
+
+        Return Type:
+        - str: The directory the snapshot is written to.
+        """
+        with self.dao.writing():
+            self.sync_sequence()
+            taken = datetime.now()
+            path = os.path.join(self.directory, 'snapshot-' + taken.strftime('%Y%m%dT%H%M%S%f'))
+            staging = path + '.tmp'
+            os.makedirs(os.path.join(staging, 'records'))
+            patients = json.dumps(self.dao.patients, cls=PatientEncoder)
+            for patient in self.dao.patients.values():
+                note_dao = patient.get_patient_record().note_dao
+                if note_dao.dirty:
+                    note_dao.save_notes()
+                if os.path.exists(note_dao.filepath):
+                    _link_or_copy(note_dao.filepath, os.path.join(staging, 'records', os.path.basename(note_dao.filepath)))
+            manifest = {"time": taken.isoformat(), "seq": self.sequence}
+            self.entries_since_snapshot = 0
+
+        def write():
+            with open(os.path.join(staging, 'patients.json'), 'w') as file:
+                file.write(patients)
+            with open(os.path.join(staging, 'manifest.json'), 'w') as file:
+                json.dump(manifest, file)
+            # A snapshot only becomes visible once it is complete
+            os.rename(staging, path)
+            for _, _, old_path in list_snapshots(self.directory)[:-self.keep_snapshots]:
+                shutil.rmtree(old_path, ignore_errors=True)
+            self.trim()
+
+        if background:
+            self.snapshot_thread = threading.Thread(target=write, daemon=True)
+            self.snapshot_thread.start()
+        else:
+            write()
+        return path
+
+    def trim(self) -> int:
+        """
+        Drops the logged mutations that are already in every kept snapshot, as no restore
+        replays them.
+
+        Return Type:
+        - int: The number of entries dropped.
+        """
+        snapshots = list_snapshots(self.directory)
+        if not snapshots:
+            return 0
+        oldest_sequence = snapshots[0][1]
+        with self.dao.writing():
+            entries = list(read_wal(self.wal_filename))
+            kept = [entry for entry in entries if entry["seq"] > oldest_sequence]
+            if len(kept) == len(entries):
+                return 0
+            temporary = self.wal_filename + '.tmp'
+            with open(temporary, 'w') as wal:
+                wal.write(''.join(json.dumps(entry) + '\n' for entry in kept))
+                wal.flush()
+                os.fsync(wal.fileno())
+            os.replace(temporary, self.wal_filename)
+            self.sync_sequence()
+            return len(entries) - len(kept)
+
+def read_wal(wal_filename: str):
+    """
+    Reads the entries of a mutation log, ignoring a last line cut short by a crash.
+
+    Parameters:
+    - wal_filename (str): The path of the mutation log.
+
+    Return Type:
+    - iterator: The logged entries, in sequence order.
+    """
+    try:
+        wal = open(wal_filename, 'r')
+    except FileNotFoundError:
+        return
+    with wal:
+        for line in wal:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                return
+
+def last_sequence(wal_filename: str) -> int:
+    """
+    Finds the sequence number of the last entry of a mutation log, reading only its end.
+
+    Parameters:
+    - wal_filename (str): The path of the mutation log.
+
+    Return Type:
+    - int: The last sequence number, or 0 if nothing was logged.
+    """
+    try:
+        wal = open(wal_filename, 'rb')
+    except FileNotFoundError:
+        return 0
+    with wal:
+        size = wal.seek(0, os.SEEK_END)
+        wal.seek(max(0, size - TAIL_BYTES))
+        for line in reversed(wal.read().split(b'\n')):
+            try:
+                return json.loads(line)["seq"]
+            except (ValueError, KeyError, TypeError):
+                continue  # Empty, cut short or the partial first line of the chunk
+    return 0
+
+def list_snapshots(directory: str = BACKUP_DIRECTORY) -> list:
+    """
+    Lists the complete snapshots of a backup directory.
+
+    Parameters:
+    - directory (str): The backup directory.
+
+    Return Type:
+    - list: (time, sequence number, path) tuples, oldest first.
+    """
+    snapshots = []
+    if not os.path.isdir(directory):
+        return snapshots
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if not name.startswith('snapshot-') or name.endswith('.tmp'):
+            continue
+        try:
+            with open(os.path.join(path, 'manifest.json'), 'r') as file:
+                manifest = json.load(file)
+        except (FileNotFoundError, ValueError):
+            continue
+        snapshots.append((datetime.fromisoformat(manifest["time"]), manifest["seq"], path))
+    return sorted(snapshots)
+
+def apply_mutation(dao, entry: dict) -> None:
+    """
+    Replays one logged mutation on a DAO.
+
+    Parameters:
+    - dao (PatientDAOJSON): The DAO to apply the mutation to.
+    - entry (dict): The logged mutation.
+
+    Return Type:
+    - None
+    """
+    # Imported here to prevent circular imports
+    from clinic.patient import Patient
+
+    op, args = entry["op"], entry["args"]
+    if op == "create_patient":
+        dao.create_patient(Patient(args["phn"], args["name"], args["birth_date"], args["phone"], args["email"], args["address"], True))
+    elif op == "update_patient":
+        patient = dao.search_patient(args["old_phn"])
+        patient.phn, patient.name, patient.birth_date = args["phn"], args["name"], args["birth_date"]
+        patient.phone, patient.email, patient.address = args["phone"], args["email"], args["address"]
+        patient.version = args.get("version", patient.version + 1)
+        dao.update_patient(args["old_phn"], patient)
+    elif op == "delete_patient":
+        dao.delete_patient(args["phn"])
+    elif op in ("create_note", "update_note"):
+        note_dao = dao.search_patient(args["phn"]).get_patient_record().note_dao
+        note_dao.apply_note(args["code"], args["text"], datetime.fromisoformat(args["timestamp"]), args.get("version"))
+    elif op == "delete_note":
+        dao.search_patient(args["phn"]).get_patient_record().note_dao.delete_note(args["code"])
+    else:
+        raise ValueError(f"Unknown logged mutation: {op}")
+
+def restore(at: datetime = None, directory: str = BACKUP_DIRECTORY) -> dict:
+    """
+    Restores the store as it was at a point in time.
+
+    The current patient files, note records, mutation log and the snapshots taken
+    after the restore point are first moved to a 'pre-restore' directory, so a restore
+    can itself be undone by hand. The latest snapshot taken at or before `at` is then
+    loaded and the mutations logged after it, up to `at`, are replayed. The result is
+    saved in the current storage layout, and the replayed mutations become the new
+    mutation log.
+
+    Parameters:
+    - at (datetime): The point in time to restore, or None for the latest logged state.
+    - directory (str): The backup directory.
+
+    Return Type:
+    - dict: The snapshot used, the number of replayed mutations and the archive directory.
+    """
+    # Other processes neither read nor write while the store is replaced
+    lock = FileLock.for_path()
+    with lock.exclusive():
+        result = _restore(at, directory)
+        lock.bump()
+    return result
+
+def _restore(at: datetime, directory: str) -> dict:
+    """
+    Restores the store as it was at a point in time. Call this while holding the file lock exclusively.
+    """
+    # Imported here to prevent circular imports
+    from clinic.dao.patient_dao_json import PatientDAOJSON
+
+    snapshots = list_snapshots(directory)
+    usable = [snapshot for snapshot in snapshots if at is None or snapshot[0] <= at]
+    if not usable:
+        raise ValueError("No snapshot was taken at or before the requested time")
+    taken, sequence, snapshot_path = usable[-1]
+
+    archive = os.path.join(directory, 'pre-restore-' + datetime.now().strftime('%Y%m%dT%H%M%S%f'))
+    os.makedirs(archive)
+    for path in (PATIENTS_FILE, PATIENTS_LOG, PATIENTS_DIRECTORY, RECORDS_DIRECTORY, os.path.join(directory, 'wal.log')):
+        if os.path.exists(path):
+            shutil.move(path, os.path.join(archive, os.path.basename(path)))
+    for snapshot in snapshots:
+        if at is not None and snapshot[0] > at:
+            shutil.move(snapshot[2], os.path.join(archive, os.path.basename(snapshot[2])))
+
+    dao = PatientDAOJSON(True)
+    with open(os.path.join(snapshot_path, 'patients.json'), 'r') as file:
+        saved_patients = json.load(file, cls=PatientDecoder)
+    for phn in saved_patients:
+        # Snapshot records are stored by PHN only, so they fit any storage layout
+        source = os.path.join(snapshot_path, 'records', f'{phn}.dat')
+        if os.path.exists(source):
+            target = dao.layout.record_path(phn)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+
+    # Load and replay in memory, the result is written once when compacting
+    dao.autosave = False
+    for patient in saved_patients.values():
+        dao.create_patient(patient)
+    replayed = []
+    for entry in read_wal(os.path.join(archive, 'wal.log')):
+        if entry["seq"] <= sequence:
+            replayed.append(entry)  # Already in the snapshot, kept for older restores
+            continue
+        if at is not None and datetime.fromisoformat(entry["time"]) > at:
+            break
+        apply_mutation(dao, entry)
+        replayed.append(entry)
+    dao.autosave = True
+    dao.compact()
+    with open(os.path.join(directory, 'wal.log'), 'w') as wal:
+        for entry in replayed:
+            wal.write(json.dumps(entry) + '\n')
+
+    return {"snapshot": taken, "replayed": sum(1 for entry in replayed if entry["seq"] > sequence), "archive": archive}
+
+def _link_or_copy(source: str, target: str) -> None:
+    """
+    Hard-links a file, copying it when the file system does not support links.
+    """
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
@@ -0,0 +1,232 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+CHANGES_LOG = 'clinic/changes.log'
+ROTATE_BYTES = 8 * 1024 * 1024  # Size of the change log before it is moved to changes.log.1
+TAIL_BYTES = 64 * 1024  # Bytes read from the end of the log to find the last sequence number
+
+logger = logging.getLogger(__name__)
+
+class ChangeFeed:
+    """
+    An observable feed of the changes made to patients and notes.
+
+    Every create, update and delete becomes an event with a sequence number, the time,
+    the operation and its arguments, in the same form as the backup mutation log:
+    `{"seq": 7, "time": ..., "op": "update_note", "args": {"phn": ..., "code": ..., ...}}`.
+    Subscribers of the process are called with each event as soon as it is published,
+    so views apply the change instead of reading everything again.
+
+    Events are also appended to a local log, which other processes follow by calling
+    `poll` or with `tail`. Sequence numbers continue those of the log, so they are
+    unique across processes as long as events are published while holding the store
+    for writing. The log is moved to `changes.log.1` once it grows past `rotate_bytes`;
+    readers finish the old file before moving to the new one.
+    """
+
+    def __init__(self, filename: str = CHANGES_LOG, since: int = None, rotate_bytes: int = ROTATE_BYTES) -> None:
+        """
+        Initializes the ChangeFeed.
+
+        Parameters:
+        - filename (str): The change log, or None to keep events in this process only.
+        - since (int): The sequence number after which `poll` starts returning events of the
+          log, or None to start after the last event logged so far.
+        - rotate_bytes (int): The size of the log before it is rotated.
+
+        Return Type:
+        - None
+        """
+        self.filename = filename
+        self.rotate_bytes = rotate_bytes
+        self.subscribers = []
+        self.lock = threading.RLock()
+        self.reader = None  # The log file being read, positioned after the last complete line read
+        self.partial = b''  # The start of a line still being written
+        self.sequence = 0  # The last sequence number published or read
+        if filename is None:
+            return
+        if since is None:
+            self.sequence = last_sequence(filename)
+            self.reader = _open(filename)
+            if self.reader is not None:
+                self.reader.seek(0, os.SEEK_END)
+        else:
+            self.sequence = since
+            # Read what is left of the rotated log first
+            self.reader = _open(filename + '.1') or _open(filename)
+
+    def subscribe(self, callback) -> None:
+        """
+        Calls a function with every event published or read from now on.
+
+        Parameters:
+        - callback (callable): Called with each event dictionary, in sequence order.
+
+        Return Type:
+        - None
+        """
+        with self.lock:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback) -> None:
+        """
+        Stops calling a subscribed function.
+
+        Parameters:
+        - callback (callable): A function passed to `subscribe`.
+
+        Return Type:
+        - None
+        """
+        with self.lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def publish(self, mutations: list) -> list:
+        """
+        Publishes changes as events: appends them to the log with one write and calls
+        the subscribers. Call this while holding the store for writing, right after the
+        changes are applied, so the sequence order matches the order of the changes.
+
+        Parameters:
+        - mutations (list): (op, args) pairs, in the order they were applied.
+
+        Return Type:
+        - list: The published events.
+        """
+        with self.lock:
+            # Events other processes logged come first, and the sequence continues theirs
+            self.poll()
+            now = datetime.now().isoformat()
+            events = []
+            for op, args in mutations:
+                self.sequence += 1
+                events.append({"seq": self.sequence, "time": now, "op": op, "args": args})
+            if self.filename is not None and events:
+                self._append(events)
+            for event in events:
+                self._notify(event)
+            return events
+
+    def poll(self) -> list:
+        """
+        Reads the events other processes logged since the last call and passes them to
+        the subscribers. Events this feed published itself are skipped.
+
+        Return Type:
+        - list: The new events, in sequence order.
+        """
+        with self.lock:
+            events = [event for event in self._read() if event["seq"] > self.sequence]
+            for event in events:
+                self.sequence = event["seq"]
+                self._notify(event)
+            return events
+
+    def close(self) -> None:
+        """
+        Closes the log file being read.
+        """
+        with self.lock:
+            if self.reader is not None:
+                self.reader.close()
+                self.reader = None
+
+    def _notify(self, event: dict) -> None:
+        for callback in list(self.subscribers):
+            try:
+                callback(event)
+            except Exception:
+                # The change is already applied, a failing view must not undo the operation
+                logger.exception("Change feed subscriber %r failed on event %s", callback, event["seq"])
+
+    def _append(self, events: list) -> None:
+        if os.path.exists(self.filename) and os.path.getsize(self.filename) >= self.rotate_bytes:
+            os.replace(self.filename, self.filename + '.1')
+        os.makedirs(os.path.dirname(self.filename) or '.', exist_ok=True)
+        with open(self.filename, 'ab') as log:
+            log.write(''.join(json.dumps(event) + '\n' for event in events).encode('utf-8'))
+
+    def _read(self) -> list:
+        events = []
+        if self.filename is None:
+            return events
+        while True:
+            if self.reader is None:
+                self.reader = _open(self.filename)
+                if self.reader is None:
+                    return events
+            lines = (self.partial + self.reader.read()).split(b'\n')
+            self.partial = lines.pop()
+            for line in lines:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue  # Cut short by a crash
+            # The file was rotated or replaced: the rest of the events are in the new one
+            try:
+                current = os.stat(self.filename).st_ino
+            except FileNotFoundError:
+                return events
+            if current == os.fstat(self.reader.fileno()).st_ino:
+                return events
+            self.reader.close()
+            self.reader, self.partial = None, b''
+
+def _open(filename: str):
+    try:
+        return open(filename, 'rb')
+    except FileNotFoundError:
+        return None
+
+def last_sequence(filename: str = CHANGES_LOG) -> int:
+    """
+    Finds the sequence number of the last event of a change log, reading only its end.
+
+    Parameters:
+    - filename (str): The change log.
+
+    Return Type:
+    - int: The last sequence number, or 0 if nothing was logged.
+    """
+    for path in (filename, filename + '.1'):
+        log = _open(path)
+        if log is None:
+            continue
+        with log:
+            size = log.seek(0, os.SEEK_END)
+            log.seek(max(0, size - TAIL_BYTES))
+            for line in reversed(log.read().split(b'\n')):
+                try:
+                    return json.loads(line)["seq"]
+                except (ValueError, KeyError, TypeError):
+                    continue  # Empty, cut short or the partial first line of the chunk
+    return 0
+
+def tail(since: int = 0, follow: bool = False, interval: float = 0.5, filename: str = CHANGES_LOG):
+    """
+    Reads the events of a change log, for processes that react to changes made elsewhere.
+
+    Parameters:
+    - since (int): Only events with a larger sequence number are returned.
+    - follow (bool): Whether to keep waiting for new events once the log is read.
+    - interval (float): Seconds between two checks for new events when following.
+    - filename (str): The change log.
+
+    Return Type:
+    - iterator: The events, in sequence order.
+    """
+    feed = ChangeFeed(filename, since=since)
+    try:
+        while True:
+            yield from feed.poll()
+            if not follow:
+                return
+            time.sleep(interval)
+    finally:
+        feed.close()
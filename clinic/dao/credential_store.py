@@ -0,0 +1,130 @@
+import os
+import threading
+from clinic.password_hasher import VerificationCache
+
+USERS_FILE = 'clinic/users.txt'
+
+class CredentialStore:
+    """
+    An in-memory copy of the user credentials file.
+
+    The file holds one `username,password hash` pair per line. It is parsed once and
+    parsed again only when its modification time or size changes, so a login costs one
+    `os.stat` and a dictionary lookup. Controllers of the same process share one store
+    per file through `shared`, along with its cache of recently verified logins.
+    """
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, filename: str = USERS_FILE) -> None:
+        """
+        Initializes the CredentialStore. The file is read on first use.
+
+        Parameters:
+        - filename (str): The path of the credentials file.
+
+        Return Type:
+        - None
+        """
+        self.filename = filename
+        self.users = {}  # Maps username -> password hash
+        self.signature = None  # (mtime, size) of the file when it was last parsed, None if missing
+        self.loaded = False
+        self.lock = threading.Lock()
+        self.verification_cache = VerificationCache()  # Recently verified logins
+
+    @classmethod
+    def shared(cls, filename: str = USERS_FILE) -> 'CredentialStore':
+        """
+        Returns the store of a credentials file shared by the whole process.
+
+        Parameters:
+        - filename (str): The path of the credentials file.
+
+        Return Type:
+        - CredentialStore: The shared store.
+        """
+        with cls._shared_lock:
+            if filename not in cls._shared:
+                cls._shared[filename] = cls(filename)
+            return cls._shared[filename]
+
+    def refresh(self) -> None:
+        """
+        Parses the file again if it changed since it was last parsed.
+
+        Return Type:
+        - None
+        """
+        try:
+            stat = os.stat(self.filename)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+        if self.loaded and signature == self.signature:
+            return
+        with self.lock:
+            if signature is None:
+                print("Users file not found.Please create 'users.txt' with user credentials.")
+                self.users = {}
+            else:
+                self.users = self.parse()
+            self.signature = signature
+            self.loaded = True
+
+    def parse(self) -> dict:
+        """
+        Reads every username and password hash from the file. Lines without a comma
+        are skipped.
+
+        Return Type:
+        - dict: The password hash of every user.
+        """
+        users = {}
+        with open(self.filename, 'r') as file:
+            for line in file:
+                username, separator, password_hash = line.strip().partition(',')
+                if separator:
+                    users[username] = password_hash
+        return users
+
+    def set(self, username: str, password_hash: str) -> None:
+        """
+        Stores a new password hash for a user and rewrites the file.
+
+        The file is written next to the old one and moved over it, so readers never see
+        a partial file.
+
+        Parameters:
+        - username (str): The username.
+        - password_hash (str): The new encoded password hash.
+
+        Return Type:
+        - None
+        """
+        self.refresh()
+        with self.lock:
+            users = dict(self.users)
+            users[username] = password_hash
+            temporary = self.filename + '.tmp'
+            with open(temporary, 'w') as file:
+                for name, stored_hash in users.items():
+                    file.write(f'{name},{stored_hash}\n')
+            os.replace(temporary, self.filename)
+            stat = os.stat(self.filename)
+            self.users = users
+            self.signature = (stat.st_mtime_ns, stat.st_size)
+        self.verification_cache.forget(username)
+
+    def get(self, username: str) -> str:
+        """
+        Looks up the stored password hash of a user.
+
+        Parameters:
+        - username (str): The username.
+
+        Return Type:
+        - str: The stored password hash, or None if the user does not exist.
+        """
+        self.refresh()
+        return self.users.get(username)
@@ -0,0 +1,158 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Without fcntl (Windows) processes are not coordinated, as before locking existed
+    fcntl = None
+
+LOCK_FILE = 'clinic/store.lock'
+GENERATION_WIDTH = 20  # Digits of the generation stored in the lock file
+
+class FileLock:
+    """
+    An advisory lock on the data directory shared by every process using it, together
+    with a generation counter that tells readers whether anything changed on disk.
+
+    Readers hold the lock shared, so any number of processes read at the same time;
+    a writer holds it exclusively, so it never interleaves with a reader or another
+    writer. Each writer increments the generation stored in the lock file before it
+    releases the lock, so a process compares one number to know whether it has to
+    look for changes at all.
+
+    Locks nest: a shared or exclusive lock taken while the process already holds the
+    exclusive lock is a no-op, and an exclusive lock taken inside a shared one upgrades
+    it until the inner block ends. Upgrading is not atomic, so callers must check for
+    changes again after taking the exclusive lock. Within a process, threads take turns.
+
+    An flock belongs to an open file, so two instances on the same file would exclude
+    each other even within one process. Use `for_path` to get the single instance of
+    the process.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path: str = LOCK_FILE) -> None:
+        """
+        Initializes the FileLock. The lock file is created on first use.
+
+        Parameters:
+        - path (str): The lock file of the data directory.
+
+        Return Type:
+        - None
+        """
+        self.path = path
+        self.fd = None
+        self.holds = []  # For each block holding the lock, outermost first: whether it is exclusive
+        self.thread_lock = threading.RLock()  # Lets one thread of the process hold the lock at a time
+
+    @classmethod
+    def for_path(cls, path: str = LOCK_FILE) -> 'FileLock':
+        """
+        Returns the lock of a data directory shared by the whole process.
+
+        Parameters:
+        - path (str): The lock file, relative to the current directory.
+
+        Return Type:
+        - FileLock: The process-wide lock on this file.
+        """
+        path = os.path.abspath(path)
+        with cls._instances_lock:
+            if path not in cls._instances:
+                cls._instances[path] = cls(path)
+            return cls._instances[path]
+
+    def _descriptor(self) -> int:
+        if self.fd is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        return self.fd
+
+    @contextmanager
+    def _hold(self, exclusive: bool):
+        with self.thread_lock:
+            fd = self._descriptor()
+            acquired = exclusive and not self.is_exclusive()  # Whether this block takes the exclusive lock
+            if fcntl is not None and (not self.holds or acquired):
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self.holds.append(exclusive)
+            try:
+                yield acquired
+            finally:
+                self.holds.pop()
+                if fcntl is not None:
+                    if not self.holds:
+                        fcntl.flock(fd, fcntl.LOCK_UN)
+                    elif acquired:
+                        # Back to the shared lock of the enclosing block
+                        fcntl.flock(fd, fcntl.LOCK_SH)
+
+    def is_exclusive(self) -> bool:
+        """
+        Checks whether this process holds the lock exclusively.
+        """
+        return any(self.holds)
+
+    def shared(self):
+        """
+        Holds the lock for reading, used as `with lock.shared(): ...`.
+        """
+        return self._hold(False)
+
+    def exclusive(self):
+        """
+        Holds the lock for writing, used as `with lock.exclusive() as acquired: ...`, where
+        `acquired` is True if the block took the exclusive lock rather than nesting in one.
+        """
+        return self._hold(True)
+
+    def generation(self) -> int:
+        """
+        Reads the generation, which every writer increments. Call this while holding the lock.
+
+        Return Type:
+        - int: The current generation, 0 for a new data directory.
+        """
+        data = os.pread(self._descriptor(), GENERATION_WIDTH, 0).strip()
+        return int(data) if data else 0
+
+    def bump(self) -> int:
+        """
+        Increments the generation. Call this while holding the lock exclusively.
+
+        Return Type:
+        - int: The new generation.
+        """
+        generation = self.generation() + 1
+        os.pwrite(self._descriptor(), str(generation).rjust(GENERATION_WIDTH).encode('ascii'), 0)
+        return generation
+
+    def close(self) -> None:
+        """
+        Closes the lock file, releasing the lock if it is held.
+        """
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+            self.holds = []
+
+def file_signature(path: str):
+    """
+    Identifies the version of a file on disk: files are replaced rather than rewritten,
+    so a changed file has another inode, modification time or size.
+
+    Parameters:
+    - path (str): The file to check.
+
+    Return Type:
+    - tuple: (inode, mtime in nanoseconds, size), or None if the file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,287 @@
+import heapq
+import itertools
+from collections import defaultdict
+
+MAX_CANDIDATES = 200      # Maximum number of candidates reranked by edit distance
+MAX_POSTING_SIZE = 5000   # Soundex codes and trigrams shared by more patients than this are only read in part
+
+SOUNDEX_CODES = {}
+for letters, digit in (("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"), ("l", "4"), ("mn", "5"), ("r", "6")):
+    for letter in letters:
+        SOUNDEX_CODES[letter] = digit
+
+def soundex(word: str) -> str:
+    """
+    Computes the American Soundex code of a word, e.g. both "Smith" and "Smyth" give "S530".
+
+    Parameters:
+    - word (str): The word to encode.
+
+    Return Type:
+    - str: The four-character Soundex code, or an empty string if the word has no letters.
+    """
+    letters = [c for c in word.lower() if c.isalpha()]
+    if not letters:
+        return ""
+    code = letters[0].upper()
+    previous = SOUNDEX_CODES.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if letter not in "hw":
+            # Vowels separate repeated codes, 'h' and 'w' do not
+            previous = digit
+    return code.ljust(4, "0")
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Computes the Levenshtein distance between two strings, giving up early past a bound.
+
+    Parameters:
+    - a (str): The first string.
+    - b (str): The second string.
+    - max_distance (int): Distances above this bound are not computed exactly.
+
+    Return Type:
+    - int: The edit distance, or max_distance + 1 if it exceeds max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+def trigrams(token: str) -> set:
+    """
+    Splits a padded token into its character trigrams.
+
+    Parameters:
+    - token (str): A normalized name token.
+
+    Return Type:
+    - set: The trigrams of the token.
+    """
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class FuzzyIndex:
+    """
+    An index for approximate patient name matching.
+
+    Candidates are gathered from a phonetic (Soundex) index of name tokens and from a
+    trigram index, capped at MAX_CANDIDATES, and then reranked by per-token edit distance.
+    Query cost is bounded by the candidate cap rather than by the number of patients.
+    """
+
+    def __init__(self, patients: dict = None) -> None:
+        """
+        Initializes the FuzzyIndex, optionally building it from existing patients.
+
+        Parameters:
+        - patients (dict): Patients keyed by PHN to index.
+
+        Return Type:
+        - None
+        """
+        self.tokens = {}                     # Maps PHN -> name tokens indexed for that PHN
+        self.phonetic = defaultdict(set)     # Maps Soundex code -> PHNs
+        self.trigram_index = defaultdict(set)  # Maps trigram -> PHNs
+        for phn, patient in (patients or {}).items():
+            self.add(phn, patient.name)
+
+    @staticmethod
+    def tokenize(name: str) -> list:
+        """
+        Splits a name into lowercase tokens.
+
+        Parameters:
+        - name (str): The name to split.
+
+        Return Type:
+        - list: The lowercase words of the name.
+        """
+        return str(name or "").lower().split()
+
+    def add(self, phn: int, name: str) -> None:
+        """
+        Indexes a patient name, replacing any name indexed for the same PHN.
+
+        Parameters:
+        - phn (int): The patient's PHN.
+        - name (str): The patient's name.
+
+        Return Type:
+        - None
+        """
+        self.remove(phn)
+        tokens = self.tokenize(name)
+        self.tokens[phn] = tokens
+        for token in tokens:
+            self.phonetic[soundex(token)].add(phn)
+            for trigram in trigrams(token):
+                self.trigram_index[trigram].add(phn)
+
+    def remove(self, phn: int) -> None:
+        """
+        Removes the name indexed for a PHN, if any.
+
+        Parameters:
+        - phn (int): The PHN whose name should be removed.
+
+        Return Type:
+        - None
+        """
+        for token in self.tokens.pop(phn, []):
+            self._discard(self.phonetic, soundex(token), phn)
+            for trigram in trigrams(token):
+                self._discard(self.trigram_index, trigram, phn)
+
+    def search(self, name: str, limit: int) -> list:
+        """
+        Finds the PHNs of patients whose names approximately match the given name.
+
+        Every query token must match some name token either phonetically or within a
+        small edit distance (one edit per three characters, at least one).
+
+        Parameters:
+        - name (str): The possibly misspelled name to look for.
+        - limit (int): The maximum number of PHNs returned.
+
+        Return Type:
+        - list: PHNs ranked from closest to furthest match.
+        """
+        query_tokens = self.tokenize(name)
+        if not query_tokens:
+            return []
+
+        ranked = []
+        for phn in self._candidates(query_tokens):
+            score = self._score(query_tokens, self.tokens[phn])
+            if score is not None:
+                ranked.append((score, " ".join(self.tokens[phn]), phn))
+        ranked.sort()
+        return [phn for _, _, phn in ranked[:limit]]
+
+    def _candidates(self, query_tokens: list) -> list:
+        """
+        Gathers candidate PHNs: phonetic matches first, then the PHNs sharing most trigrams.
+
+        Postings longer than MAX_POSTING_SIZE, such as the Soundex code of a common surname,
+        are not read in full: candidates come from the shorter postings, topped up with at
+        most MAX_POSTING_SIZE PHNs of the shortest long posting, and long postings only add
+        to the score of those candidates. Query cost stays bounded while common names
+        still find their close matches.
+        """
+        postings = []  # (posting, weight) pairs
+        for token in query_tokens:
+            # Phonetic matches outrank any trigram overlap
+            postings.append((self.phonetic.get(soundex(token), set()), MAX_CANDIDATES))
+            postings.extend((self.trigram_index.get(trigram, set()), 1) for trigram in trigrams(token))
+        common = [(posting, weight) for posting, weight in postings if len(posting) > MAX_POSTING_SIZE]
+
+        candidates = defaultdict(int)
+        for posting, weight in postings:
+            if len(posting) <= MAX_POSTING_SIZE:
+                for phn in posting:
+                    candidates[phn] += weight
+        if common and len(candidates) < MAX_CANDIDATES:
+            shortest = min((posting for posting, _ in common), key=len)
+            for phn in itertools.islice(shortest, MAX_POSTING_SIZE):
+                candidates.setdefault(phn, 0)
+        for phn in candidates:
+            candidates[phn] += sum(weight for posting, weight in common if phn in posting)
+        return heapq.nlargest(MAX_CANDIDATES, candidates, key=candidates.__getitem__)
+
+    def substring_candidates(self, text: str):
+        """
+        Finds the PHNs whose names may contain a substring, by intersecting the postings
+        of the substring's trigrams. Every three-character window without whitespace lies
+        inside a single name token, so its trigram is indexed.
+
+        Parameters:
+        - text (str): The substring to look for.
+
+        Return Type:
+        - set: A superset of the PHNs whose names contain the text, or None if the text has
+          no trigram to filter on.
+        """
+        postings = self._substring_postings(text)
+        if postings is None:
+            return None
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    def estimate_substring(self, text: str):
+        """
+        Estimates how many names may contain a substring without computing the candidates.
+
+        Parameters:
+        - text (str): The substring to look for.
+
+        Return Type:
+        - int: The size of the smallest trigram posting, or None if the text has no trigram.
+        """
+        postings = self._substring_postings(text)
+        if postings is None:
+            return None
+        return min(len(posting) for posting in postings)
+
+    def _substring_postings(self, text: str):
+        """
+        Returns the trigram postings of the whitespace-free windows of a substring.
+        """
+        text = str(text or "").lower()
+        windows = {text[i:i + 3] for i in range(len(text) - 2)}
+        windows = {window for window in windows if not any(c.isspace() for c in window)}
+        if not windows:
+            return None
+        return [self.trigram_index.get(window, set()) for window in windows]
+
+    @staticmethod
+    def _score(query_tokens: list, name_tokens: list):
+        """
+        Scores a candidate by the sum of each query token's distance to its closest name
+        token. Phonetic matches cost half an edit less. Returns None if a token has no match.
+        """
+        total = 0.0
+        for query_token in query_tokens:
+            max_distance = max(1, len(query_token) // 3)
+            query_code = soundex(query_token)
+            best = None
+            for name_token in name_tokens:
+                distance = edit_distance(query_token, name_token, max_distance)
+                phonetic_match = soundex(name_token) == query_code
+                if distance > max_distance and not phonetic_match:
+                    continue
+                cost = min(distance, max_distance + 1) - (0.5 if phonetic_match else 0)
+                if best is None or cost < best:
+                    best = cost
+            if best is None:
+                return None
+            total += best
+        return total
+
+    @staticmethod
+    def _discard(index: dict, key: str, phn: int) -> None:
+        """
+        Removes a PHN from a posting set, dropping the set once it is empty.
+        """
+        posting = index.get(key)
+        if posting is not None:
+            posting.discard(phn)
+            if not posting:
+                del index[key]
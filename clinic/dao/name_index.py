@@ -0,0 +1,94 @@
+from bisect import bisect_left, insort
+
+class NameIndex:
+    """
+    A sorted index of normalized patient names, used for "names starting with" lookups.
+
+    Entries are (normalized name, PHN) pairs kept in a sorted list, so a prefix lookup is
+    a binary search followed by a scan of the matching entries: O(log n + k).
+    """
+
+    def __init__(self, patients: dict = None) -> None:
+        """
+        Initializes the NameIndex, optionally building it from existing patients.
+
+        Parameters:
+        - patients (dict): Patients keyed by PHN to index.
+
+        Return Type:
+        - None
+        """
+        self.names = {}    # Maps PHN -> normalized name currently indexed for that PHN
+        self.entries = []  # Sorted list of (normalized name, PHN)
+        if patients:
+            for phn, patient in patients.items():
+                self.names[phn] = self.normalize(patient.name)
+            self.entries = sorted((name, phn) for phn, name in self.names.items())
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """
+        Normalizes a name for indexing: lowercase with single spaces between words.
+
+        Parameters:
+        - name (str): The name to normalize.
+
+        Return Type:
+        - str: The normalized name.
+        """
+        return " ".join(str(name or "").lower().split())
+
+    def add(self, phn: int, name: str) -> None:
+        """
+        Indexes a patient name, replacing any name indexed for the same PHN.
+
+        Parameters:
+        - phn (int): The patient's PHN.
+        - name (str): The patient's name.
+
+        Return Type:
+        - None
+        """
+        self.remove(phn)
+        normalized = self.normalize(name)
+        self.names[phn] = normalized
+        insort(self.entries, (normalized, phn))
+
+    def remove(self, phn: int) -> None:
+        """
+        Removes the name indexed for a PHN, if any.
+
+        Parameters:
+        - phn (int): The PHN whose name should be removed.
+
+        Return Type:
+        - None
+        """
+        normalized = self.names.pop(phn, None)
+        if normalized is None:
+            return
+        position = bisect_left(self.entries, (normalized, phn))
+        if position < len(self.entries) and self.entries[position] == (normalized, phn):
+            del self.entries[position]
+
+    def prefix_search(self, prefix: str, limit: int) -> list:
+        """
+        Finds the PHNs of patients whose normalized name starts with a prefix.
+
+        Parameters:
+        - prefix (str): The beginning of the name.
+        - limit (int): The maximum number of PHNs returned.
+
+        Return Type:
+        - list: PHNs in alphabetical order of name.
+        """
+        normalized = self.normalize(prefix)
+        position = bisect_left(self.entries, (normalized,))
+        phns = []
+        while position < len(self.entries) and len(phns) < limit:
+            name, phn = self.entries[position]
+            if not name.startswith(normalized):
+                break
+            phns.append(phn)
+            position += 1
+        return phns
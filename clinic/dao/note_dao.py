@@ -17,6 +17,18 @@ class NoteDAO(ABC):
         """
         pass
 
+    def search_notes(self, keys):
+        """
+        Searches for several notes by their unique identifiers.
+
+        Parameters:
+        - keys: The unique identifiers of the notes to search for.
+
+        Return Type:
+        - list: The notes in the order of the keys, with None for every key not found.
+        """
+        return [self.search_note(key) for key in keys]
+
     @abstractmethod
     def create_note(self, text):
         """
@@ -1,78 +1,287 @@
 import datetime
-import pickle
+import functools
 from clinic.dao.note_dao import NoteDAO
 from clinic.note import Note
+from clinic.dao.timestamp_index import TimestampIndex
+from clinic.dao.record_format import read_record, write_record
+from clinic.dao.file_lock import file_signature
 import os
 
+def counted_access(method):
+    """
+    Counts a record cache hit when a public operation starts on a hydrated record.
+    Operations called from other operations are not counted again, and a record
+    hydrated by the operation counts as a miss instead.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.operation_depth == 0 and self.cache is not None and self._notes is not None:
+            self.cache.hit(self)
+        self.operation_depth += 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.operation_depth -= 1
+    return wrapper
+
 class NoteDAOPickle(NoteDAO):
     """
     Manages the application's core operations, including user authentication,
     patient data handling, and note management.
+
+    Notes are written in the JSON-lines record format. Legacy pickle files are still
+    read unless `allow_pickle` is disabled, and are rewritten in the new format on
+    the next save.
     """
+    allow_pickle = True  # Set to False once every record file has been migrated
     def __init__(self, phn: str, autosave: bool):
         """
         Initializes a NoteDAOPickle instance for a specific patient.
-        
+
+        When autosave is enabled, notes are not read from disk here: they are
+        hydrated lazily on first access to `notes`.
+
         Parameters:
         - phn (str): The patient's personal health number.
         - autosave (bool): Whether to enable automatic saving of notes.
         """
-        self.notes=[]
-        if not autosave:
-            self.autocounter = 1  # Initialize counter for assigning unique IDs to notes
-        
+        self._notes = None  # None means the notes are not hydrated yet
+        self.autocounter = 1  # Initialize counter for assigning unique IDs to notes
+        self.dirty = False  # True when in-memory notes have changes not yet written to disk
+        self.cache = None  # Optional RecordCache that bounds how many records stay hydrated
+        self._timestamp_index = None  # Note codes ordered by timestamp, built on first time query
+        self._notes_by_code = None  # Maps code -> note, built and kept up to date with the timestamp index
+        self.clinic_note_index = None  # Optional clinic-wide TimestampIndex keyed by (PHN, code)
+        self.compression = None  # Record file compression ('none', 'zlib', 'lzma'), None for uncompressed
+        self.layout = None  # Optional ShardLayout deciding where the record file lives
+        self.deferred = False  # True while an open batch defers saving this record
+        self.signature = None  # Signature of the record file the notes in memory were read from or written to
+        self.operation_depth = 0  # Public operations in progress, so cache hits are counted once per operation
+
         self.autosave = autosave
         self.phn = phn
 
         # Set file path for storing notes
         self.filepath = f'clinic/records/{self.phn}.dat'
-        
-        if self.autosave:
-            # Automatically load notes if autosave is enabled
+
+        if not self.autosave:
+            # Without autosave there is no file to hydrate from, notes live only in memory
+            self._notes = []
+
+    @property
+    def notes(self) -> list:
+        """
+        The list of notes, hydrated from the record file on first access.
+
+        Return Type:
+        - list: The `Note` objects of this record.
+        """
+        if self._notes is None:
             self.load_notes()
+            if self.cache is not None:
+                self.cache.miss(self)
+        elif self.cache is not None:
+            self.cache.touch(self)
+        return self._notes
+
+    @notes.setter
+    def notes(self, notes: list) -> None:
+        self._notes = notes
+        self.dirty = True
+        self._timestamp_index = None
+        self._notes_by_code = None
+        if self.clinic_note_index is not None:
+            self.clinic_note_index.remove_where(lambda key: key[0] == self.phn)
+            for note in notes:
+                self.clinic_note_index.add(note.timestamp, (self.phn, note.code))
+        if self.cache is not None:
+            self.cache.resize(self)
+
+    def notes_in_memory(self) -> list:
+        """
+        Returns the hydrated notes without loading them or touching the cache.
+
+        Return Type:
+        - list: The notes in memory, or an empty list if the record is not hydrated.
+        """
+        return self._notes or []
+
+    def is_hydrated(self) -> bool:
+        """
+        Checks whether the notes of this record are currently loaded in memory.
+
+        Return Type:
+        - bool: True if the notes are in memory, False otherwise.
+        """
+        return self._notes is not None
+
+    def dehydrate(self):
+        """
+        Releases the in-memory notes so they are reloaded from disk on next access.
+
+        Dirty notes are flushed first. Records without autosave have no backing
+        file, so they are kept in memory.
+        """
+        if not self.autosave or self._notes is None or self.deferred:
+            return
+        if self.dirty:
+            self.save_notes()
+        self._notes = None
+        self._timestamp_index = None
+        self._notes_by_code = None
+
+    def discard_if_changed(self) -> bool:
+        """
+        Releases the in-memory notes if another process replaced the record file since
+        they were read, so they are reloaded on next access. Unsaved changes are kept.
+
+        Return Type:
+        - bool: True if the notes were released, False otherwise.
+        """
+        if not self.autosave or self._notes is None or self.dirty or self.deferred:
+            return False
+        if file_signature(self.filepath) == self.signature:
+            return False
+        self._notes = None
+        self._timestamp_index = None
+        self._notes_by_code = None
+        return True
 
     def load_notes(self):
         """
-        Loads notes from the pickle file corresponding to the patient's PHN.
-        
-        If the file does not exist, initializes an empty notes list and resets the counter.
-        Updates the autocounter based on the highest existing note ID.
+        Loads notes from the record file corresponding to the patient's PHN.
+
+        If the file does not exist, initializes an empty notes list.
+        Updates the autocounter based on the highest existing note ID. The counter never
+        moves backwards, so codes stay unique when a record is rehydrated after eviction.
         """
         try:
             with open(self.filepath, 'rb') as f:
-                data = pickle.load(f)
-                self.notes = data.get('notes',[])
-                # Set the autocounter to the next available ID
-                if self.notes:
-                    self.autocounter = max(note.code for note in self.notes)+1 if self.notes else 1
+                data = read_record(f, self.allow_pickle)  # Handles JSON-lines records and legacy pickle files
+                self._notes = data.get('notes',[])
         except FileNotFoundError:
             # Initialize an empty notes list if no file exists
-            self.notes = []
-            self.autocounter = 1
+            self._notes = []
+        self.signature = file_signature(self.filepath)
+        self._timestamp_index = None
+        self._notes_by_code = None
+        # Set the autocounter to the next available ID
+        if self._notes:
+            self.autocounter = max(self.autocounter, max(note.code for note in self._notes)+1)
+        self.dirty = False
 
     def save_notes(self):
         """
-        Saves all notes to a file using pickle.
-        
+        Saves all notes to a file in the JSON-lines record format.
+
         This method writes the current list of notes to a file identified by the PHN.
         It is only executed if autosave is enabled.
         """
-        if not os.path.exists("clinic/records"):
+        if not os.path.exists(os.path.dirname(self.filepath)):
             # Create the directory
-            os.makedirs("clinic/records")
+            os.makedirs(os.path.dirname(self.filepath))
+
+        if self.autosave and self._notes is not None:
+            # Write a new file and move it into place: the old file is never modified, so a
+            # crash cannot leave a partial record and backup snapshots can hard-link it
+            temporary = self.filepath + '.tmp'
+            with open(temporary, 'wb') as f:
+                data = {'notes': self._notes}
+                write_record(f, data, self.compression)
+            os.replace(temporary, self.filepath)
+            self.signature = file_signature(self.filepath)
+            self.dirty = False
+
+    def rekey(self, phn) -> None:
+        """
+        Moves this record to a new PHN.
+
+        The record file is renamed with `os.replace`, which is atomic within a file
+        system, so the notes are never rewritten and the cost does not depend on
+        how many notes the record holds. A stale file left under the new PHN is replaced.
+
+        Parameters:
+        - phn: The patient's new personal health number.
+        """
+        old_phn = self.phn
+        filepath = self.layout.record_path(phn) if self.layout is not None else f'clinic/records/{phn}.dat'
+        if self.autosave and os.path.exists(self.filepath):
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            os.replace(self.filepath, filepath)
+        self.phn = phn
+        self.filepath = filepath
+        if self.clinic_note_index is not None:
+            self.clinic_note_index.rekey(lambda key: (phn, key[1]) if key[0] == old_phn else key)
 
-        if self.autosave:
-            with open(self.filepath, 'wb') as f:
-                data = {'notes': self.notes}
-                pickle.dump(data, f)
+    def _notes_changed(self):
+        """
+        Persists the notes after a modification and updates their size in the cache.
+        """
+        self.dirty = True
+        if self.autosave and not self.deferred:
+            self.save_notes()
+        if self.cache is not None:
+            self.cache.resize(self)
+
+    def timestamp_index(self) -> TimestampIndex:
+        """
+        Returns the index of this record's note codes ordered by timestamp, building it
+        on first use after the notes are hydrated, along with the map from code to note
+        used to resolve the codes it returns.
+
+        Return Type:
+        - TimestampIndex: The per-patient timestamp index.
+        """
+        notes = self.notes
+        if self._timestamp_index is None:
+            self._timestamp_index = TimestampIndex((note.timestamp, note.code) for note in notes)
+            self._notes_by_code = {note.code: note for note in notes}
+        return self._timestamp_index
 
+    @counted_access
+    def indexed_notes(self, keys) -> list:
+        """
+        Resolves note codes, such as those returned by the timestamp index, through the
+        map kept with the index, without scanning the notes.
+
+        Parameters:
+        - keys (iterable): The unique IDs of the notes.
+
+        Return Type:
+        - list: The `Note` objects of the codes found, in the order of the codes.
+        """
+        self.timestamp_index()
+        notes_by_code = self._notes_by_code
+        return [notes_by_code[key] for key in keys if key in notes_by_code]
+
+    def _index_note(self, note: Note) -> None:
+        """
+        Adds a note to the timestamp indexes that are already built.
+        """
+        if self._timestamp_index is not None:
+            self._timestamp_index.add(note.timestamp, note.code)
+            self._notes_by_code[note.code] = note
+        if self.clinic_note_index is not None:
+            self.clinic_note_index.add(note.timestamp, (self.phn, note.code))
+
+    def _unindex_note(self, note: Note, timestamp) -> None:
+        """
+        Removes a note, indexed under the given timestamp, from the built timestamp indexes.
+        """
+        if self._timestamp_index is not None:
+            self._timestamp_index.remove(timestamp, note.code)
+            self._notes_by_code.pop(note.code, None)
+        if self.clinic_note_index is not None:
+            self.clinic_note_index.remove(timestamp, (self.phn, note.code))
+
+    @counted_access
     def search_note(self, key: int) -> None:
         """
         Searches for a note by its unique code.
-        
+
         Parameters:
         - key (int): The unique ID of the note to search for.
-        
+
         Return Type:
         - Note: Returns the `Note` object if found, otherwise None.
         """
@@ -80,68 +289,143 @@ class NoteDAOPickle(NoteDAO):
             if note.code == key:
                 return note
         return None
-   
+
+    @counted_access
+    def search_notes(self, keys) -> list:
+        """
+        Searches for several notes by their unique codes, hydrating the record and
+        scanning its notes only once.
+
+        Parameters:
+        - keys (iterable): The unique IDs of the notes to search for.
+
+        Return Type:
+        - list: The `Note` objects in the order of the codes, with None for every code not found.
+        """
+        notes_by_code = {note.code: note for note in self.notes}
+        return [notes_by_code.get(key) for key in keys]
+
+    @counted_access
     def create_note(self, text: str) -> Note:
         """
         Creates a new note with the given text.
-        
+
         Parameters:
         - text (str): The content of the new note.
-        
+
         Return Type:
         - Note: The newly created `Note` object.
         """
+        notes = self.notes  # Hydrate first so the autocounter reflects the notes on disk
         new_note = Note(self.autocounter, text,datetime.datetime.now()) # Create a new note with the next available ID and current timestamp
-        self.notes.append(new_note)
+        notes.append(new_note)
         self.autocounter += 1
+        self._index_note(new_note)
 
-        if self.autosave:
-            self.save_notes()
+        self._notes_changed()
         return new_note
-    
+
+    @counted_access
+    def apply_note(self, key: int, text: str, timestamp, version: int = None) -> Note:
+        """
+        Creates or updates a note with a known code and timestamp, as recorded in a
+        mutation log. Used to replay the log when restoring a backup.
+
+        Parameters:
+        - key (int): The unique ID of the note.
+        - text (str): The content of the note.
+        - timestamp (datetime): The timestamp the note had after the logged change.
+        - version (int): The version the note had after the logged change, or None to
+          count it up as an update does.
+
+        Return Type:
+        - Note: The created or updated `Note` object.
+        """
+        note = self.search_note(key)
+        if note is None:
+            note = Note(key, text, timestamp)
+            self.notes.append(note)
+            self.autocounter = max(self.autocounter, key + 1)
+        else:
+            self._unindex_note(note, note.timestamp)
+            note.update_details(text)
+            note.timestamp = timestamp
+        if version is not None:
+            note.version = version
+        self._index_note(note)
+        self._notes_changed()
+        return note
+
+    @counted_access
+    def restore_note(self, note: Note, position: int = None) -> None:
+        """
+        Puts back a copy of a note taken before it was updated or deleted. Used to roll
+        back a batch.
+
+        Parameters:
+        - note (Note): The copy of the note, replacing the note with the same code.
+        - position (int): Where to insert the note if it was deleted, at the end if None.
+        """
+        notes = self.notes
+        for index, current in enumerate(notes):
+            if current.code == note.code:
+                self._unindex_note(current, current.timestamp)
+                notes[index] = note
+                break
+        else:
+            notes.insert(len(notes) if position is None else position, note)
+        self._index_note(note)
+        self._notes_changed()
+
+    @counted_access
     def retrieve_notes(self, search_string: str) -> list[Note]:
         """
         Retrieves all notes containing a specific search string.
-        
+
         Parameters:
         - search_string (str): The text to search for within notes.
-        
+
         Return Type:
         - list: A list of `Note` objects that match the search string.
         """
         # Filter notes that contain the search string (case-insensitive)
         retrieve_notes = [note for note in self.notes if search_string.lower() in note.text.lower()]
         return retrieve_notes
-    
+
+    @counted_access
     def update_note(self, key: int, text: str) -> bool:
         """
         Updates the content of an existing note by its unique code.
-        
+
         Parameters:
         - key (int): The unique ID of the note to update.
         - text (str): The new content for the note.
-        
+
         Return Type:
         - bool: True if the update is successful, False if no note is found.
         """
-        for note in self.notes:
+        notes = self.notes
+        for note in notes:
             if note.code == key:
-                # Update the note's details
+                # Update the note's details, which also refreshes its timestamp
+                old_timestamp = note.timestamp
                 note.update_details(text)
-                if self.autosave:
-                    self.save_notes()
+                self._unindex_note(note, old_timestamp)
+                self._index_note(note)
+                self._notes_changed()
 
-        if not self.notes:
+        if not notes:
             return False
         return True
-        
+
+    @counted_access
     def delete_note(self, key: int) -> bool:
         """
         Deletes a note by its unique code.
-        
+
         Parameters:
         - key (int): The unique ID of the note to delete.
-        
+
         Return Type:
         - bool: True if the note is successfully deleted, False otherwise.
         """
@@ -149,18 +433,63 @@ class NoteDAOPickle(NoteDAO):
         if note_to_delete:
             # Remove the note from the list
             self.notes.remove(note_to_delete)
+            self._unindex_note(note_to_delete, note_to_delete.timestamp)
 
-            if self.autosave:
-                self.save_notes()
+            self._notes_changed()
             return True
         return False
 
-    
+
+    @counted_access
     def list_notes(self) -> list[Note]:
         """
         Lists all notes in reverse order (latest first).
-        
+
         Return Type:
         - list: A list of `Note` objects in reverse chronological order.
         """
-        return list(reversed(self.notes))
\ No newline at end of file
+        return list(reversed(self.notes))
+
+    @counted_access
+    def note_history(self, key: int) -> list:
+        """
+        Retrieves every version of a note, rebuilt from its stored deltas.
+
+        Parameters:
+        - key (int): The unique ID of the note.
+
+        Return Type:
+        - list: (timestamp, text) pairs from the current version to the oldest,
+          or None if no note is found.
+        """
+        note = self.search_note(key)
+        if note is None:
+            return None
+        return note.history()
+
+    @counted_access
+    def retrieve_notes_by_timestamp(self, start=None, end=None) -> list[Note]:
+        """
+        Retrieves the notes written within an inclusive time range.
+
+        Parameters:
+        - start (datetime): The earliest timestamp, or None for no lower bound.
+        - end (datetime): The latest timestamp, or None for no upper bound.
+
+        Return Type:
+        - list: The matching `Note` objects, most recent first.
+        """
+        return self.indexed_notes(self.timestamp_index().range(start, end))
+
+    @counted_access
+    def recent_notes(self, count: int) -> list[Note]:
+        """
+        Retrieves the most recently written notes.
+
+        Parameters:
+        - count (int): The maximum number of notes to return.
+
+        Return Type:
+        - list: Up to `count` `Note` objects, most recent first.
+        """
+        return self.indexed_notes(self.timestamp_index().latest(count))
@@ -16,6 +16,18 @@ class PatientDAO(ABC):
         """
         pass
 
+    def search_patients(self, keys):
+        """
+        Searches for several patients by their unique identifiers.
+
+        Parameters:
+        - keys: The unique identifiers of the patients to search for.
+
+        Return Type:
+        - list: The patients in the order of the keys, with None for every key not found.
+        """
+        return [self.search_patient(key) for key in keys]
+
     @abstractmethod
     def create_patient(self, patient):
         """
@@ -68,4 +80,25 @@ class PatientDAO(ABC):
         Return Type:
         - list: A list of all patient objects.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def query(self, predicates, order_by=None, descending=False, limit=None):
+        """
+        Queries patients matching every predicate.
+
+        This default checks every patient of `list_patients`. DAOs with indexes override
+        it to drive the query from the most selective index.
+
+        Parameters:
+        - predicates: The predicate objects every patient must satisfy.
+        - order_by: The patient attribute to sort by, or None.
+        - descending: Whether to sort in descending order.
+        - limit: The maximum number of patients, or None.
+
+        Return Type:
+        - iterable: The matching patient objects.
+        """
+        patients = [patient for patient in self.list_patients() if all(predicate.matches(patient) for predicate in predicates)]
+        if order_by:
+            patients.sort(key=lambda patient: (getattr(patient, order_by) is None, getattr(patient, order_by)), reverse=descending)
+        return patients if limit is None else patients[:limit]
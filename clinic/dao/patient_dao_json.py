@@ -1,55 +1,607 @@
 import json
+import os
+import threading
+from bisect import bisect_right
+from contextlib import contextmanager, nullcontext
 from clinic.dao.patient_dao import PatientDAO  
 from clinic.dao.patient_encoder import PatientEncoder
 from clinic.dao.patient_decoder import PatientDecoder
+from clinic.dao.record_cache import RecordCache, DEFAULT_MAX_BYTES
+from clinic.dao.query_cache import QueryCache
+from clinic.dao.name_index import NameIndex
+from clinic.dao.fuzzy_index import FuzzyIndex
+from clinic.dao.patient_query import PatientQuery
+from clinic.dao.timestamp_index import TimestampIndex
+from clinic.dao.shard_layout import ShardLayout
+from clinic.dao.file_lock import FileLock, file_signature
+from clinic.dao.secondary_index import HashIndex, SortedIndex, normalize_phone, normalize_email, normalize_birth_date
+
+REKEY_JOURNAL = 'clinic/records/rekey.journal'  # Records a PHN change until the change is logged
+COMPACTION_THRESHOLD = 500  # Log entries after which the log is folded into patients.json
+SCAN_CHUNK_SIZE = 2000  # Patients checked per chunk by scan_patients, with the store held
 
 class PatientDAOJSON(PatientDAO):
     """
     This class allows for operations such as creating, updating, deleting, and searching
     for patient records. Records are stored in a JSON file and can be autosaved after
     each modification if autosave is enabled.
+
+    Autosaving does not rewrite the JSON file on every change: each change appends a
+    small entry to a log next to it, and the log is folded into the JSON file once it
+    holds `compaction_threshold` entries. Loading replays the log over the JSON file.
+    With a sharded `ShardLayout`, every shard has its own JSON file and log.
+
+    Between `begin_batch` and `commit_batch`, log entries and note records are kept in
+    memory and written together at commit, once per file.
+
+    Processes sharing the data directory coordinate through a `FileLock`: reads hold it
+    shared and writes exclusively (see `reading` and `writing`). Before using the
+    patients in memory, a process compares the lock file's generation with the one it
+    last saw; if another process wrote since, it applies only the new log entries, and
+    reloads a shard only when its JSON file was replaced by a compaction.
     """
-    def __init__(self, autosave: bool):
+    def __init__(self, autosave: bool, record_cache_bytes: int = DEFAULT_MAX_BYTES, record_compression: str = None):
         """
         Initializes the PatientDAOJSON instance.
         
         Parameters:
         - autosave (bool): Determines whether changes are automatically saved.
+        - record_cache_bytes (int): Memory budget, in estimated bytes of note text,
+          for the cache of hydrated patient records.
+        - record_compression (str): Compression of note record files ('none', 'zlib', 'lzma'),
+          or None for uncompressed files. Legacy pickle files remain readable.
         """
         self.patients = {}
         self.autosave = autosave
         self.filename = 'clinic/patients.json'
+        self.log_filename = 'clinic/patients.log'  # Changes made since patients.json was last written
+        self.log_entries = 0  # Number of entries in the logs of all shards
+        self.shard_log_entries = {}  # Shard -> number of entries in its log
+        self.layout = ShardLayout.load()  # Where patient metadata and note records are stored
+        self.dirty = set()  # PHNs whose latest state is only in the log
+        self.compaction_threshold = COMPACTION_THRESHOLD
+        self.record_cache = RecordCache(record_cache_bytes)  # Bounds how many patient records keep their notes in memory
+        self.query_cache = QueryCache()  # Results of recent name searches
+        self.generation = 0  # Incremented on every write to invalidate cached query results
+        self.lock = threading.RLock()  # Guards patients and caches against searches running on worker threads
+        self.clinic_note_index = None  # Clinic-wide note timestamps, built on first clinic-wide time query
+        self.record_compression = record_compression
+        self.pending_changes = None  # Encoded log entries of the open batch, None outside a batch
+        self.pending_records = None  # Note DAOs whose saves the open batch defers
+        self.file_lock = FileLock.for_path() if autosave else None  # Coordinates the processes sharing the data directory
+        self.store_generation = None  # Generation of the data directory the patients in memory reflect
+        self.file_signatures = {}  # Shard -> signature of its JSON file when it was read or written
+        self.log_offsets = {}  # Shard -> bytes of its log already applied in memory
+
+        # Load patients from file if available, while no other process writes
+        with self.file_lock.exclusive() if self.file_lock is not None else nullcontext():
+            patients_loaded = self.load_patients()
+            if patients_loaded and self.autosave is not None:
+                self.patients = patients_loaded
+            if self.autosave:
+                self.recover_record_move()
+                self.store_generation = self.file_lock.generation()
+        for patient in self.patients.values():
+            self.attach_patient_record(patient)
+        self.name_index = NameIndex(self.patients)  # Sorted names for prefix autocompletion
+        self.fuzzy_index = FuzzyIndex(self.patients)  # Phonetic and trigram index for misspelled names
+        self.phone_index = HashIndex(normalize_phone)  # Phone digits -> PHNs
+        self.email_index = HashIndex(normalize_email)  # Lowercase email -> PHNs
+        self.birth_date_index = SortedIndex(normalize_birth_date)  # Birth dates in order for range queries
+        for phn, patient in self.patients.items():
+            self.phone_index.add(phn, patient.phone)
+            self.email_index.add(phn, patient.email)
+            self.birth_date_index.add(phn, patient.birth_date)
+
+    def attach_patient_record(self, patient):
+        """
+        Wires the patient's record into the shared record cache and clinic-wide note index.
+
+        Parameters:
+        - patient (Patient): The patient whose record should be attached.
+        """
+        note_dao = patient.get_patient_record().note_dao
+        note_dao.cache = self.record_cache
+        note_dao.clinic_note_index = self.clinic_note_index
+        note_dao.compression = self.record_compression
+        note_dao.layout = self.layout
+        note_dao.filepath = self.layout.record_path(note_dao.phn)
+
+    def index_patient(self, patient):
+        """
+        Adds a patient to every secondary index.
+
+        Parameters:
+        - patient (Patient): The patient to index under its current PHN.
+        """
+        self.name_index.add(patient.phn, patient.name)
+        self.fuzzy_index.add(patient.phn, patient.name)
+        self.phone_index.add(patient.phn, patient.phone)
+        self.email_index.add(patient.phn, patient.email)
+        self.birth_date_index.add(patient.phn, patient.birth_date)
+
+    def unindex_patient(self, key):
+        """
+        Removes a PHN from every secondary index.
+
+        Parameters:
+        - key: The PHN the patient was indexed under.
+        """
+        self.name_index.remove(key)
+        self.fuzzy_index.remove(key)
+        self.phone_index.remove(key)
+        self.email_index.remove(key)
+        self.birth_date_index.remove(key)
+
+    def move_patient_record(self, key, patient):
+        """
+        Moves a patient's record and note file from its old PHN to the patient's new PHN.
+
+        The move is written to a journal first. If the process stops before the change is
+        logged, `recover_record_move` puts the note file back where the saved patients
+        expect it on the next start.
+
+        Parameters:
+        - key: The PHN the patient was stored under.
+        - patient (Patient): The patient, already carrying its new PHN.
+        """
+        record = patient.get_patient_record()
+        if self.autosave:
+            # A batch can move several records before its changes are logged, one line each
+            os.makedirs(os.path.dirname(REKEY_JOURNAL), exist_ok=True)
+            with open(REKEY_JOURNAL, 'a') as journal:
+                journal.write(json.dumps({"old": key, "new": patient.phn}) + "\n")
+                journal.flush()
+                os.fsync(journal.fileno())
+        record.note_dao.rekey(patient.phn)
+        record.phn = patient.phn
+
+    def recover_record_move(self):
+        """
+        Completes or undoes the PHN changes interrupted before they were logged, so the
+        note files match the PHNs of the saved patients. Moves are settled from the
+        newest to the oldest, which undoes a chain of moves step by step.
+        """
+        try:
+            with open(REKEY_JOURNAL, 'r') as journal:
+                lines = journal.readlines()
+        except FileNotFoundError:
+            return
+        for line in reversed(lines):
+            try:
+                move = json.loads(line)
+            except ValueError:
+                # A move whose journal line was cut short never started
+                continue
+            old_path, new_path = self.layout.record_path(move["old"]), self.layout.record_path(move["new"])
+            if move["new"] in self.patients:
+                source, target = old_path, new_path
+            else:
+                source, target = new_path, old_path
+            if os.path.exists(source) and not os.path.exists(target):
+                os.replace(source, target)
+        os.remove(REKEY_JOURNAL)
+
+    @contextmanager
+    def reading(self):
+        """
+        Holds the store for reading, used as `with dao.reading(): ...`: takes the thread
+        lock and the shared file lock, then applies the changes of other processes.
+        Other processes can read at the same time but not write.
+        """
+        with self.lock:
+            if self.file_lock is None:
+                yield
+                return
+            with self.file_lock.shared():
+                self.refresh()
+                yield
+
+    @contextmanager
+    def writing(self):
+        """
+        Holds the store for writing, used as `with dao.writing(): ...`: takes the thread
+        lock and the exclusive file lock, then applies the changes of other processes, so
+        checks made in the block see the latest data. When the block ends, the generation
+        is incremented so other processes look for the changes.
+        """
+        with self.lock:
+            if self.file_lock is None:
+                yield
+                return
+            with self.file_lock.exclusive() as acquired:
+                self.refresh()
+                try:
+                    yield
+                finally:
+                    if acquired:
+                        self.store_generation = self.file_lock.bump()
+
+    def refresh(self):
+        """
+        Brings the patients in memory up to date with what other processes wrote. Call
+        this while holding the file lock.
+
+        Nothing is read unless the generation changed. Then each shard applies the log
+        entries appended since it was last read, or is reloaded if its JSON file was
+        replaced; hydrated note records whose file was replaced are reloaded; and a
+        rebalance to another shard count reloads everything.
+        """
+        if self.file_lock is None:
+            return
+        generation = self.file_lock.generation()
+        if generation == self.store_generation:
+            return
+        self.store_generation = generation
+
+        layout = ShardLayout.load()
+        if layout.shards != self.layout.shards:
+            self.layout = layout
+            self.file_signatures, self.log_offsets = {}, {}
+            self._reload_shards(range(layout.shards))
+            for patient in self.patients.values():
+                self.attach_patient_record(patient)
+        else:
+            for shard in range(self.layout.shards):
+                filename, log_filename = self.shard_files(shard)
+                log_signature = file_signature(log_filename)
+                log_size = log_signature[2] if log_signature else 0
+                if file_signature(filename) != self.file_signatures.get(shard) or log_size < self.log_offsets.get(shard, 0):
+                    self._reload_shards([shard])
+                else:
+                    entries, self.log_offsets[shard], _ = self._read_log(shard, self.log_offsets.get(shard, 0))
+                    for entry in entries:
+                        self._apply_entry(shard, entry)
+
+        for note_dao in list(self.record_cache.records):
+            if note_dao.discard_if_changed():
+                self.record_cache.discard(note_dao)
+        # Notes may have changed in any record, loaded here or not: rebuilt on the next clinic-wide query
+        self.drop_clinic_note_index()
+        self.bump_generation()
+
+    def drop_clinic_note_index(self):
+        """
+        Drops the clinic-wide note index, so `build_clinic_note_index` builds it again from
+        the records on next use. Records are not loaded until then.
+        """
+        if self.clinic_note_index is None:
+            return
+        self.clinic_note_index = None
+        for patient in self.patients.values():
+            patient.get_patient_record().note_dao.clinic_note_index = None
+
+    def _reload_shards(self, shards):
+        """
+        Reads the JSON files and logs of shards again and applies the differences to the
+        patients in memory, keeping the objects of patients that still exist.
+        """
+        fresh = {}
+        for shard in shards:
+            filename, _ = self.shard_files(shard)
+            self.file_signatures[shard] = file_signature(filename)
+            try:
+                with open(filename, "r") as file:
+                    fresh.update(json.load(file, cls=PatientDecoder))
+            except FileNotFoundError:
+                pass
+            entries, self.log_offsets[shard], _ = self._read_log(shard)
+            for entry in entries:
+                fresh.pop(entry["key"], None)
+                if entry["op"] == "put":
+                    fresh[entry["patient"].phn] = entry["patient"]
+            self.log_entries += len(entries) - self.shard_log_entries.get(shard, 0)
+            self.shard_log_entries[shard] = len(entries)
+        shards = set(shards)
+        for phn in [phn for phn in self.patients if self.layout.shard_of(phn) in shards and phn not in fresh]:
+            self._remove_patient(phn)
+        for phn, patient in fresh.items():
+            self._put_patient(phn, patient)
 
-        # Load patients from file if available
-        patients_loaded = self.load_patients()
-        if patients_loaded and self.autosave is not None:
-            self.patients = patients_loaded
+    def _apply_entry(self, shard: int, entry: dict):
+        """
+        Applies a log entry written by another process to the patients in memory.
+        """
+        if entry["op"] == "put":
+            self._put_patient(entry["key"], entry["patient"])
+        else:
+            self._remove_patient(entry["key"])
+        self.dirty.add(entry["key"])
+        self.log_entries += 1
+        self.shard_log_entries[shard] = self.shard_log_entries.get(shard, 0) + 1
+
+    def _put_patient(self, key, patient):
+        """
+        Makes the patients in memory match a patient read from disk, stored under `key`
+        before the change. An existing patient is updated in place, so references held
+        elsewhere, such as a controller's current patient, stay valid.
+        """
+        current = self.patients.get(key)
+        if current is None:
+            current = self.patients.get(patient.phn)
+        if current is None:
+            self.patients[patient.phn] = patient
+            self.attach_patient_record(patient)
+            self.index_patient(patient)
+            return
+        self.unindex_patient(current.phn)
+        if current.phn != patient.phn:
+            # The other process already moved the note file
+            self.patients.pop(current.phn)
+            record = current.get_patient_record()
+            record.note_dao.rekey(patient.phn)
+            record.phn = patient.phn
+        current.phn, current.name, current.birth_date = patient.phn, patient.name, patient.birth_date
+        current.phone, current.email, current.address = patient.phone, patient.email, patient.address
+        current.version = patient.version
+        self.patients[patient.phn] = current
+        self.index_patient(current)
+
+    def _remove_patient(self, key):
+        """
+        Removes a patient from memory, from every index and from the record cache.
+        """
+        if key in self.patients:
+            # Remove the patient record from the dictionary and forget its cached notes
+            self.record_cache.discard(self.patients[key].get_patient_record().note_dao)
+            del self.patients[key]
+            self.unindex_patient(key)
+            if self.clinic_note_index is not None:
+                self.clinic_note_index.remove_where(lambda note_key: note_key[0] == key)
+
+    def bump_generation(self):
+        """
+        Records that the patients changed, invalidating cached search results.
+        """
+        self.generation += 1
         
+    def shard_files(self, shard: int) -> tuple:
+        """
+        Returns the metadata file and change log of a shard.
+
+        Parameters:
+        - shard (int): The shard number.
+
+        Return Type:
+        - tuple: The paths of the shard's JSON file and log.
+        """
+        if not self.layout.is_sharded():
+            return self.filename, self.log_filename
+        return self.layout.patients_path(shard), self.layout.log_path(shard)
+
     def load_patients(self) -> dict:
         """
-        Loads patient records from the JSON file.
+        Loads patient records from the JSON file of every shard, then replays the changes
+        logged since each file was written.
+
+        Return Type:
+        - dict: A dictionary of patient records, empty if no file exists.
+        """
+        for shard in range(self.layout.shards):
+            filename, _ = self.shard_files(shard)
+            self.file_signatures[shard] = file_signature(filename)
+            try:
+                with open(filename,"r") as file:
+                    self.patients.update(json.load(file,cls=PatientDecoder))
+            except FileNotFoundError:
+                # A shard without a file has no saved patients yet
+                pass
+            self.replay_log(shard)
+        return self.patients
+
+    def replay_log(self, shard: int = 0):
+        """
+        Applies the logged changes of a shard to the loaded patients.
+
+        A last line cut short by an interrupted write is ignored, and the log is compacted
+        so that later entries are not appended after it.
+
+        Parameters:
+        - shard (int): The shard whose log to replay.
+        """
+        entries, self.log_offsets[shard], torn = self._read_log(shard)
+        for entry in entries:
+            if entry["op"] == "put":
+                self.patients.pop(entry["key"], None)
+                self.patients[entry["patient"].phn] = entry["patient"]
+                self.dirty.add(entry["patient"].phn)
+            else:
+                self.patients.pop(entry["key"], None)
+                self.dirty.add(entry["key"])
+            self.log_entries += 1
+            self.shard_log_entries[shard] = self.shard_log_entries.get(shard, 0) + 1
+        if torn and self.autosave:
+            self.compact(shard)
+
+    def _read_log(self, shard: int, offset: int = 0) -> tuple:
+        """
+        Reads the entries of a shard's log from a byte offset.
+
+        Parameters:
+        - shard (int): The shard whose log to read.
+        - offset (int): Where to start reading, the end of the entries already applied.
 
         Return Type:
-        - dict: A dictionary of patient records if the file exists, otherwise an empty dictionary.
+        - tuple: The decoded entries, the offset after the last complete entry, and
+          whether the log ends with a line cut short by an interrupted write.
         """
+        entries = []
+        torn = False
         try:
-            with open("clinic/patients.json","r") as file:
-                self.patients = json.load(file,cls=PatientDecoder)
+            log = open(self.shard_files(shard)[1], "rb")
         except FileNotFoundError:
-            # Return an empty dictionary if the file does not exist
-            return {}
+            return entries, 0, torn
+        with log:
+            log.seek(offset)
+            for line in log:
+                try:
+                    entries.append(json.loads(line, cls=PatientDecoder))
+                except ValueError:
+                    torn = True
+                    break
+                offset += len(line)
+                if not line.endswith(b"\n"):
+                    # Complete but unterminated: the next append would run into it
+                    torn = True
+        return entries, offset, torn
+
+    def log_change(self, op: str, key, patient=None):
+        """
+        Appends one change to the log of the patient's shard, compacting that shard when
+        its log reaches the threshold.
+
+        The cost of a change is one small append, whatever the number of patients. A PHN
+        change that crosses shards is logged as a delete in the old shard and a put in
+        the new one, so each log only ever refers to PHNs of its own shard.
+
+        Parameters:
+        - op (str): "put" for a created or updated patient, "delete" for a deleted one.
+        - key: The PHN the patient was stored under before the change.
+        - patient (Patient): The patient after the change, for "put".
+        """
+        entries = []
+        if patient is not None and self.layout.shard_of(key) != self.layout.shard_of(patient.phn):
+            entries.append({"op": "delete", "key": key})
+            key = patient.phn
+        entry = {"op": op, "key": key}
+        if patient is not None:
+            entry["patient"] = patient
+            self.dirty.add(patient.phn)
+        entries.append(entry)
+        # Encode now: a batch may change the patient again before its entries are written
+        lines = [(self.layout.shard_of(entry["key"]), entry["key"], json.dumps(entry, cls=PatientEncoder) + "\n") for entry in entries]
+        if self.pending_changes is not None:
+            self.pending_changes.extend(lines)
+        else:
+            self._append_to_log(lines)
+
+    def _append_to_log(self, lines: list):
+        """
+        Writes encoded entries to the logs of their shards, with one write per shard, and
+        compacts each shard whose log reaches the threshold.
+
+        Parameters:
+        - lines (list): (shard, key, encoded entry) tuples, in the order of the changes.
+        """
+        by_shard = {}
+        for shard, key, line in lines:
+            self.dirty.add(key)
+            by_shard.setdefault(shard, []).append(line)
+        for shard, shard_lines in by_shard.items():
+            log_filename = self.shard_files(shard)[1]
+            os.makedirs(os.path.dirname(log_filename) or ".", exist_ok=True)
+            with open(log_filename, "a") as log:
+                log.write("".join(shard_lines))
+                self.log_offsets[shard] = log.tell()
+            self.log_entries += len(shard_lines)
+            self.shard_log_entries[shard] = self.shard_log_entries.get(shard, 0) + len(shard_lines)
+            if self.shard_log_entries[shard] >= self.compaction_threshold:
+                self.compact(shard)
+
+    def begin_batch(self):
+        """
+        Starts deferring persistence: until `commit_batch` or `rollback_batch`, changes
+        are applied in memory only. Call this while holding the lock, and keep holding it
+        until the batch ends.
+        """
+        self.pending_changes = []
+        self.pending_records = set()
+
+    def defer_record(self, note_dao):
+        """
+        Defers the saves of a note record until the open batch ends. Deferred records
+        stay in memory, even if the record cache would evict them.
+
+        Parameters:
+        - note_dao (NoteDAOPickle): The note DAO about to be changed in the batch.
+        """
+        if self.pending_records is not None:
+            note_dao.deferred = True
+            self.pending_records.add(note_dao)
 
-    def save_patients(self):
+    def commit_batch(self):
         """
-        Saves all patient records to the JSON file.
+        Persists the changes of the open batch: every changed note record is saved once
+        and the log entries are appended with one write per shard.
+        """
+        lines, records = self.pending_changes, self.pending_records
+        self.pending_changes = self.pending_records = None
+        self._save_records(records)
+        if lines:
+            self._append_to_log(lines)
+        if self.autosave and os.path.exists(REKEY_JOURNAL):
+            # The saved patients now match the renamed note files
+            os.remove(REKEY_JOURNAL)
 
-        This method writes the current state of the `patients` dictionary to a JSON file,
+    def rollback_batch(self):
+        """
+        Ends the open batch without logging its changes. The caller has already undone
+        the changes in memory; the deferred records are saved so their files match.
+        """
+        records = self.pending_records
+        self.pending_changes = self.pending_records = None
+        self._save_records(records)
+        if self.autosave and os.path.exists(REKEY_JOURNAL):
+            # Undoing the batch moved the note files back
+            os.remove(REKEY_JOURNAL)
+
+    def _save_records(self, records):
+        """
+        Stops deferring the saves of note records and saves the changed ones, skipping
+        the records of patients that no longer exist.
+        """
+        for note_dao in records or ():
+            note_dao.deferred = False
+            patient = self.patients.get(note_dao.phn)
+            if note_dao.dirty and patient is not None and patient.get_patient_record().note_dao is note_dao:
+                note_dao.save_notes()
+
+    def compact(self, shard: int = None):
+        """
+        Folds the log of a shard, or of every shard, into its JSON file and empties the log.
+
+        The JSON file is replaced before the log is removed. Replaying a log over a
+        JSON file that already contains its changes gives the same patients, so a
+        crash in between loses nothing.
+
+        Parameters:
+        - shard (int): The shard to compact, or None for every shard.
+        """
+        with self.writing():
+            shards = range(self.layout.shards) if shard is None else [shard]
+            for shard in shards:
+                self.save_patients(shard)
+                log_filename = self.shard_files(shard)[1]
+                if os.path.exists(log_filename):
+                    os.remove(log_filename)
+                self.log_offsets[shard] = 0
+                self.log_entries -= self.shard_log_entries.pop(shard, 0)
+                self.dirty = {phn for phn in self.dirty if self.layout.shard_of(phn) != shard}
+
+    def save_patients(self, shard: int = None):
+        """
+        Saves the patient records of a shard, or of every shard, to their JSON files.
+
+        This method writes the current state of the `patients` dictionary to JSON files,
         ensuring data persistence if autosave is enabled.
+
+        Parameters:
+        - shard (int): The shard to save, or None for every shard.
         """
-        if self.autosave is not None:
-            self.autosave
-        with open(self.filename,"w") as file:
-            json.dump(self.patients, file, cls=PatientEncoder)
+        shards = range(self.layout.shards) if shard is None else [shard]
+        for shard in shards:
+            filename = self.shard_files(shard)[0]
+            if self.layout.is_sharded():
+                patients = {phn: patient for phn, patient in self.patients.items() if self.layout.shard_of(phn) == shard}
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+            else:
+                patients = self.patients
+            # Write a temporary file and move it over the old one, so a crash never leaves a partial file
+            temporary = filename + '.tmp'
+            with open(temporary,"w") as file:
+                json.dump(patients, file, cls=PatientEncoder)
+            os.replace(temporary, filename)
+            self.file_signatures[shard] = file_signature(filename)
       
     def search_patient(self, key: str):
         """
@@ -61,7 +613,22 @@ class PatientDAOJSON(PatientDAO):
         Return Type:
         - Patient: The patient object if found, otherwise None.
         """
-        return self.patients.get(key)
+        with self.reading():
+            return self.patients.get(key)
+
+    def search_patients(self, keys) -> list:
+        """
+        Searches for several patients by their PHNs at once, under one lock acquisition.
+
+        Parameters:
+        - keys (iterable): The PHNs of the patients to search for.
+
+        Return Type:
+        - list: The patients in the order of the PHNs, with None for every PHN not found.
+        """
+        with self.reading():
+            patients = self.patients
+            return [patients.get(key) for key in keys]
 
     def create_patient(self,patient):
         """
@@ -70,11 +637,15 @@ class PatientDAOJSON(PatientDAO):
         Parameters:
         - patient (Patient): The patient object to be added.
         """
-        # Add the patient to the dictionary using their PHN as the key
-        self.patients[patient.phn] = patient
+        with self.writing():
+            # Add the patient to the dictionary using their PHN as the key
+            self.patients[patient.phn] = patient
+            self.attach_patient_record(patient)
+            self.index_patient(patient)
+            self.bump_generation()
 
-        if self.autosave:
-            self.save_patients()
+            if self.autosave:
+                self.log_change("put", patient.phn, patient)
 
     def retrieve_patients(self, search_string: str) -> list:
         """
@@ -86,27 +657,184 @@ class PatientDAOJSON(PatientDAO):
         Return Type:
         - list: A list of patients matching the search string, or an empty list if none match.
         """
-        # Perform a case-insensitive search in patient names
-        matching_patients = [patient for patient in self.patients.values() if search_string.lower() in patient.name.lower()]
+        with self.reading():
+            key = self.query_cache.normalize(search_string)
+            cached_patients = self.query_cache.get(key, self.generation)
+            if cached_patients is not None:
+                return list(cached_patients)
+
+            # Narrow the results of a cached shorter search instead of scanning every patient
+            candidates = self.query_cache.get_superset(key, self.generation)
+            if candidates is None:
+                candidates = self.patients.values()
+
+            # Perform a case-insensitive search in patient names
+            matching_patients = [patient for patient in candidates if key in patient.name.lower()]
+            self.query_cache.put(key, matching_patients, self.generation)
+
+            if matching_patients:
+                return list(matching_patients)
+            return []
+
+    def scan_patients(self, search_string: str, chunk_size: int = SCAN_CHUNK_SIZE):
+        """
+        Retrieves the patients whose names contain the specified search string, one chunk
+        of candidates at a time, for callers that show results while the search runs.
+
+        The candidates are narrowed through the cached superset or the trigram index when
+        they fit in a chunk; otherwise the name index is walked from where the previous
+        chunk stopped. The store is only held while one chunk is read, so writers and other
+        readers get their turn between chunks, and a caller can stop the scan after any
+        chunk. Patients deleted during the scan are skipped.
+
+        Parameters:
+        - search_string (str): The string to search for in patient names.
+        - chunk_size (int): The number of candidates checked per chunk.
+
+        Return Type:
+        - iterator: Lists of matching patients, one per chunk, some possibly empty.
+        """
+        with self.reading():
+            key = self.query_cache.normalize(search_string)
+            generation = self.generation
+            cached_patients = self.query_cache.get(key, generation)
+            if cached_patients is not None:
+                cached_patients = list(cached_patients)
+            else:
+                candidates = self.query_cache.get_superset(key, generation)
+                if candidates is not None:
+                    candidates = [patient.phn for patient in candidates]
+                else:
+                    estimate = self.fuzzy_index.estimate_substring(key)
+                    if estimate is not None and estimate <= chunk_size:
+                        candidates = list(self.fuzzy_index.substring_candidates(key))
+        if cached_patients is not None:
+            yield cached_patients
+            return
+
+        matching_patients = []
+        position = 0
+        last_entry = None  # The name index entry after which the walk resumes
+        while True:
+            with self.reading():
+                if candidates is not None:
+                    phns = candidates[position:position + chunk_size]
+                    position += chunk_size
+                else:
+                    entries = self.name_index.entries
+                    start = 0 if last_entry is None else bisect_right(entries, last_entry)
+                    page = entries[start:start + chunk_size]
+                    phns = [phn for _, phn in page]
+                    if page:
+                        last_entry = page[-1]
+                if not phns:
+                    break
+                chunk = [self.patients.get(phn) for phn in phns]
+                chunk = [patient for patient in chunk if patient is not None and key in patient.name.lower()]
+                if self.generation != generation:
+                    generation = None  # Changed during the scan, the results are not cached
+            matching_patients.extend(chunk)
+            yield chunk
+        if generation is not None:
+            with self.reading():
+                self.query_cache.put(key, matching_patients, generation)
+
+    def autocomplete_patients(self, prefix: str, limit: int) -> list:
+        """
+        Retrieves patients whose names start with the specified prefix, using the name index.
+
+        Parameters:
+        - prefix (str): The beginning of the patient name (case-insensitive).
+        - limit (int): The maximum number of patients returned.
+
+        Return Type:
+        - list: Matching patients in alphabetical order of name.
+        """
+        with self.reading():
+            return [self.patients[phn] for phn in self.name_index.prefix_search(prefix, limit)]
+
+    def fuzzy_search_patients(self, name: str, limit: int) -> list:
+        """
+        Retrieves patients whose names approximately match the specified name,
+        tolerating misspellings and names that sound alike.
+
+        Parameters:
+        - name (str): The possibly misspelled patient name.
+        - limit (int): The maximum number of patients returned.
+
+        Return Type:
+        - list: Matching patients ranked from closest to furthest match.
+        """
+        with self.reading():
+            return [self.patients[phn] for phn in self.fuzzy_index.search(name, limit)]
 
-        if matching_patients:
-            return matching_patients
-        return []
+    def search_patients_by_phone(self, phone: str) -> list:
+        """
+        Retrieves patients by phone number, ignoring spaces and punctuation.
+
+        Parameters:
+        - phone (str): The phone number to look for.
+
+        Return Type:
+        - list: The patients with this phone number.
+        """
+        with self.reading():
+            return [self.patients[phn] for phn in self.phone_index.lookup(phone)]
+
+    def search_patients_by_email(self, email: str) -> list:
+        """
+        Retrieves patients by email address (case-insensitive).
+
+        Parameters:
+        - email (str): The email address to look for.
+
+        Return Type:
+        - list: The patients with this email address.
+        """
+        with self.reading():
+            return [self.patients[phn] for phn in self.email_index.lookup(email)]
+
+    def retrieve_patients_by_birth_date(self, start: str = None, end: str = None) -> list:
+        """
+        Retrieves patients born within an inclusive date range.
+
+        Parameters:
+        - start (str): The earliest birth date ('YYYY-MM-DD'), or None for no lower bound.
+        - end (str): The latest birth date ('YYYY-MM-DD'), or None for no upper bound.
+
+        Return Type:
+        - list: The matching patients ordered by birth date.
+        """
+        with self.reading():
+            return [self.patients[phn] for phn in self.birth_date_index.range(start, end)]
 
     def update_patient(self, key: str, patient):
         """
         Updates an existing patient's record.
+
+        If the patient's PHN differs from the key, the patient is moved to the new PHN.
         
         Parameters:
         - key (str): The PHN of the patient to update.
         - patient (Patient): The updated patient object.
         """
-        if key in self.patients:
-            # Replace the patient record with the updated object
-            self.patients[key] = patient
+        with self.writing():
+            moved = key in self.patients and key != patient.phn
+            if key in self.patients:
+                # Replace the patient record with the updated object, re-keying it if its PHN changed
+                if moved:
+                    self.move_patient_record(key, patient)
+                self.patients.pop(key)
+                self.patients[patient.phn] = patient
+                self.unindex_patient(key)
+                self.index_patient(patient)
+            self.bump_generation()
 
-        if self.autosave:
-            self.save_patients()
+            if self.autosave:
+                self.log_change("put", key, patient)
+                if moved and self.pending_changes is None:
+                    # The saved patients now match the renamed note file
+                    os.remove(REKEY_JOURNAL)
     
     def delete_patient(self, key: str):
         """
@@ -115,12 +843,12 @@ class PatientDAOJSON(PatientDAO):
         Parameters:
         - key (str): The PHN of the patient to delete.
         """
-        if key in self.patients:
-            # Remove the patient record from the dictionary
-            del self.patients[key]
+        with self.writing():
+            self._remove_patient(key)
+            self.bump_generation()
             
-        if self.autosave:
-            self.save_patients()
+            if self.autosave:
+                self.log_change("delete", key)
 
     def list_patients(self):
         """
@@ -129,4 +857,68 @@ class PatientDAOJSON(PatientDAO):
         Return Type:
         - list: A list of all patient objects in the system.
         """
-        return list(self.patients.values())
\ No newline at end of file
+        with self.reading():
+            return list(self.patients.values())
+
+    def query(self, predicates, order_by=None, descending=False, limit=None):
+        """
+        Queries patients matching every predicate, driving the search from the most
+        selective index available.
+
+        Parameters:
+        - predicates (list): The Predicate objects every patient must satisfy.
+        - order_by (str): The patient attribute to sort by, or None to keep index order.
+        - descending (bool): Whether to sort in descending order.
+        - limit (int): The maximum number of patients, or None for no limit.
+
+        Return Type:
+        - PatientQuery: A lazy iterable of matching patients; `explain()` shows the chosen plan.
+        """
+        return PatientQuery(self, predicates, order_by, descending, limit)
+
+    def build_clinic_note_index(self) -> TimestampIndex:
+        """
+        Returns the clinic-wide index of note timestamps, building it on first use.
+
+        Building reads every patient record once through the record cache; afterwards
+        the note DAOs keep the index up to date as notes are created, updated or deleted.
+
+        Return Type:
+        - TimestampIndex: The index of (PHN, note code) keys ordered by timestamp.
+        """
+        with self.reading():
+            if self.clinic_note_index is None:
+                self.clinic_note_index = TimestampIndex(
+                    (note.timestamp, (patient.get_patient_record().note_dao.phn, note.code))
+                    for patient in self.patients.values()
+                    for note in patient.get_patient_record().note_dao.notes
+                )
+                for patient in self.patients.values():
+                    self.attach_patient_record(patient)
+            return self.clinic_note_index
+
+    def retrieve_notes_by_timestamp(self, start=None, end=None, limit: int = None) -> list:
+        """
+        Retrieves the notes of every patient written within an inclusive time range.
+
+        Parameters:
+        - start (datetime): The earliest timestamp, or None for no lower bound.
+        - end (datetime): The latest timestamp, or None for no upper bound.
+        - limit (int): The maximum number of notes, or None for no limit.
+
+        Return Type:
+        - list: (Patient, Note) pairs, most recent first.
+        """
+        with self.reading():
+            keys = self.build_clinic_note_index().range(start, end)
+            if limit is not None:
+                keys = keys[:limit]
+            results = []
+            for phn, code in keys:
+                patient = self.patients.get(phn)
+                if patient is None:
+                    continue
+                # Resolved through the code map each record keeps with its timestamp index
+                for note in patient.get_patient_record().note_dao.indexed_notes((code,)):
+                    results.append((patient, note))
+            return results
\ No newline at end of file
@@ -43,7 +43,7 @@ class PatientDecoder(json.JSONDecoder):
             patient_records = self._convert_records_to_patient_records(records, PatientRecord, Note)
 
             # Return a Patient object with the extracted attributes
-            return Patient(
+            patient = Patient(
                 phn=int_converted_key["phn"],
                 name=int_converted_key["name"],
                 birth_date=int_converted_key.get("birth_date"),
@@ -52,6 +52,8 @@ class PatientDecoder(json.JSONDecoder):
                 address=int_converted_key.get("address"),
                 autosave=True, # Assuming autosave is always enabled
             )
+            patient.version = int_converted_key.get("version", 1)  # Files written before versions existed start at 1
+            return patient
         
         # Return the processed dictionary if it doesn't match Patient attributes
         return int_converted_key
@@ -40,6 +40,7 @@ class PatientEncoder(json.JSONEncoder):
                 "phone_number": obj.phone,
                 "email": obj.email,
                 "address": obj.address,
+                "version": obj.version,
             }
         
         elif isinstance(obj, PatientRecord):
@@ -0,0 +1,225 @@
+import heapq
+from abc import ABC, abstractmethod
+from clinic.dao.secondary_index import normalize_phone, normalize_email
+
+class Predicate(ABC):
+    """
+    A condition on patients, combinable with other predicates in a PatientQuery.
+
+    Subclasses implement `matches` and may implement `access_path` when an index of the
+    DAO can produce the candidates for the predicate.
+    """
+
+    @abstractmethod
+    def matches(self, patient) -> bool:
+        """
+        Checks whether a patient satisfies the predicate.
+
+        Parameters:
+        - patient (Patient): The patient to check.
+
+        Return Type:
+        - bool: True if the patient satisfies the predicate, False otherwise.
+        """
+        pass
+
+    def access_path(self, dao):
+        """
+        Describes how an index of the DAO can produce the candidates for this predicate.
+
+        Parameters:
+        - dao (PatientDAOJSON): The DAO whose indexes can be used.
+
+        Return Type:
+        - tuple: (estimated rows, function returning candidate PHNs, description),
+          or None if no index applies.
+        """
+        return None
+
+class PhnEquals(Predicate):
+    """ The patient has the given PHN. """
+
+    def __init__(self, phn: int) -> None:
+        self.phn = phn
+
+    def matches(self, patient) -> bool:
+        return patient.phn == self.phn
+
+    def access_path(self, dao):
+        return (1, lambda: [self.phn] if self.phn in dao.patients else [], f"primary key lookup phn = {self.phn}")
+
+    def __str__(self) -> str:
+        return f"phn = {self.phn}"
+
+class NameContains(Predicate):
+    """ The patient's name contains the given text (case-insensitive). """
+
+    def __init__(self, text: str) -> None:
+        self.text = text.lower()
+
+    def matches(self, patient) -> bool:
+        return self.text in str(patient.name or "").lower()
+
+    def access_path(self, dao):
+        estimate = dao.fuzzy_index.estimate_substring(self.text)
+        if estimate is None:
+            return None
+        return (estimate, lambda: dao.fuzzy_index.substring_candidates(self.text), f"name trigram index '{self.text}'")
+
+    def __str__(self) -> str:
+        return f"name contains '{self.text}'"
+
+class BirthDateBetween(Predicate):
+    """ The patient was born between two dates, both inclusive. Either bound may be None. """
+
+    def __init__(self, start: str = None, end: str = None) -> None:
+        self.start = start
+        self.end = end
+
+    def matches(self, patient) -> bool:
+        birth_date = str(patient.birth_date or "").strip()
+        if not birth_date:
+            return False
+        return (self.start is None or birth_date >= self.start) and (self.end is None or birth_date <= self.end)
+
+    def access_path(self, dao):
+        estimate = dao.birth_date_index.count_range(self.start, self.end)
+        return (estimate, lambda: dao.birth_date_index.range(self.start, self.end), f"birth date range index [{self.start}, {self.end}]")
+
+    def __str__(self) -> str:
+        return f"birth date between {self.start} and {self.end}"
+
+class PhoneEquals(Predicate):
+    """ The patient has the given phone number, ignoring formatting. """
+
+    def __init__(self, phone: str) -> None:
+        self.phone = phone
+
+    def matches(self, patient) -> bool:
+        return normalize_phone(patient.phone) == normalize_phone(self.phone)
+
+    def access_path(self, dao):
+        phns = dao.phone_index.lookup(self.phone)
+        return (len(phns), lambda: phns, f"phone hash index '{self.phone}'")
+
+    def __str__(self) -> str:
+        return f"phone = '{self.phone}'"
+
+class EmailEquals(Predicate):
+    """ The patient has the given email address (case-insensitive). """
+
+    def __init__(self, email: str) -> None:
+        self.email = email
+
+    def matches(self, patient) -> bool:
+        return normalize_email(patient.email) == normalize_email(self.email)
+
+    def access_path(self, dao):
+        phns = dao.email_index.lookup(self.email)
+        return (len(phns), lambda: phns, f"email hash index '{self.email}'")
+
+    def __str__(self) -> str:
+        return f"email = '{self.email}'"
+
+class EmailDomain(Predicate):
+    """ The patient's email address belongs to the given domain (case-insensitive). """
+
+    def __init__(self, domain: str) -> None:
+        self.domain = domain.lower().lstrip("@")
+
+    def matches(self, patient) -> bool:
+        return str(patient.email or "").strip().lower().endswith("@" + self.domain)
+
+    def __str__(self) -> str:
+        return f"email domain '{self.domain}'"
+
+class PatientQuery:
+    """
+    A lazy query over the patients of a DAO, combining predicates with AND.
+
+    A simple planner picks the predicate whose index yields the fewest estimated rows
+    (falling back to a full scan), fetches its candidates and filters them with the
+    remaining predicates. Results are produced lazily when the query is iterated.
+    """
+
+    def __init__(self, dao, predicates, order_by: str = None, descending: bool = False, limit: int = None) -> None:
+        """
+        Initializes the PatientQuery.
+
+        Parameters:
+        - dao (PatientDAOJSON): The DAO to query.
+        - predicates (list): The Predicate objects every result must satisfy.
+        - order_by (str): The patient attribute to sort by, or None to keep index order.
+        - descending (bool): Whether to sort in descending order.
+        - limit (int): The maximum number of results, or None for no limit.
+
+        Return Type:
+        - None
+        """
+        self.dao = dao
+        self.predicates = list(predicates)
+        self.order_by = order_by
+        self.descending = descending
+        self.limit = limit
+
+    def plan(self):
+        """
+        Chooses the most selective access path among the predicates.
+
+        Return Type:
+        - tuple: (driving predicate or None, estimated rows, candidate function, description).
+        """
+        with self.dao.reading():
+            best = (None, len(self.dao.patients), lambda: list(self.dao.patients), "full scan")
+            for predicate in self.predicates:
+                path = predicate.access_path(self.dao)
+                if path is not None and path[0] < best[1]:
+                    best = (predicate, path[0], path[1], path[2])
+            return best
+
+    def explain(self) -> str:
+        """
+        Describes the plan chosen for this query.
+
+        Return Type:
+        - str: The access path, estimated rows, remaining filters, ordering and limit.
+        """
+        driver, estimate, _, description = self.plan()
+        lines = [f"{description} (estimated rows: {estimate})"]
+        filters = [str(predicate) for predicate in self.predicates if predicate is not driver]
+        if filters:
+            lines.append("filter: " + " AND ".join(filters))
+        if self.order_by:
+            lines.append(f"order by {self.order_by}{' desc' if self.descending else ''}")
+        if self.limit is not None:
+            lines.append(f"limit {self.limit}")
+        return "\n".join(lines)
+
+    def __iter__(self):
+        """
+        Runs the plan and yields matching patients lazily.
+
+        Return Type:
+        - iterator: The matching Patient instances.
+        """
+        _, _, candidates, _ = self.plan()
+        # Index candidates may be a superset (e.g. the trigram index), so every predicate is checked
+        filters = self.predicates
+        with self.dao.reading():
+            # Snapshot the candidates so iteration does not hold the DAO lock
+            patients = [self.dao.patients[phn] for phn in candidates() if phn in self.dao.patients]
+        matching = (patient for patient in patients if all(predicate.matches(patient) for predicate in filters))
+
+        if self.order_by:
+            key = lambda patient: (getattr(patient, self.order_by) is None, getattr(patient, self.order_by))
+            if self.limit is not None:
+                select = heapq.nlargest if self.descending else heapq.nsmallest
+                yield from select(self.limit, matching, key=key)
+            else:
+                yield from sorted(matching, key=key, reverse=self.descending)
+            return
+
+        for count, patient in enumerate(matching):
+            if self.limit is not None and count >= self.limit:
+                return
+            yield patient
@@ -0,0 +1,125 @@
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 128  # Default number of search strings whose results are kept
+
+class QueryCache:
+    """
+    A bounded least-recently-used cache of patient search results.
+
+    Entries are keyed by the normalized search string and are only valid for the write
+    generation they were computed at: once the DAO records a write, every entry is dropped.
+    A query extending a cached search string can be answered by filtering the cached
+    superset instead of scanning every patient.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        """
+        Initializes an empty QueryCache.
+
+        Parameters:
+        - max_entries (int): The maximum number of search strings kept in the cache.
+
+        Return Type:
+        - None
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # Maps normalized search string -> list of patients
+        self.generation = 0           # Write generation the cached entries belong to
+        self.hits = 0
+        self.misses = 0
+        self.narrowed = 0
+
+    @staticmethod
+    def normalize(search_string: str) -> str:
+        """
+        Normalizes a search string into a cache key.
+
+        Parameters:
+        - search_string (str): The raw search string.
+
+        Return Type:
+        - str: The lowercase search string.
+        """
+        return search_string.lower()
+
+    def get(self, key: str, generation: int) -> list:
+        """
+        Looks up the cached results for a search string.
+
+        Parameters:
+        - key (str): The normalized search string.
+        - generation (int): The current write generation of the DAO.
+
+        Return Type:
+        - list: The cached patients, or None if the string is not cached.
+        """
+        self._check_generation(generation)
+        results = self.entries.get(key)
+        if results is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return results
+
+    def get_superset(self, key: str, generation: int) -> list:
+        """
+        Finds the cached results of the longest cached prefix of a search string.
+
+        Any patient whose name contains the search string also contains its prefixes,
+        so these results are a superset of the answer.
+
+        Parameters:
+        - key (str): The normalized search string.
+        - generation (int): The current write generation of the DAO.
+
+        Return Type:
+        - list: The cached superset of patients, or None if no prefix is cached.
+        """
+        self._check_generation(generation)
+        for length in range(len(key) - 1, -1, -1):
+            results = self.entries.get(key[:length])
+            if results is not None:
+                self.narrowed += 1
+                return results
+        return None
+
+    def put(self, key: str, results: list, generation: int) -> None:
+        """
+        Stores the results of a search string, evicting the least recently used entry if full.
+
+        Parameters:
+        - key (str): The normalized search string.
+        - results (list): The matching patients.
+        - generation (int): The write generation the results were computed at.
+
+        Return Type:
+        - None
+        """
+        self._check_generation(generation)
+        self.entries[key] = results
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Return Type:
+        - dict: The hits, misses, narrowed lookups and number of cached entries.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "narrowed": self.narrowed,
+            "entries": len(self.entries),
+        }
+
+    def _check_generation(self, generation: int) -> None:
+        """
+        Drops every entry if the DAO has been written since they were cached.
+        """
+        if generation != self.generation:
+            self.entries.clear()
+            self.generation = generation
@@ -0,0 +1,161 @@
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024  # Default memory budget for hydrated note text (8 MiB)
+
+class RecordCache:
+    """
+    A least-recently-used cache of hydrated patient records.
+
+    Each entry is the note DAO of a patient record whose notes are loaded in memory.
+    The cache is bounded by a memory budget measured as the estimated bytes of note
+    text. When the budget is exceeded, the least recently used records are flushed
+    (if dirty) and dehydrated, so their notes are reloaded from disk on next access.
+
+    Every access to the notes of a record marks it as recently used, but hits and misses
+    are counted once per operation on the record, so the hit rate is not inflated by
+    operations that read the notes several times.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """
+        Initializes an empty RecordCache.
+
+        Parameters:
+        - max_bytes (int): The memory budget, in estimated bytes of note text.
+
+        Return Type:
+        - None
+        """
+        self.max_bytes = max_bytes
+        self.records = OrderedDict()  # Maps note DAO -> estimated size, least recently used first
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def estimate_size(notes: list) -> int:
+        """
+        Estimates the memory used by a list of notes.
+
+        Parameters:
+        - notes (list): The notes of a hydrated record.
+
+        Return Type:
+        - int: The estimated size in bytes of the notes' text and revision deltas.
+        """
+        return sum(len(note.text) + sum(len(delta) for _, delta in getattr(note, 'revisions', ())) for note in notes)
+
+    def hit(self, note_dao) -> None:
+        """
+        Records an operation on an already hydrated record and marks it as most recently used.
+
+        Parameters:
+        - note_dao: The note DAO of the accessed record.
+
+        Return Type:
+        - None
+        """
+        self.hits += 1
+        self.touch(note_dao)
+
+    def touch(self, note_dao) -> None:
+        """
+        Marks a hydrated record as most recently used, without counting a hit.
+
+        Parameters:
+        - note_dao: The note DAO of the accessed record.
+
+        Return Type:
+        - None
+        """
+        if note_dao in self.records:
+            self.records.move_to_end(note_dao)
+        else:
+            self._insert(note_dao)
+
+    def miss(self, note_dao) -> None:
+        """
+        Records that a record had to be hydrated from disk and adds it to the cache.
+
+        Parameters:
+        - note_dao: The note DAO of the freshly hydrated record.
+
+        Return Type:
+        - None
+        """
+        self.misses += 1
+        self._insert(note_dao)
+
+    def resize(self, note_dao) -> None:
+        """
+        Recomputes the size of a cached record after its notes changed.
+
+        Parameters:
+        - note_dao: The note DAO of the modified record.
+
+        Return Type:
+        - None
+        """
+        if note_dao in self.records:
+            self.current_bytes -= self.records.pop(note_dao)
+            self._insert(note_dao)
+
+    def discard(self, note_dao) -> None:
+        """
+        Removes a record from the cache without dehydrating it.
+
+        Parameters:
+        - note_dao: The note DAO of the record to forget.
+
+        Return Type:
+        - None
+        """
+        if note_dao in self.records:
+            self.current_bytes -= self.records.pop(note_dao)
+
+    def clear(self) -> None:
+        """
+        Evicts every cached record, flushing the dirty ones first.
+
+        Return Type:
+        - None
+        """
+        while self.records:
+            self._evict_oldest()
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters, useful to size the memory budget.
+
+        Return Type:
+        - dict: The hits, misses, evictions, number of cached records and bytes in use.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "records": len(self.records),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _insert(self, note_dao) -> None:
+        """
+        Adds a record as most recently used and evicts older records to fit the budget.
+        The inserted record itself is never evicted, even if it alone exceeds the budget.
+        """
+        size = self.estimate_size(note_dao.notes_in_memory())
+        self.records[note_dao] = size
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes and len(self.records) > 1:
+            self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        """
+        Evicts the least recently used record, flushing it to disk first if it is dirty.
+        """
+        note_dao, size = self.records.popitem(last=False)
+        self.current_bytes -= size
+        note_dao.dehydrate()
+        self.evictions += 1
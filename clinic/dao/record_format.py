@@ -0,0 +1,167 @@
+import base64
+import json
+import lzma
+import pickle
+import zlib
+from datetime import datetime
+from clinic.note import Note
+
+MAGIC = b'CLNR'      # Marks record files written with a format header
+HEADER_SIZE = len(MAGIC) + 2
+FORMAT_PICKLE = 1    # Header version 1: compressed pickle, written by earlier builds (read only)
+FORMAT_JSONL = 2     # Header version 2: one JSON object per note and per line
+CHUNK_SIZE = 64 * 1024
+
+class _Identity:
+    """ A no-op stand-in for compressor and decompressor objects. """
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+    def flush(self) -> bytes:
+        return b''
+
+# Compression codecs by name: (id stored in the header, compressor factory, decompressor factory)
+COMPRESSIONS = {
+    'none': (0, _Identity, _Identity),
+    'zlib': (1, lambda: zlib.compressobj(6), zlib.decompressobj),
+    'lzma': (2, lzma.LZMACompressor, lzma.LZMADecompressor),
+}
+CODECS_BY_ID = {codec_id: decompressor for codec_id, _, decompressor in COMPRESSIONS.values()}
+
+def note_to_dict(note: Note) -> dict:
+    """
+    Converts a note into a JSON-compatible dictionary.
+
+    Parameters:
+    - note (Note): The note to convert.
+
+    Return Type:
+    - dict: The note's code, text, ISO timestamp, version and base64-encoded revision deltas.
+    """
+    data = {'code': note.code, 'text': note.text, 'timestamp': note.timestamp.isoformat()}
+    if note.get_version() != 1:
+        data['version'] = note.version
+    revisions = getattr(note, 'revisions', None)
+    if revisions:
+        data['revisions'] = [[timestamp.isoformat(), base64.b64encode(delta).decode('ascii')] for timestamp, delta in revisions]
+    return data
+
+def note_from_dict(data: dict) -> Note:
+    """
+    Rebuilds a note from the dictionary produced by `note_to_dict`.
+
+    Parameters:
+    - data (dict): The decoded JSON object.
+
+    Return Type:
+    - Note: The rebuilt note, keeping its original timestamp.
+    """
+    note = Note(data['code'], data['text'], datetime.fromisoformat(data['timestamp']))
+    for timestamp, delta in data.get('revisions', ()):
+        note.revisions.append((datetime.fromisoformat(timestamp), base64.b64decode(delta)))
+    note.version = data.get('version', 1)
+    return note
+
+def write_record(file, data: dict, compression: str = None) -> None:
+    """
+    Writes a note record to an open binary file as a header followed by JSON lines.
+
+    Notes are encoded and compressed incrementally, so memory use does not depend on
+    the size of the encoded file.
+
+    Parameters:
+    - file: A file object opened for binary writing.
+    - data (dict): The record to write, with its notes under 'notes'.
+    - compression (str): 'none', 'zlib', 'lzma', or None for no compression.
+
+    Return Type:
+    - None
+    """
+    compression = compression or 'none'
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown record compression: {compression}")
+    codec_id, compressor_factory, _ = COMPRESSIONS[compression]
+    compressor = compressor_factory()
+    file.write(MAGIC + bytes([FORMAT_JSONL, codec_id]))
+    batch = []
+    for note in data.get('notes', []):
+        batch.append(json.dumps(note_to_dict(note), separators=(',', ':')))
+        if len(batch) == 1000:
+            file.write(compressor.compress(('\n'.join(batch) + '\n').encode('utf-8')))
+            batch = []
+    if batch:
+        file.write(compressor.compress(('\n'.join(batch) + '\n').encode('utf-8')))
+    file.write(compressor.flush())
+
+def iter_notes(file, allow_pickle: bool = True):
+    """
+    Streams the notes of a record file, detecting its format from the header.
+
+    JSON-lines records are decoded one note at a time. Files without a header are
+    legacy plain pickles and, like header version 1, can only be read whole.
+
+    Parameters:
+    - file: A file object opened for binary reading.
+    - allow_pickle (bool): Whether legacy pickle files may be loaded. Unpickling can run
+      arbitrary code, so disable this for files from untrusted sources.
+
+    Return Type:
+    - iterator: The Note objects of the record, in file order.
+    """
+    header = file.read(HEADER_SIZE)
+    if not header.startswith(MAGIC):
+        if not allow_pickle:
+            raise ValueError("Refusing to load a legacy pickle record file")
+        yield from pickle.loads(header + file.read()).get('notes', [])
+        return
+
+    version, codec_id = header[len(MAGIC)], header[len(MAGIC) + 1]
+    if codec_id not in CODECS_BY_ID or version not in (FORMAT_PICKLE, FORMAT_JSONL):
+        raise ValueError(f"Unsupported record format version {version}, codec {codec_id}")
+    decompressor = CODECS_BY_ID[codec_id]()
+
+    if version == FORMAT_PICKLE:
+        if not allow_pickle:
+            raise ValueError("Refusing to load a pickle record file")
+        content = decompressor.decompress(file.read())
+        if hasattr(decompressor, 'flush'):
+            content += decompressor.flush()
+        yield from pickle.loads(content).get('notes', [])
+        return
+
+    for line in _iter_lines(file, decompressor):
+        if line:
+            yield note_from_dict(json.loads(line))
+
+def read_record(file, allow_pickle: bool = True) -> dict:
+    """
+    Reads a whole note record from an open binary file.
+
+    Parameters:
+    - file: A file object opened for binary reading.
+    - allow_pickle (bool): Whether legacy pickle files may be loaded.
+
+    Return Type:
+    - dict: The record, with its notes under 'notes'.
+    """
+    return {'notes': list(iter_notes(file, allow_pickle))}
+
+def _iter_lines(file, decompressor):
+    """
+    Decompresses a file in chunks and yields its complete lines.
+    """
+    pending = b''
+    while True:
+        chunk = file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        pending += decompressor.decompress(chunk)
+        *lines, pending = pending.split(b'\n')
+        yield from lines
+    if hasattr(decompressor, 'flush'):
+        pending += decompressor.flush()
+    yield from pending.split(b'\n')
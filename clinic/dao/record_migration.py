@@ -0,0 +1,73 @@
+import os
+from clinic.dao.record_format import FORMAT_JSONL, HEADER_SIZE, MAGIC, read_record, write_record
+from clinic.dao.file_lock import FileLock
+
+def is_current_format(filepath: str) -> bool:
+    """
+    Checks whether a record file is already in the JSON-lines record format.
+
+    Parameters:
+    - filepath (str): The path of the record file.
+
+    Return Type:
+    - bool: True if the file has a JSON-lines header, False otherwise.
+    """
+    with open(filepath, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    return header.startswith(MAGIC) and header[len(MAGIC)] == FORMAT_JSONL
+
+def migrate_record(filepath: str, compression: str = None) -> bool:
+    """
+    Rewrites a pickle record file in the JSON-lines record format.
+
+    The new file is written next to the old one and moved over it, so an interrupted
+    migration never leaves a half-written record.
+
+    Parameters:
+    - filepath (str): The path of the record file.
+    - compression (str): Compression of the rewritten file ('none', 'zlib', 'lzma'), or None.
+
+    Return Type:
+    - bool: True if the file was migrated, False if it was already in the current format.
+    """
+    if is_current_format(filepath):
+        return False
+    with open(filepath, 'rb') as f:
+        data = read_record(f)
+    temporary = filepath + '.tmp'
+    with open(temporary, 'wb') as f:
+        write_record(f, data, compression)
+    os.replace(temporary, filepath)
+    return True
+
+def migrate_records(directory: str = 'clinic/records', compression: str = None) -> tuple:
+    """
+    Migrates every record file of a directory to the JSON-lines record format.
+
+    Only run this on record files from a trusted source: legacy files are unpickled.
+
+    Parameters:
+    - directory (str): The directory holding the .dat record files, in any layout.
+    - compression (str): Compression of the rewritten files ('none', 'zlib', 'lzma'), or None.
+
+    Return Type:
+    - tuple: The number of files migrated and the number already in the current format.
+    """
+    migrated = skipped = 0
+    if not os.path.isdir(directory):
+        return migrated, skipped
+    lock = FileLock.for_path()
+    with lock.exclusive():
+        # Walk the whole tree, sharded layouts keep records in subdirectories
+        for root, _, filenames in sorted(os.walk(directory)):
+            for filename in sorted(filenames):
+                if not filename.endswith('.dat'):
+                    continue
+                if migrate_record(os.path.join(root, filename), compression):
+                    migrated += 1
+                else:
+                    skipped += 1
+        if migrated:
+            # Processes holding these records in memory read them again
+            lock.bump()
+    return migrated, skipped
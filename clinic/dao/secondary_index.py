@@ -0,0 +1,194 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+
+class HashIndex:
+    """
+    A secondary hash index mapping a normalized attribute value to the PHNs having it.
+    Lookups by exact value are O(1).
+    """
+
+    def __init__(self, normalize) -> None:
+        """
+        Initializes an empty HashIndex.
+
+        Parameters:
+        - normalize (callable): Turns an attribute value into its index key.
+
+        Return Type:
+        - None
+        """
+        self.normalize = normalize
+        self.keys = {}                  # Maps PHN -> key currently indexed for that PHN
+        self.phns = defaultdict(set)    # Maps key -> PHNs
+
+    def add(self, phn: int, value) -> None:
+        """
+        Indexes an attribute value, replacing any value indexed for the same PHN.
+
+        Parameters:
+        - phn (int): The patient's PHN.
+        - value: The attribute value.
+
+        Return Type:
+        - None
+        """
+        self.remove(phn)
+        key = self.normalize(value)
+        if not key:
+            return
+        self.keys[phn] = key
+        self.phns[key].add(phn)
+
+    def remove(self, phn: int) -> None:
+        """
+        Removes the value indexed for a PHN, if any.
+
+        Parameters:
+        - phn (int): The PHN whose value should be removed.
+
+        Return Type:
+        - None
+        """
+        key = self.keys.pop(phn, None)
+        if key is None:
+            return
+        self.phns[key].discard(phn)
+        if not self.phns[key]:
+            del self.phns[key]
+
+    def lookup(self, value) -> list:
+        """
+        Finds the PHNs indexed under a value.
+
+        Parameters:
+        - value: The attribute value to look for.
+
+        Return Type:
+        - list: The matching PHNs in ascending order.
+        """
+        return sorted(self.phns.get(self.normalize(value), ()))
+
+class SortedIndex:
+    """
+    A secondary index keeping (normalized attribute value, PHN) pairs in a sorted list,
+    so range queries cost a binary search plus the number of results.
+    """
+
+    def __init__(self, normalize) -> None:
+        """
+        Initializes an empty SortedIndex.
+
+        Parameters:
+        - normalize (callable): Turns an attribute value into its sortable index key.
+
+        Return Type:
+        - None
+        """
+        self.normalize = normalize
+        self.keys = {}      # Maps PHN -> key currently indexed for that PHN
+        self.entries = []   # Sorted list of (key, PHN)
+
+    def add(self, phn: int, value) -> None:
+        """
+        Indexes an attribute value, replacing any value indexed for the same PHN.
+
+        Parameters:
+        - phn (int): The patient's PHN.
+        - value: The attribute value.
+
+        Return Type:
+        - None
+        """
+        self.remove(phn)
+        key = self.normalize(value)
+        if not key:
+            return
+        self.keys[phn] = key
+        insort(self.entries, (key, phn))
+
+    def remove(self, phn: int) -> None:
+        """
+        Removes the value indexed for a PHN, if any.
+
+        Parameters:
+        - phn (int): The PHN whose value should be removed.
+
+        Return Type:
+        - None
+        """
+        key = self.keys.pop(phn, None)
+        if key is None:
+            return
+        position = bisect_left(self.entries, (key, phn))
+        if position < len(self.entries) and self.entries[position] == (key, phn):
+            del self.entries[position]
+
+    def range(self, start=None, end=None) -> list:
+        """
+        Finds the PHNs whose values fall in an inclusive range.
+
+        Parameters:
+        - start: The lowest value, or None for no lower bound.
+        - end: The highest value, or None for no upper bound.
+
+        Return Type:
+        - list: The matching PHNs ordered by value.
+        """
+        low = 0 if start is None else bisect_left(self.entries, (self.normalize(start),))
+        if end is None:
+            high = len(self.entries)
+        else:
+            # Every (end, phn) pair sorts before (end + chr(0x10FFFF),)
+            high = bisect_right(self.entries, (self.normalize(end) + chr(0x10FFFF),))
+        return [phn for _, phn in self.entries[low:high]]
+
+    def count_range(self, start=None, end=None) -> int:
+        """
+        Counts the PHNs whose values fall in an inclusive range without listing them.
+
+        Parameters:
+        - start: The lowest value, or None for no lower bound.
+        - end: The highest value, or None for no upper bound.
+
+        Return Type:
+        - int: The number of matching PHNs.
+        """
+        low = 0 if start is None else bisect_left(self.entries, (self.normalize(start),))
+        high = len(self.entries) if end is None else bisect_right(self.entries, (self.normalize(end) + chr(0x10FFFF),))
+        return max(0, high - low)
+
+def normalize_phone(phone) -> str:
+    """
+    Normalizes a phone number to its digits, so "250 203 1010" and "(250) 203-1010" match.
+
+    Parameters:
+    - phone: The phone number.
+
+    Return Type:
+    - str: The digits of the phone number.
+    """
+    return "".join(c for c in str(phone or "") if c.isdigit())
+
+def normalize_email(email) -> str:
+    """
+    Normalizes an email address for case-insensitive matching.
+
+    Parameters:
+    - email: The email address.
+
+    Return Type:
+    - str: The trimmed, lowercase email address.
+    """
+    return str(email or "").strip().lower()
+
+def normalize_birth_date(birth_date) -> str:
+    """
+    Normalizes a birth date. Dates in 'YYYY-MM-DD' format sort chronologically as strings.
+
+    Parameters:
+    - birth_date: The birth date.
+
+    Return Type:
+    - str: The trimmed birth date.
+    """
+    return str(birth_date or "").strip()
@@ -0,0 +1,179 @@
+import json
+import os
+import zlib
+
+LAYOUT_FILE = 'clinic/layout.json'
+
+class ShardLayout:
+    """
+    Maps PHNs to the files that store their patient metadata and notes.
+
+    With a single shard, the layout is the original one: every patient in
+    clinic/patients.json (plus its change log) and every note record directly in
+    clinic/records. With N shards, a PHN belongs to shard `PHN mod N`; each shard has
+    its own metadata file and log under clinic/patients/N/ and its own record directory
+    under clinic/records/N/, so the I/O of an operation is bounded by the shard size.
+    Paths include the shard count, so two layouts never share a file while rebalancing.
+    """
+
+    def __init__(self, shards: int = 1) -> None:
+        """
+        Initializes the ShardLayout.
+
+        Parameters:
+        - shards (int): The number of shards, 1 for the unsharded layout.
+
+        Return Type:
+        - None
+        """
+        if shards < 1:
+            raise ValueError("A layout needs at least one shard")
+        self.shards = shards
+
+    @classmethod
+    def load(cls, filename: str = LAYOUT_FILE) -> 'ShardLayout':
+        """
+        Reads the layout in use, defaulting to the unsharded layout.
+
+        Parameters:
+        - filename (str): The layout file.
+
+        Return Type:
+        - ShardLayout: The configured layout.
+        """
+        try:
+            with open(filename, 'r') as file:
+                return cls(json.load(file)["shards"])
+        except FileNotFoundError:
+            return cls()
+
+    def save(self, filename: str = LAYOUT_FILE) -> None:
+        """
+        Makes this layout the one in use. The file is replaced atomically.
+
+        Parameters:
+        - filename (str): The layout file.
+
+        Return Type:
+        - None
+        """
+        temporary = filename + '.tmp'
+        with open(temporary, 'w') as file:
+            json.dump({"shards": self.shards}, file)
+        os.replace(temporary, filename)
+
+    def is_sharded(self) -> bool:
+        return self.shards > 1
+
+    def shard_of(self, phn) -> int:
+        """
+        Finds the shard a PHN belongs to.
+
+        Parameters:
+        - phn: The personal health number.
+
+        Return Type:
+        - int: The shard number, from 0 to shards - 1.
+        """
+        try:
+            return int(phn) % self.shards
+        except (TypeError, ValueError):
+            return zlib.crc32(str(phn).encode('utf-8')) % self.shards
+
+    def record_path(self, phn) -> str:
+        """
+        Returns the path of a patient's note record file.
+        """
+        if not self.is_sharded():
+            return f'clinic/records/{phn}.dat'
+        return f'clinic/records/{self.shards}/{self.shard_of(phn):03d}/{phn}.dat'
+
+    def patients_path(self, shard: int) -> str:
+        """
+        Returns the path of a shard's patient metadata file.
+        """
+        if not self.is_sharded():
+            return 'clinic/patients.json'
+        return f'clinic/patients/{self.shards}/{shard:03d}.json'
+
+    def log_path(self, shard: int) -> str:
+        """
+        Returns the path of a shard's patient change log.
+        """
+        if not self.is_sharded():
+            return 'clinic/patients.log'
+        return f'clinic/patients/{self.shards}/{shard:03d}.log'
+
+def rebalance(shards: int) -> dict:
+    """
+    Moves the patient metadata and note records to a layout with another shard count.
+
+    Record files are first hard-linked (or copied) to their new paths and the new
+    metadata files are written, while the old layout stays complete. Saving the layout
+    file then switches to the new layout in one atomic step, after which the old files
+    are removed. An interrupted rebalance leaves the old layout in use and can be run again.
+
+    Parameters:
+    - shards (int): The new number of shards, 1 to return to the unsharded layout.
+
+    Return Type:
+    - dict: The old and new shard counts and the number of patients and records moved.
+    """
+    # Imported here to prevent circular imports
+    from clinic.dao.patient_dao_json import PatientDAOJSON
+
+    dao = PatientDAOJSON(True)
+    # Other processes neither read nor write until the new layout is complete
+    with dao.writing():
+        return _rebalance(dao, ShardLayout(shards))
+
+def _rebalance(dao, new_layout: ShardLayout) -> dict:
+    """
+    Moves the store of a DAO to a new layout. Call this while holding the store for writing.
+    """
+    old_layout = dao.layout
+    if old_layout.shards == new_layout.shards:
+        return {"from": old_layout.shards, "to": new_layout.shards, "patients": len(dao.patients), "records": 0}
+
+    moved = []
+    for phn in dao.patients:
+        source, target = old_layout.record_path(phn), new_layout.record_path(phn)
+        if os.path.exists(source):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.exists(target):
+                os.remove(target)  # Left over from an interrupted rebalance
+            try:
+                os.link(source, target)
+            except OSError:
+                with open(source, 'rb') as original, open(target, 'wb') as copy:
+                    copy.write(original.read())
+            moved.append(source)
+
+    dao.layout = new_layout
+    dao.save_patients()
+    new_layout.save()
+
+    # The new layout is in use, the old files can go
+    for source in moved:
+        os.remove(source)
+    for shard in range(old_layout.shards):
+        for path in (old_layout.patients_path(shard), old_layout.log_path(shard)):
+            if os.path.exists(path):
+                os.remove(path)
+    if old_layout.is_sharded():
+        for directory in (f'clinic/records/{old_layout.shards}', f'clinic/patients/{old_layout.shards}'):
+            _remove_empty_directories(directory)
+    return {"from": old_layout.shards, "to": new_layout.shards, "patients": len(dao.patients), "records": len(moved)}
+
+def _remove_empty_directories(directory: str) -> None:
+    """
+    Removes a directory tree left empty by a rebalance, and its parent if it becomes empty.
+    """
+    if not os.path.isdir(directory):
+        return
+    for root, _, _ in sorted(os.walk(directory), reverse=True):
+        if not os.listdir(root):
+            os.rmdir(root)
+    parent = os.path.dirname(directory)
+    if os.path.isdir(parent) and not os.listdir(parent) and parent != 'clinic/records':
+        os.rmdir(parent)
@@ -0,0 +1,122 @@
+from bisect import bisect_left, bisect_right, insort
+
+class TimestampIndex:
+    """
+    An index of note keys ordered by timestamp.
+
+    Entries are (timestamp, key) pairs kept in a sorted list, so time-range and
+    most-recent queries are a binary search plus the number of results.
+    The key identifies a note: its code within a patient record, or (PHN, code)
+    for the clinic-wide index.
+    """
+
+    def __init__(self, entries=None) -> None:
+        """
+        Initializes the TimestampIndex.
+
+        Parameters:
+        - entries (iterable): Optional (timestamp, key) pairs to index.
+
+        Return Type:
+        - None
+        """
+        self.entries = sorted(entries or [])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, timestamp, key) -> None:
+        """
+        Indexes a note key under a timestamp.
+
+        Parameters:
+        - timestamp (datetime): The note timestamp.
+        - key: The note key.
+
+        Return Type:
+        - None
+        """
+        if not self.entries or self.entries[-1] <= (timestamp, key):
+            # Fast path: new notes almost always carry the latest timestamp
+            self.entries.append((timestamp, key))
+        else:
+            insort(self.entries, (timestamp, key))
+
+    def remove(self, timestamp, key) -> None:
+        """
+        Removes a note key indexed under a timestamp, if present.
+
+        Parameters:
+        - timestamp (datetime): The timestamp the key was indexed under.
+        - key: The note key.
+
+        Return Type:
+        - None
+        """
+        position = bisect_left(self.entries, (timestamp, key))
+        if position < len(self.entries) and self.entries[position] == (timestamp, key):
+            del self.entries[position]
+
+    def remove_where(self, predicate) -> None:
+        """
+        Removes every entry whose key satisfies a predicate. This is a linear rebuild,
+        meant for rare bulk changes such as deleting a patient.
+
+        Parameters:
+        - predicate (callable): Returns True for the keys to remove.
+
+        Return Type:
+        - None
+        """
+        self.entries = [entry for entry in self.entries if not predicate(entry[1])]
+
+    def rekey(self, transform) -> None:
+        """
+        Replaces the keys of every entry, for instance to move notes to another PHN.
+        This is a linear rebuild over the index, it does not touch the notes.
+
+        Parameters:
+        - transform (callable): Returns the new key for a key.
+
+        Return Type:
+        - None
+        """
+        self.entries = sorted((timestamp, transform(key)) for timestamp, key in self.entries)
+
+    def range(self, start=None, end=None) -> list:
+        """
+        Finds the keys whose timestamps fall within an inclusive range, latest first.
+
+        Parameters:
+        - start (datetime): The earliest timestamp, or None for no lower bound.
+        - end (datetime): The latest timestamp, or None for no upper bound.
+
+        Return Type:
+        - list: The matching keys, most recent first.
+        """
+        low = 0 if start is None else bisect_left(self.entries, (start,))
+        high = len(self.entries) if end is None else self._upper_bound(end)
+        return [key for _, key in reversed(self.entries[low:high])]
+
+    def latest(self, count: int) -> list:
+        """
+        Finds the keys of the most recent notes.
+
+        Parameters:
+        - count (int): The number of keys to return.
+
+        Return Type:
+        - list: Up to `count` keys, most recent first.
+        """
+        if count <= 0:
+            return []
+        return [key for _, key in reversed(self.entries[-count:])]
+
+    def _upper_bound(self, end) -> int:
+        """
+        Returns the position after the last entry whose timestamp is <= end.
+        """
+        position = bisect_right(self.entries, (end,))
+        while position < len(self.entries) and self.entries[position][0] == end:
+            position += 1
+        return position
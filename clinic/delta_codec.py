@@ -0,0 +1,53 @@
+import json
+import zlib
+from difflib import SequenceMatcher
+
+DELTA_FORMAT = b'D'  # Payload is a compressed list of edit operations
+FULL_FORMAT = b'F'   # Payload is the compressed full text, used when a delta would be larger
+
+def encode_delta(source: str, target: str) -> bytes:
+    """
+    Encodes how to rebuild `target` from `source` as a compressed delta.
+
+    The delta is a list of operations: a pair [start, end] copies source[start:end],
+    a string inserts literal text. If the delta does not save space, the full
+    target text is stored instead.
+
+    Parameters:
+    - source (str): The text available when decoding (e.g. the newer version of a note).
+    - target (str): The text to rebuild (e.g. the older version of a note).
+
+    Return Type:
+    - bytes: The encoded delta.
+    """
+    operations = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, source, target).get_opcodes():
+        if tag == 'equal':
+            operations.append([i1, i2])
+        elif tag in ('replace', 'insert'):
+            operations.append(target[j1:j2])
+    delta = DELTA_FORMAT + zlib.compress(json.dumps(operations, separators=(',', ':')).encode('utf-8'))
+    full = FULL_FORMAT + zlib.compress(target.encode('utf-8'))
+    return delta if len(delta) < len(full) else full
+
+def decode_delta(source: str, delta: bytes) -> str:
+    """
+    Rebuilds a text from the source it was encoded against and its delta.
+
+    Parameters:
+    - source (str): The text the delta was encoded against.
+    - delta (bytes): The delta returned by `encode_delta`.
+
+    Return Type:
+    - str: The rebuilt text.
+    """
+    payload = zlib.decompress(delta[1:]).decode('utf-8')
+    if delta[:1] == FULL_FORMAT:
+        return payload
+    parts = []
+    for operation in json.loads(payload):
+        if isinstance(operation, str):
+            parts.append(operation)
+        else:
+            parts.append(source[operation[0]:operation[1]])
+    return ''.join(parts)
@@ -3,4 +3,5 @@ from .illegal_access_exception import IllegalAccessException
 from .illegal_operation_exception import IllegalOperationException
 from .invalid_login_exception import InvalidLoginException
 from .invalid_logout_exception import InvalidLogoutException
-from .no_current_patient_exception import NoCurrentPatientException
\ No newline at end of file
+from .no_current_patient_exception import NoCurrentPatientException
+from .version_conflict_exception import VersionConflictException
\ No newline at end of file
@@ -0,0 +1,2 @@
+class VersionConflictException(Exception):
+	''' Version Conflict '''
\ No newline at end of file
@@ -164,12 +164,7 @@ class AddPatientGUI(QWidget):
             self.controller.create_patient(phn, name, birth_date, phone, email, address)
 
             QMessageBox.information(self, "Patient Added", "Patient successfully added!")
-            self.phn_input.clear()
-            self.name_input.clear()
-            self.birth_date_input.clear()
-            self.phone_input.clear()
-            self.email_input.clear()
-            self.address_input.clear()
+            self.refresh()
 
         except ValueError as ve:
             QMessageBox.warning(self, "Input Error", str(ve))
@@ -184,6 +179,17 @@ class AddPatientGUI(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {str(e)}")
 
+    def refresh(self):
+        """
+        Clears the form, when a patient was added or the screen is shown again.
+        """
+        self.phn_input.clear()
+        self.name_input.clear()
+        self.birth_date_input.clear()
+        self.phone_input.clear()
+        self.email_input.clear()
+        self.address_input.clear()
+
     def back_to_menu_func(self):
         """
         Navigates back to the main menu GUI.
@@ -192,4 +198,4 @@ class AddPatientGUI(QWidget):
         """
         from clinic.gui.main_menu_gui import MainMenuGUI  # Delayed import to prevent circular dependencies
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(MainMenuGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_cached(MainMenuGUI)
@@ -47,18 +47,10 @@ class AppointMainMenuGUI(QWidget):
         main_layout.addSpacing(30)
 
         # Patient information section
-        patient_info_label = QLabel(
-            f"PATIENT:\n"
-            f"PHN: {self.current_patient.phn}\n"
-            f"Name: {self.wrap_text(self.current_patient.name)}\n"
-            f"Birth Date: {self.wrap_text(self.current_patient.birth_date)}\n"
-            f"Phone: {self.wrap_text(self.current_patient.phone)}\n"
-            f"Email: {self.wrap_text(self.current_patient.email)}\n"
-            f"Address: {self.wrap_text(self.current_patient.address)}"
-        )
-        patient_info_label.setStyleSheet("font-size: 14px; color: gray;")
-        patient_info_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        main_layout.addWidget(patient_info_label)
+        self.patient_info_label = QLabel(self.patient_info())
+        self.patient_info_label.setStyleSheet("font-size: 14px; color: gray;")
+        self.patient_info_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        main_layout.addWidget(self.patient_info_label)
         main_layout.addSpacing(40)
 
         # Button layout for actions
@@ -114,6 +106,30 @@ class AppointMainMenuGUI(QWidget):
         main_layout.addLayout(button_layout)
         main_layout.addSpacing(20)
 
+    def patient_info(self):
+        """
+        Describes the current patient for the patient information section.
+
+        Returns:
+        - str: The details of the current patient, one per line.
+        """
+        return (
+            f"PATIENT:\n"
+            f"PHN: {self.current_patient.phn}\n"
+            f"Name: {self.wrap_text(self.current_patient.name)}\n"
+            f"Birth Date: {self.wrap_text(self.current_patient.birth_date)}\n"
+            f"Phone: {self.wrap_text(self.current_patient.phone)}\n"
+            f"Email: {self.wrap_text(self.current_patient.email)}\n"
+            f"Address: {self.wrap_text(self.current_patient.address)}"
+        )
+
+    def refresh(self):
+        """
+        Shows the patient of the current appointment when the menu is shown again.
+        """
+        self.current_patient = self.controller.get_current_patient()
+        self.patient_info_label.setText(self.patient_info())
+
     def wrap_text(self, text, max_width=50):
         """
         Wraps the given text to the specified width.
@@ -165,7 +181,7 @@ class AppointMainMenuGUI(QWidget):
             notes = self.controller.retrieve_notes(search_text.strip())
             if notes:
                 from clinic.gui.retrieve_notes_window_gui import RetrieveNotesWindow  # Delayed import
-                self.parent_widget.setCentralWidget(RetrieveNotesWindow(self.controller, self.parent_widget, notes, search_text.strip()))
+                self.parent_widget.show_screen(RetrieveNotesWindow(self.controller, self.parent_widget, notes, search_text.strip()))
             else:
                 QMessageBox.information(self, "No Results", "No notes found matching the search criteria.")
         except NoCurrentPatientException:
@@ -189,7 +205,7 @@ class AppointMainMenuGUI(QWidget):
                 QMessageBox.warning(self, "Invalid Note", str(ioe))
                 return
             from clinic.gui.change_note_window_gui import ChangeNoteWindow  # Delayed import
-            self.parent_widget.setCentralWidget(ChangeNoteWindow(self.controller, note_code, self.parent_widget))
+            self.parent_widget.show_screen(ChangeNoteWindow(self.controller, note_code, self.parent_widget))
         except NoCurrentPatientException:
             QMessageBox.critical(self, "Error", "No current patient is selected.")
         except Exception as e:
@@ -211,7 +227,7 @@ class AppointMainMenuGUI(QWidget):
                 QMessageBox.warning(self, "Invalid Note", str(ioe))
                 return
             from clinic.gui.remove_note_window_gui import RemoveNoteWindow  # Delayed import
-            self.parent_widget.setCentralWidget(RemoveNoteWindow(self.controller, note_code, self.parent_widget))
+            self.parent_widget.show_screen(RemoveNoteWindow(self.controller, note_code, self.parent_widget))
         except NoCurrentPatientException:
             QMessageBox.critical(self, "Error", "No current patient is selected.")
         except Exception as e:
@@ -225,7 +241,7 @@ class AppointMainMenuGUI(QWidget):
             notes = self.controller.list_notes()
             if notes:
                 from clinic.gui.list_notes_window_gui import ListNotesWindow  # Delayed import
-                self.parent_widget.setCentralWidget(ListNotesWindow(self.controller, self.parent_widget, notes))
+                self.parent_widget.show_screen(ListNotesWindow(self.controller, self.parent_widget, notes))
             else:
                 QMessageBox.information(self, "No Notes", "The patient's record is empty.")
         except NoCurrentPatientException:
@@ -249,4 +265,4 @@ class AppointMainMenuGUI(QWidget):
         """
         from clinic.gui.main_menu_gui import MainMenuGUI  # Delayed import to avoid circular dependencies
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(MainMenuGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_cached(MainMenuGUI)
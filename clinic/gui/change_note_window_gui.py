@@ -133,7 +133,7 @@ class ChangeNoteWindow(QWidget):
         """
         from clinic.gui.appointment_main_menu_gui import AppointMainMenuGUI  # Delayed import to avoid circular dependencies
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(AppointMainMenuGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_cached(AppointMainMenuGUI)
             self.deleteLater()
         else:
             QMessageBox.critical(self, "Error", "Parent widget not set. Cannot navigate back.")
@@ -1,13 +1,16 @@
 import sys
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QPushButton, QGridLayout, QLabel, QLineEdit, QMessageBox, QSizePolicy
 )
 from clinic.gui.quit_gui import QuitGUI 
 from clinic.gui.main_menu_gui import MainMenuGUI  
+from clinic.gui.screen_stack import ScreenStack
 from clinic.controller import Controller 
 from clinic.exception import InvalidLoginException  
 
+CHANGE_POLL_INTERVAL = 1000  # Milliseconds between two reads of the change log
+
 
 class ClinicGUI(QMainWindow):
     """
@@ -15,9 +18,12 @@ class ClinicGUI(QMainWindow):
     Handles the login screen and transitions to other screens like MainMenuGUI and QuitGUI.
     """
 
-    def __init__(self):
+    def __init__(self, controller=None):
         """
         Initializes the ClinicGUI instance and sets up the login screen.
+
+        Parameters:
+        - controller: The Controller to use, by default one that saves every change.
         """
         super().__init__()
 
@@ -27,7 +33,13 @@ class ClinicGUI(QMainWindow):
         self.center_window()
 
         # Initialize the controller with autosave enabled
-        self.controller = Controller(autosave=True)
+        self.controller = controller or Controller(autosave=True)
+        self.screens = None  # The screens of the logged in session
+
+        # Pass changes made by other processes to the open screen, which applies them
+        self.change_timer = QTimer(self)
+        self.change_timer.timeout.connect(self.controller.change_feed.poll)
+        self.change_timer.start(CHANGE_POLL_INTERVAL)
 
         # Display the login screen
         self.login_screen()
@@ -40,6 +52,9 @@ class ClinicGUI(QMainWindow):
         # Ensure the logged_in flag is reset
         self.controller.logged_in = False
 
+        # The screens of the session are deleted along with the central widget they are in
+        self.screens = None
+
         # Create the central widget and set it as the main content
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -137,9 +152,35 @@ class ClinicGUI(QMainWindow):
 
     def open_main_menu(self):
         """
-        Opens the MainMenuGUI after successful login.
+        Opens the MainMenuGUI after successful login, in a new stack of screens for the session.
+        """
+        self.screens = ScreenStack(self)
+        self.setCentralWidget(self.screens)
+        self.show_cached(MainMenuGUI)
+
+    def show_cached(self, screen_class):
+        """
+        Shows the screen of a class kept for the session, building it the first time.
+
+        Parameters:
+        - screen_class: The class of the screen, built with the controller and this window.
+
+        Returns:
+        - QWidget: The screen shown.
+        """
+        return self.screens.show_cached(screen_class, self.controller, self)
+
+    def show_screen(self, screen):
+        """
+        Shows a screen built for one use, such as the details of a patient.
+
+        Parameters:
+        - screen: The screen to show.
+
+        Returns:
+        - QWidget: The screen shown.
         """
-        self.setCentralWidget(MainMenuGUI(self.controller, self))
+        return self.screens.show_screen(screen)
 
     def quit(self):
         """
@@ -1,12 +1,15 @@
+from datetime import datetime
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
-    QWidget, QPushButton, QLabel, QPlainTextEdit, QVBoxLayout, QHBoxLayout
+    QWidget, QPushButton, QLabel, QLineEdit, QVBoxLayout, QHBoxLayout
 )
+from clinic.note import Note
+from clinic.gui.note_list_view import NoteListView
 
 class ListNotesWindow(QWidget):
     """
-    GUI window for displaying the full patient record in a QPlainTextEdit widget.
-    Provides a simple interface to view all notes associated with a patient.
+    GUI window for displaying the full patient record in a NoteListView, which only lays
+    out the notes scrolled to. Text typed in the find box is highlighted in every note.
     """
 
     def __init__(self, controller, parent, notes):
@@ -23,7 +26,7 @@ class ListNotesWindow(QWidget):
         # Store references for controller, parent widget, and notes
         self.controller = controller
         self.parent_widget = parent
-        self.notes = notes
+        self.phn = controller.current_patient.phn if controller.current_patient else None
 
         # Set up the main layout
         self.layout = QVBoxLayout()
@@ -35,11 +38,17 @@ class ListNotesWindow(QWidget):
         title_label.setStyleSheet("font-size: 32px; font-weight: bold;")  
         self.layout.addWidget(title_label)
 
-        # QPlainTextEdit to display the notes
-        self.notes_display = QPlainTextEdit()
-        self.notes_display.setReadOnly(True) 
-        self.notes_display.setPlainText(self.format_notes()) 
-        self.layout.addWidget(self.notes_display)
+        # Find box: highlights the text as it is typed, Enter jumps to the next note containing it
+        self.find_input = QLineEdit()
+        self.find_input.setPlaceholderText("Find in record...")
+        self.find_input.setFixedHeight(30)
+        self.find_input.textChanged.connect(self.highlight)
+        self.find_input.returnPressed.connect(self.find_next)
+        self.layout.addWidget(self.find_input)
+
+        # List of the notes, fetched and laid out as it is scrolled
+        self.notes_view = NoteListView(notes)
+        self.layout.addWidget(self.notes_view)
 
         # Create a horizontal layout for the back button
         button_layout = QHBoxLayout()
@@ -54,16 +63,56 @@ class ListNotesWindow(QWidget):
         # Add the button layout to the main layout
         self.layout.addLayout(button_layout)
 
-    def format_notes(self):
+        # Keep the record up to date with changes made from now on, here or in other processes
+        change_feed = self.controller.change_feed
+        change_feed.subscribe(self.apply_change)
+        self.destroyed.connect(lambda: change_feed.unsubscribe(self.apply_change))
+
+    def highlight(self, text):
+        """
+        Highlights the text of the find box in every note.
+
+        Parameters:
+        - text: The text to highlight.
         """
-        Formats the notes for display in the QPlainTextEdit widget.
+        self.notes_view.set_highlight(text)
 
-        Returns:
-        - str: A formatted string where each note is separated by two newlines.
+    def find_next(self):
+        """
+        Scrolls to the next note containing the text of the find box, starting over from
+        the top after the last one.
+        """
+        text = self.find_input.text()
+        if not text:
+            return
+        current = self.notes_view.currentIndex()
+        start = current.row() + 1 if current.isValid() else 0
+        if self.notes_view.find(text, start) is None:
+            self.notes_view.find(text)
+
+    def apply_change(self, event):
+        """
+        Applies one change feed event to the displayed notes, if it concerns this patient.
+        The notes are taken from the event, so nothing is read from the controller.
+
+        Parameters:
+        - event: The change event, with its operation and arguments.
         """
-        return "\n\n".join(
-            [f"Note #{note.code}, from {note.timestamp}\n{note.text}" for note in self.notes]
-        )
+        op, args = event["op"], event["args"]
+        if not op.endswith("_note") or args["phn"] != self.phn:
+            return
+        model = self.notes_view.note_model
+        row = model.row_of(args["code"])
+        if op == "delete_note":
+            if row is not None:
+                model.remove_note(row)
+            return
+        note = Note(args["code"], args["text"], datetime.fromisoformat(args["timestamp"]))
+        if row is None:
+            model.insert_note(0, note)  # Latest first
+        else:
+            model.replace_note(row, note)
+            self.notes_view.relayout()  # The note may need another height
 
     def return_to_menu(self):
         """
@@ -73,4 +122,4 @@ class ListNotesWindow(QWidget):
         """
         from clinic.gui.appointment_main_menu_gui import AppointMainMenuGUI  # Delayed import to avoid circular dependencies
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(AppointMainMenuGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_cached(AppointMainMenuGUI)
@@ -112,7 +112,7 @@ class MainMenuGUI(QWidget):
         Opens the AddPatientGUI for adding a new patient.
         """
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(AddPatientGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_cached(AddPatientGUI)
 
     def open_search_patient_gui(self):
         """
@@ -125,7 +125,7 @@ class MainMenuGUI(QWidget):
 
             patient = self.controller.search_patient(phn)
             if patient:
-                self.parent_widget.setCentralWidget(SearchPatientGUI(self.controller, self.parent_widget, patient))
+                self.parent_widget.show_screen(SearchPatientGUI(self.controller, self.parent_widget, patient))
             else:
                 QMessageBox.warning(self, "No Patient Found", "No patient found with the provided PHN.")
         except ValueError:
@@ -138,14 +138,14 @@ class MainMenuGUI(QWidget):
         Opens the RetrievePatientsGUI to retrieve patients by name.
         """
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(RetrievePatientsGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_screen(RetrievePatientsGUI(self.controller, self.parent_widget))
 
     def open_change_patient_data_gui(self):
         """
         Opens the ChangePatientDataGUI for modifying patient data.
         """
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(ChangePatientDataGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_screen(ChangePatientDataGUI(self.controller, self.parent_widget))
 
     def open_remove_patient_gui(self):
         """
@@ -158,7 +158,7 @@ class MainMenuGUI(QWidget):
 
             patient = self.controller.search_patient(phn)
             if patient:
-                self.parent_widget.setCentralWidget(RemovePatientGUI(self.controller, self.parent_widget, patient))
+                self.parent_widget.show_screen(RemovePatientGUI(self.controller, self.parent_widget, patient))
             else:
                 QMessageBox.warning(self, "No Patient Found", "No patient found with the provided PHN.")
         except ValueError:
@@ -171,18 +171,18 @@ class MainMenuGUI(QWidget):
         Opens the ListAllPatientsGUI to display all patients.
         """
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(ListAllPatientsGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_cached(ListAllPatientsGUI)
 
     def open_start_appointment_gui(self):
         """
         Opens the StartAppointmentGUI for initiating a patient appointment.
         """
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(StartAppointmentGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_screen(StartAppointmentGUI(self.controller, self.parent_widget))
 
     def logout(self):
         """
         Logs out the user and navigates back to the login screen.
         """
-        if self.parent():
-            self.parent().login_screen()  
+        if self.parent_widget:
+            self.parent_widget.login_screen()
@@ -0,0 +1,358 @@
+import html
+import math
+import re
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QRectF, QSize
+from PyQt6.QtGui import QColor, QKeySequence, QTextDocument, QTextOption
+from PyQt6.QtWidgets import QApplication, QListView, QStyle, QStyledItemDelegate, QStyleOptionViewItem
+
+FETCH_SIZE = 25            # Notes added to the view each time it scrolls near the end
+NOTE_MARGIN = 8            # Space around the text of a note, in pixels
+HIGHLIGHT_COLOR = "#FFF176"
+SEPARATOR_COLOR = "#DCDCDC"
+MAX_CACHED_HEIGHTS = 10000 # Row heights remembered before the cache is cleared
+NOTE_ROLE = Qt.ItemDataRole.UserRole  # Data role returning the Note object of a row
+
+
+def note_header(note):
+    """
+    Describes a note in one line, as shown above its text.
+
+    Parameters:
+    - note: The note to describe.
+
+    Returns:
+    - str: The code and timestamp of the note.
+    """
+    return f"Note #{note.code}, from {note.timestamp}"
+
+
+def note_html(note, highlight=""):
+    """
+    Formats a note as rich text, with every occurrence of a search text highlighted.
+
+    Parameters:
+    - note: The note to format.
+    - highlight: The text to highlight, ignoring case, or an empty string.
+
+    Returns:
+    - str: The HTML of the note.
+    """
+    if highlight:
+        parts = re.split(f"({re.escape(highlight)})", note.text, flags=re.IGNORECASE)
+        # Odd parts are the matches
+        text = "".join(
+            f'<span style="background-color: {HIGHLIGHT_COLOR};">{html.escape(part)}</span>' if i % 2 else html.escape(part)
+            for i, part in enumerate(parts)
+        )
+    else:
+        text = html.escape(note.text)
+    return f'<b>{html.escape(note_header(note))}</b><div style="white-space: pre-wrap;">{text}</div>'
+
+
+class NoteListModel(QAbstractListModel):
+    """
+    List model of notes, most recent first, handed to the view in batches.
+
+    The model holds every note, but reports only the rows fetched so far: the view asks
+    for more through `canFetchMore` and `fetchMore` when it scrolls near the end, so it
+    only lays out notes that were scrolled to.
+    """
+
+    def __init__(self, notes, parent=None):
+        """
+        Initializes the NoteListModel.
+
+        Parameters:
+        - notes: The note objects to show, in display order.
+        - parent: The parent object, typically None.
+        """
+        super().__init__(parent)
+        self.notes = list(notes)
+        self.fetched = min(FETCH_SIZE, len(self.notes))  # Rows reported to the view
+
+    def rowCount(self, parent=QModelIndex()):
+        """
+        Returns the number of rows fetched so far.
+
+        Parameters:
+        - parent: Required for overriding, rows have no children.
+
+        Returns:
+        - int: The number of rows the view shows.
+        """
+        return 0 if parent.isValid() else self.fetched
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        """
+        Returns the data of a row: its text for display and copying, or the note itself.
+
+        Parameters:
+        - index: The QModelIndex of the row.
+        - role: The data role.
+
+        Returns:
+        - The note text with its header, the Note object, or None.
+        """
+        if not index.isValid():
+            return None
+        note = self.notes[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{note_header(note)}\n{note.text}"
+        if role == NOTE_ROLE:
+            return note
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        """
+        Tells the view whether notes remain that it has not shown yet.
+        """
+        return not parent.isValid() and self.fetched < len(self.notes)
+
+    def fetchMore(self, parent=QModelIndex()):
+        """
+        Adds the next batch of notes to the rows of the view.
+        """
+        count = min(FETCH_SIZE, len(self.notes) - self.fetched)
+        if parent.isValid() or count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.fetched, self.fetched + count - 1)
+        self.fetched += count
+        self.endInsertRows()
+
+    def fetch_to(self, row):
+        """
+        Fetches every row up to a given one, so the view can scroll to it.
+
+        Parameters:
+        - row: The row that must be fetched.
+        """
+        while self.fetched <= row and self.canFetchMore():
+            self.fetchMore()
+
+    def row_of(self, code):
+        """
+        Finds the row of a note.
+
+        Parameters:
+        - code: The code of the note.
+
+        Returns:
+        - int: The row of the note, or None if it is not in the list.
+        """
+        for row, note in enumerate(self.notes):
+            if note.code == code:
+                return row
+        return None
+
+    def insert_note(self, row, note):
+        """
+        Inserts a note, shown right away if its row was fetched.
+
+        Parameters:
+        - row: The position of the note, 0 for the top.
+        - note: The note to insert.
+        """
+        self.notes.insert(row, note)
+        if row <= self.fetched:
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.fetched += 1
+            self.endInsertRows()
+
+    def replace_note(self, row, note):
+        """
+        Replaces the note of a row with its new version.
+
+        Parameters:
+        - row: The row of the note.
+        - note: The new version of the note.
+        """
+        self.notes[row] = note
+        if row < self.fetched:
+            self.dataChanged.emit(self.index(row), self.index(row))
+
+    def remove_note(self, row):
+        """
+        Removes the note of a row.
+
+        Parameters:
+        - row: The row of the note.
+        """
+        if row < self.fetched:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.notes[row]
+            self.fetched -= 1
+            self.endRemoveRows()
+        else:
+            del self.notes[row]
+
+
+class NoteDelegate(QStyledItemDelegate):
+    """
+    Draws a note as wrapped rich text, with its header and highlighted search matches.
+
+    A note is only laid out when its row is measured or painted, so the cost of the view
+    follows the notes on screen rather than the size of the record. Row heights are
+    remembered for each note text and width.
+    """
+
+    def __init__(self, view):
+        """
+        Initializes the NoteDelegate.
+
+        Parameters:
+        - view: The list view the delegate draws for, whose width the notes wrap to.
+        """
+        super().__init__(view)
+        self.view = view
+        self.highlight = ""  # Text highlighted in every note
+        self.heights = {}    # Maps (code, text, width) -> row height
+
+    def document(self, note, width):
+        """
+        Lays out a note for a given width.
+
+        Parameters:
+        - note: The note to lay out.
+        - width: The width available, in pixels.
+
+        Returns:
+        - QTextDocument: The laid out note.
+        """
+        document = QTextDocument()
+        document.setDocumentMargin(NOTE_MARGIN)
+        document.setDefaultFont(self.view.font())
+        text_option = QTextOption(Qt.AlignmentFlag.AlignLeft)
+        text_option.setWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)  # Long words wrap too
+        document.setDefaultTextOption(text_option)
+        document.setHtml(note_html(note, self.highlight))
+        document.setTextWidth(width)
+        return document
+
+    def paint(self, painter, option, index):
+        """
+        Paints a note: the item background and selection, the text and a separator line.
+
+        Parameters:
+        - painter: The QPainter to draw with.
+        - option: The style options of the item.
+        - index: The QModelIndex of the note.
+        """
+        options = QStyleOptionViewItem(option)
+        self.initStyleOption(options, index)
+        options.text = ""
+        style = options.widget.style() if options.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, options, painter, options.widget)
+
+        rect = options.rect
+        document = self.document(index.data(NOTE_ROLE), rect.width())
+        painter.save()
+        painter.translate(rect.topLeft())
+        document.drawContents(painter, QRectF(0, 0, rect.width(), rect.height()))
+        painter.setPen(QColor(SEPARATOR_COLOR))
+        painter.drawLine(0, rect.height() - 1, rect.width(), rect.height() - 1)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        """
+        Returns the size of a note wrapped to the width of the view.
+
+        Parameters:
+        - option: The style options of the item.
+        - index: The QModelIndex of the note.
+
+        Returns:
+        - QSize: The size of the row.
+        """
+        note = index.data(NOTE_ROLE)
+        width = self.view.viewport().width()
+        key = (note.code, note.text, width)
+        height = self.heights.get(key)
+        if height is None:
+            if len(self.heights) >= MAX_CACHED_HEIGHTS:
+                self.heights.clear()
+            height = math.ceil(self.document(note, width).size().height()) + 1
+            self.heights[key] = height
+        return QSize(width, height)
+
+
+class NoteListView(QListView):
+    """
+    A list of notes that stays responsive for records of any size.
+
+    Notes are fetched in batches as the list is scrolled and laid out only when shown;
+    occurrences of a search text can be highlighted and jumped to. Selected notes are
+    copied with the usual copy shortcut.
+    """
+
+    def __init__(self, notes, highlight="", parent=None):
+        """
+        Initializes the NoteListView.
+
+        Parameters:
+        - notes: The note objects to show, in display order.
+        - highlight: The text to highlight in the notes, or an empty string.
+        - parent: The parent widget.
+        """
+        super().__init__(parent)
+        self.note_model = NoteListModel(notes, self)
+        self.delegate = NoteDelegate(self)
+        self.delegate.highlight = highlight
+        self.setModel(self.note_model)
+        self.setItemDelegate(self.delegate)
+        self.setUniformItemSizes(False)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(FETCH_SIZE)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
+
+    def set_highlight(self, text):
+        """
+        Highlights another text in every note.
+
+        Parameters:
+        - text: The text to highlight, or an empty string for none.
+        """
+        self.delegate.highlight = text
+        self.viewport().update()
+
+    def find(self, text, start=0):
+        """
+        Scrolls to the first note containing a text, from a given row on.
+
+        Parameters:
+        - text: The text to look for, ignoring case.
+        - start: The first row to look at.
+
+        Returns:
+        - int: The row of the note found, or None if no note from `start` on contains the text.
+        """
+        text = text.lower()
+        for row in range(start, len(self.note_model.notes)):
+            if text in self.note_model.notes[row].text.lower():
+                self.note_model.fetch_to(row)
+                index = self.note_model.index(row)
+                self.setCurrentIndex(index)
+                self.scrollTo(index, QListView.ScrollHint.PositionAtTop)
+                return row
+        return None
+
+    def relayout(self):
+        """
+        Lays out the fetched notes again, after a note changed size.
+        """
+        self.doItemsLayout()
+
+    def keyPressEvent(self, event):
+        """
+        Copies the selected notes to the clipboard on the copy shortcut.
+
+        Parameters:
+        - event: The key press event.
+        """
+        if event.matches(QKeySequence.StandardKey.Copy):
+            rows = sorted(index.row() for index in self.selectedIndexes())
+            QApplication.clipboard().setText("\n\n".join(self.note_model.data(self.note_model.index(row)) for row in rows))
+            return
+        super().keyPressEvent(event)
@@ -1,4 +1,4 @@
-from PyQt6.QtCore import Qt, QAbstractTableModel
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QTableView, QMessageBox, QHeaderView, QStyledItemDelegate
 )
@@ -110,6 +110,64 @@ class PatientTableModel(QAbstractTableModel):
             if orientation == Qt.Orientation.Horizontal:
                 return self.headers[section]
 
+    def row_of(self, phn):
+        """
+        Finds the row of a patient.
+
+        Parameters:
+        - phn: The PHN of the patient.
+
+        Returns:
+        - int: The row of the patient, or None if it is not in the table.
+        """
+        for row, patient in enumerate(self.patients):
+            if patient.phn == phn:
+                return row
+        return None
+
+    def add_patient(self, patient):
+        """
+        Appends a patient as a new row.
+
+        Parameters:
+        - patient: The patient object to add.
+        """
+        row = len(self.patients)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.patients.append(patient)
+        self.endInsertRows()
+
+    def replace_patient(self, phn, patient):
+        """
+        Shows the new details of a patient in its row, which keeps its place if the PHN changed.
+
+        Parameters:
+        - phn: The PHN the patient had before the change.
+        - patient: The changed patient object.
+        """
+        # The row may hold the very object that was changed, already showing the new PHN
+        row = next((row for row, shown in enumerate(self.patients) if shown is patient), None)
+        if row is None:
+            row = self.row_of(phn)
+        if row is None:
+            self.add_patient(patient)
+            return
+        self.patients[row] = patient
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1))
+
+    def remove_patient(self, phn):
+        """
+        Removes the row of a patient, if it is in the table.
+
+        Parameters:
+        - phn: The PHN of the patient to remove.
+        """
+        row = self.row_of(phn)
+        if row is not None:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.patients[row]
+            self.endRemoveRows()
+
     @staticmethod
     def insert_breaking_characters(text):
         """
@@ -175,22 +233,30 @@ class ListAllPatientsGUI(QWidget):
             }
         """)  # Styling for the table
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)  
+        # Rows are sized once here and then only when they change: sizing them to their
+        # contents on every layout measures every row each time the screen is shown
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
         self.table_view.verticalHeader().setVisible(False)  
         self.table_view.setItemDelegate(WordWrapDelegate())  
         layout.addWidget(self.table_view)
 
         # Load patients and set up the model
+        patients = []
         try:
             patients = self.controller.patient_dao.list_patients() 
-            if patients:
-                self.model = PatientTableModel(patients)  
-                self.table_view.setModel(self.model)  
-                self.table_view.resizeRowsToContents()
-            else:
+            if not patients:
                 QMessageBox.information(self, "No Patients", "There are no patients in the system.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {str(e)}")
+        # The model is set even when empty, so patients added later appear in it
+        self.model = PatientTableModel(list(patients))
+        self.table_view.setModel(self.model)
+        self.table_view.resizeRowsToContents()
+
+        # Keep the table up to date with changes made from now on, here or in other processes
+        change_feed = self.controller.change_feed
+        change_feed.subscribe(self.apply_change)
+        self.destroyed.connect(lambda: change_feed.unsubscribe(self.apply_change))
 
         # Back to Main Menu Button
         self.back_to_menu_button = QPushButton("Back to Menu")
@@ -212,10 +278,40 @@ class ListAllPatientsGUI(QWidget):
         self.back_to_menu_button.clicked.connect(self.back_to_menu_func)
         layout.addWidget(self.back_to_menu_button)
 
+    def apply_change(self, event):
+        """
+        Applies one change feed event to the table, touching only the row it concerns.
+
+        Parameters:
+        - event: The change event, with its operation and arguments.
+        """
+        op, args = event["op"], event["args"]
+        if op == "create_patient":
+            patient = self.controller.search_patient(args["phn"])
+            if patient is not None and self.model.row_of(patient.phn) is None:
+                self.model.add_patient(patient)
+                self.table_view.resizeRowToContents(self.model.row_of(patient.phn))
+        elif op == "update_patient":
+            patient = self.controller.search_patient(args["phn"])
+            if patient is None:
+                self.model.remove_patient(args["old_phn"])
+            else:
+                self.model.replace_patient(args["old_phn"], patient)
+                self.table_view.resizeRowToContents(self.model.row_of(patient.phn))
+        elif op == "delete_patient":
+            self.model.remove_patient(args["phn"])
+
+    def refresh(self):
+        """
+        Catches up with the changes of other processes when the screen is shown again.
+        Changes made in this process were applied as they happened.
+        """
+        self.controller.change_feed.poll()
+
     def back_to_menu_func(self):
         """
         Navigates back to the main menu GUI.
         """
         from clinic.gui.main_menu_gui import MainMenuGUI  # Delayed import to avoid circular imports
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(MainMenuGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_cached(MainMenuGUI)
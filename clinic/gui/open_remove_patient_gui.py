@@ -181,4 +181,4 @@ class RemovePatientGUI(QWidget):
         """
         from clinic.gui.main_menu_gui import MainMenuGUI # Delayed import to avoid circular imports
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(MainMenuGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_cached(MainMenuGUI)
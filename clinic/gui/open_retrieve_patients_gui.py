@@ -1,10 +1,16 @@
-from PyQt6.QtCore import Qt, QAbstractTableModel
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QThread, QTimer, QStringListModel, pyqtSignal
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox, QTableView, QHeaderView, QStyledItemDelegate, QHBoxLayout
+    QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox, QTableView, QHeaderView, QStyledItemDelegate, QHBoxLayout,
+    QCompleter
 )
 from PyQt6.QtGui import QTextOption
 from clinic.exception import IllegalAccessException
 
+SEARCH_DEBOUNCE_MS = 250   # Delay after the last keystroke before a search starts
+MAX_STREAMED_RESULTS = 200 # Maximum number of patients shown while typing
+STREAM_BATCH_SIZE = 50     # Number of patients added to the table per batch
+MAX_SUGGESTIONS = 10       # Maximum number of names suggested by the autocompleter
+
 
 class WordWrapDelegate(QStyledItemDelegate):
     """
@@ -112,6 +118,28 @@ class PatientTableModel(QAbstractTableModel):
             return self.headers[section]
         return None
 
+    def append_patients(self, patients):
+        """
+        Appends patients at the end of the table, notifying attached views.
+
+        Parameters:
+        - patients: A list of patient objects to add.
+        """
+        if not patients:
+            return
+        first = len(self.patients)
+        self.beginInsertRows(QModelIndex(), first, first + len(patients) - 1)
+        self.patients.extend(patients)
+        self.endInsertRows()
+
+    def clear(self):
+        """
+        Removes every patient from the table.
+        """
+        self.beginResetModel()
+        self.patients = []
+        self.endResetModel()
+
     @staticmethod
     def insert_breaking_characters(text):
         """
@@ -126,6 +154,63 @@ class PatientTableModel(QAbstractTableModel):
         return "\u200B".join(text) if isinstance(text, str) else text
 
 
+class PatientSearchWorker(QThread):
+    """
+    Background thread that retrieves patients by name and streams the results in batches.
+    Keeps the search off the UI thread so typing stays responsive. Names for the
+    autocompleter are looked up first, in the same thread. The store is scanned
+    in chunks and released between them, so a cancelled search stops after the current
+    chunk instead of finishing the scan.
+    """
+
+    results_ready = pyqtSignal(int, object)  # (search id, list of patients)
+    search_failed = pyqtSignal(int, object)  # (search id, exception)
+    suggestions_ready = pyqtSignal(int, object)  # (search id, list of names)
+
+    def __init__(self, controller, search_id, search_string, limit=MAX_STREAMED_RESULTS, parent=None):
+        """
+        Initializes the PatientSearchWorker.
+
+        Parameters:
+        - controller: The Controller instance used to run the search.
+        - search_id: Identifier of the search, used to discard stale results.
+        - search_string: The name (or part of it) to search for.
+        - limit: The maximum number of patients streamed back.
+        - parent: The parent QObject.
+        """
+        super().__init__(parent)
+        self.controller = controller
+        self.search_id = search_id
+        self.search_string = search_string
+        self.limit = limit
+
+    def run(self):
+        """
+        Looks up the names to suggest, then runs the search and emits the results in
+        batches as they are found, until the limit is reached, the scan ends or the
+        search is interrupted.
+        """
+        patients = []
+        emitted = 0
+        try:
+            suggestions = self.controller.autocomplete_patients(self.search_string, MAX_SUGGESTIONS)
+            self.suggestions_ready.emit(self.search_id, [patient.name for patient in suggestions])
+            for chunk in self.controller.scan_patients(self.search_string):
+                if self.isInterruptionRequested():
+                    return
+                patients.extend(chunk[:self.limit - len(patients)])
+                while len(patients) - emitted >= STREAM_BATCH_SIZE:
+                    self.results_ready.emit(self.search_id, patients[emitted:emitted + STREAM_BATCH_SIZE])
+                    emitted += STREAM_BATCH_SIZE
+                if len(patients) >= self.limit:
+                    break
+        except Exception as e:
+            self.search_failed.emit(self.search_id, e)
+            return
+        if emitted < len(patients) and not self.isInterruptionRequested():
+            self.results_ready.emit(self.search_id, patients[emitted:])
+
+
 class RetrievePatientsGUI(QWidget):
     """
     GUI for retrieving patients by name.
@@ -166,6 +251,24 @@ class RetrievePatientsGUI(QWidget):
         self.name_input = QLineEdit()
         layout.addWidget(self.name_input)
 
+        # Search as you type: restart the debounce timer on every keystroke
+        self.search_id = 0
+        self.search_worker = None
+        self.pending_search = None
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.debounce_timer.timeout.connect(self.start_incremental_search)
+        self.name_input.textChanged.connect(self.debounce_timer.start)
+
+        # Suggest names starting with the typed text, looked up in the sorted name index by the search worker
+        self.suggestion_model = QStringListModel(self)
+        self.completer = QCompleter(self.suggestion_model, self)
+        self.completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.name_input.setCompleter(self.completer)
+        self.typed = False  # Whether the input was typed in since suggestions were last shown
+        self.name_input.textEdited.connect(self.mark_typed)
+
         # Buttons for search and back to menu
         search_button = QPushButton("Retrieve Patients")
         search_button.setFixedSize(140, 30) 
@@ -220,6 +323,10 @@ class RetrievePatientsGUI(QWidget):
                 QMessageBox.warning(self, "Input Error", "Please enter a name to search.")
                 return
 
+            # Stop any search started while typing so it cannot overwrite these results
+            self.debounce_timer.stop()
+            self.cancel_search()
+
             # Fetch patients matching the search string
             patients = self.controller.retrieve_patients(search_string)
 
@@ -228,19 +335,136 @@ class RetrievePatientsGUI(QWidget):
                 self.patient_table.setModel(self.patient_model)
                 self.patient_table.resizeRowsToContents() 
             else:
-                QMessageBox.information(self, "No Results", "No patients found matching the search criteria.")
-                self.patient_model = PatientTableModel() 
+                # Fall back to approximate matching for misspelled names
+                similar_patients = self.controller.fuzzy_search_patients(search_string, MAX_SUGGESTIONS)
+                self.patient_model = PatientTableModel(similar_patients)
                 self.patient_table.setModel(self.patient_model)
+                if similar_patients:
+                    self.patient_table.resizeRowsToContents()
+                    QMessageBox.information(self, "No Exact Results", "No patients found matching the search criteria. Showing similar names.")
+                else:
+                    QMessageBox.information(self, "No Results", "No patients found matching the search criteria.")
 
         except IllegalAccessException:
             QMessageBox.critical(self, "Access Error", "You must be logged in to retrieve patients.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {str(e)}")
 
+    def update_suggestions(self, search_id, names):
+        """
+        Refreshes the autocompleter with the names found by the latest search worker.
+
+        Parameters:
+        - search_id: Identifier of the search that looked up the names.
+        - names: The patient names starting with the searched text.
+        """
+        if search_id != self.search_id:
+            return
+        self.suggestion_model.setStringList(names)
+        if self.typed and names and self.name_input.hasFocus():
+            # Not for text set by picking a suggestion
+            self.typed = False
+            self.completer.complete()
+
+    def mark_typed(self):
+        """
+        Records that the user typed in the name input, so the next suggestions pop up.
+        """
+        self.typed = True
+
+    def start_incremental_search(self):
+        """
+        Starts a background search for the current input, cancelling any stale search.
+        Only one worker runs at a time: a newer search waits until the stale one stops.
+        """
+        search_string = self.name_input.text().strip()
+        self.cancel_search()
+        self.patient_model.clear()
+        if not search_string:
+            self.suggestion_model.setStringList([])
+            return
+
+        if self.search_worker is not None:
+            # Start the newest search once the interrupted worker has finished
+            self.pending_search = search_string
+            return
+        self.run_search_worker(search_string)
+
+    def run_search_worker(self, search_string):
+        """
+        Creates and starts a worker thread for a search.
+
+        Parameters:
+        - search_string: The name (or part of it) to search for.
+        """
+        self.search_id += 1
+        self.search_worker = PatientSearchWorker(self.controller, self.search_id, search_string, parent=self)
+        self.search_worker.results_ready.connect(self.append_search_results)
+        self.search_worker.search_failed.connect(self.show_search_error)
+        self.search_worker.suggestions_ready.connect(self.update_suggestions)
+        self.search_worker.finished.connect(self.search_worker_finished)
+        self.search_worker.start()
+
+    def cancel_search(self):
+        """
+        Invalidates the running search so its remaining results are ignored.
+        """
+        self.pending_search = None
+        if self.search_worker is not None:
+            self.search_worker.requestInterruption()
+            self.search_id += 1
+
+    def search_worker_finished(self):
+        """
+        Releases the finished worker and starts the pending search, if any.
+        """
+        self.search_worker.deleteLater()
+        self.search_worker = None
+        if self.pending_search is not None:
+            search_string = self.pending_search
+            self.pending_search = None
+            self.run_search_worker(search_string)
+
+    def append_search_results(self, search_id, patients):
+        """
+        Streams a batch of search results into the table if they belong to the latest search.
+
+        Parameters:
+        - search_id: Identifier of the search that produced the batch.
+        - patients: A list of matching patient objects.
+        """
+        if search_id != self.search_id:
+            return
+        if self.patient_table.model() is not self.patient_model:
+            self.patient_table.setModel(self.patient_model)
+        first = self.patient_model.rowCount()
+        self.patient_model.append_patients(patients)
+        for row in range(first, self.patient_model.rowCount()):
+            self.patient_table.resizeRowToContents(row)
+
+    def show_search_error(self, search_id, error):
+        """
+        Reports an error raised by the latest background search.
+
+        Parameters:
+        - search_id: Identifier of the failed search.
+        - error: The exception raised by the search.
+        """
+        if search_id != self.search_id:
+            return
+        if isinstance(error, IllegalAccessException):
+            QMessageBox.critical(self, "Access Error", "You must be logged in to retrieve patients.")
+        else:
+            QMessageBox.critical(self, "Error", f"An unexpected error occurred: {str(error)}")
+
     def back_to_menu_func(self):
         """
         Navigates back to the main menu GUI.
         """
+        self.debounce_timer.stop()
+        self.cancel_search()
+        if self.search_worker is not None:
+            self.search_worker.wait()
         from clinic.gui.main_menu_gui import MainMenuGUI  # Delayed import to avoid circular imports
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(MainMenuGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_cached(MainMenuGUI)
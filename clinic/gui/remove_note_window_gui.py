@@ -162,7 +162,7 @@ class RemoveNoteWindow(QWidget):
         """
         from .appointment_main_menu_gui import AppointMainMenuGUI  # Delayed import to avoid circular imports
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(AppointMainMenuGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_cached(AppointMainMenuGUI)
         else:
             QMessageBox.critical(self, "Error", "Parent widget not set. Cannot navigate back.")
             self.close()  # Close the current window as a fallback
@@ -1,12 +1,13 @@
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
-    QWidget, QPushButton, QLabel, QPlainTextEdit, QVBoxLayout
+    QWidget, QPushButton, QLabel, QVBoxLayout
 )
+from clinic.gui.note_list_view import NoteListView
 
 class RetrieveNotesWindow(QWidget):
     """
     Window for displaying retrieved notes that contain specific text.
-    Allows users to view matching notes and navigate back to the main menu.
+    Allows users to view matching notes, with the search text highlighted, and navigate back to the main menu.
     """
 
     def __init__(self, controller, parent, notes, search_text):
@@ -36,11 +37,9 @@ class RetrieveNotesWindow(QWidget):
         title_label.setStyleSheet("font-size: 32px; font-weight: bold;")  
         self.layout.addWidget(title_label)
 
-        # Display the notes in a QPlainTextEdit widget
-        self.notes_display = QPlainTextEdit()
-        self.notes_display.setReadOnly(True)  
-        self.notes_display.setPlainText(self.format_notes())  
-        self.layout.addWidget(self.notes_display)
+        # Display the notes in a list that lays out only the notes scrolled to
+        self.notes_view = NoteListView(self.notes, highlight=self.search_text)
+        self.layout.addWidget(self.notes_view)
 
         # Back to Menu button
         back_button_layout = QVBoxLayout()
@@ -54,25 +53,10 @@ class RetrieveNotesWindow(QWidget):
         back_button_layout.addWidget(back_button)
         self.layout.addLayout(back_button_layout)
 
-    def format_notes(self):
-        """
-        Formats the notes for display in the QPlainTextEdit widget.
-
-        Returns:
-        - str: A formatted string containing all matching notes.
-        """
-        # Join notes into a readable format, separating each with a blank line
-        return "\n\n".join(
-            [
-                f"Note number: {note.code}\nNote #{note.code}, from {note.timestamp}\n{note.text}"
-                for note in self.notes
-            ]
-        )
-
     def return_to_menu(self):
         """
         Navigates back to the appointment main menu.
         """
         from clinic.gui.appointment_main_menu_gui import AppointMainMenuGUI  # Delayed import to avoid circular imports
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(AppointMainMenuGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_cached(AppointMainMenuGUI)
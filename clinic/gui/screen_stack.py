@@ -0,0 +1,70 @@
+from PyQt6.QtWidgets import QStackedWidget
+
+
+class ScreenStack(QStackedWidget):
+    """
+    The screens of a logged in session, shown one at a time in the main window.
+
+    Menus and other screens that do not depend on a particular patient are built once
+    and kept: showing one again only calls its `refresh` method, if it has one, instead
+    of recreating its widgets and parsing their stylesheets. Screens built for one use,
+    such as the details of a patient, are deleted as soon as another screen is shown.
+    """
+
+    def __init__(self, parent=None):
+        """
+        Initializes the ScreenStack.
+
+        Parameters:
+        - parent: The main window.
+        """
+        super().__init__(parent)
+        self.screens = {}      # Screens kept for reuse, by class
+        self.transient = None  # The screen shown for one use, if any
+
+    def show_cached(self, screen_class, *args):
+        """
+        Shows the kept screen of a class, building it the first time.
+
+        Parameters:
+        - screen_class: The class of the screen.
+        - *args: The arguments to build the screen with, typically the controller and main window.
+
+        Returns:
+        - QWidget: The screen shown.
+        """
+        screen = self.screens.get(screen_class)
+        if screen is None:
+            screen = screen_class(*args)
+            self.screens[screen_class] = screen
+            self.addWidget(screen)
+        else:
+            refresh = getattr(screen, "refresh", None)
+            if refresh is not None:
+                refresh()
+        self._show(screen)
+        return screen
+
+    def show_screen(self, screen):
+        """
+        Shows a screen built for one use. It is deleted when another screen is shown.
+
+        Parameters:
+        - screen: The screen to show.
+
+        Returns:
+        - QWidget: The screen shown.
+        """
+        self.addWidget(screen)
+        self._show(screen)
+        self.transient = screen
+        return screen
+
+    def _show(self, screen):
+        previous = self.transient
+        self.setCurrentWidget(screen)
+        if previous is not None and previous is not screen:
+            # Deleted once the event that navigated away, possibly its own, is handled
+            self.removeWidget(previous)
+            previous.deleteLater()
+            self.transient = None
@@ -118,7 +118,7 @@ class StartAppointmentGUI(QWidget):
         """
         from clinic.gui.appointment_main_menu_gui import AppointMainMenuGUI  # Delayed import to avoid circular imports
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(AppointMainMenuGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_cached(AppointMainMenuGUI)
 
     def back_to_menu_func(self):
         """
@@ -126,7 +126,7 @@ class StartAppointmentGUI(QWidget):
         """
         from clinic.gui.main_menu_gui import MainMenuGUI  # Delayed import to avoid circular imports
         if self.parent_widget:
-            self.parent_widget.setCentralWidget(MainMenuGUI(self.controller, self.parent_widget))
+            self.parent_widget.show_cached(MainMenuGUI)
 
     def clear_layout(self):
         """
@@ -1,4 +1,5 @@
 from datetime import datetime
+from clinic.delta_codec import encode_delta, decode_delta
 
 class Note:
     """
@@ -12,17 +13,23 @@ class Note:
         Parameters:
         - code (int): The unique identifier for the note.
         - text (str): The textual content or details of the note.
+        - timestamp (datetime, optional): When the note was written, preserved for loaded
+        or imported notes. Defaults to the current time.
 
         Return Type:
         - None
         """
         self.code = code
         self.text = text
-        self.timestamp = datetime.now()
+        self.timestamp = timestamp if timestamp is not None else datetime.now()
+        self.revisions = []  # Previous versions as (timestamp, delta against the next newer text), oldest first
+        self.version = 1  # Incremented on every update, so concurrent editors can detect conflicting changes
 
     def update_details(self, text: str) -> None:
         """
         Updates the details of the note and refreshes the timestamp to the current time.
+        The previous text is kept in the revision history as a compressed delta against
+        the new text, so reading the latest version stays a plain attribute access.
 
         Parameters:
         - text (str): The updated text details for the note.
@@ -30,8 +37,47 @@ class Note:
         Return Type:
         - None
         """
+        if text != self.text:
+            self.get_revisions().append((self.timestamp, encode_delta(text, self.text)))
         self.text = text
         self.timestamp = datetime.now()
+        self.version = self.get_version() + 1
+
+    def get_version(self) -> int:
+        """
+        Returns the version number, initializing it for notes saved before versions existed.
+
+        Return Type:
+        - int: The number of times the note was written, starting at 1.
+        """
+        if not hasattr(self, 'version'):
+            self.version = 1
+        return self.version
+
+    def get_revisions(self) -> list:
+        """
+        Returns the stored revisions, initializing them for notes saved before revisions existed.
+
+        Return Type:
+        - list: (timestamp, delta) pairs, oldest first.
+        """
+        if not hasattr(self, 'revisions'):
+            self.revisions = []
+        return self.revisions
+
+    def history(self) -> list:
+        """
+        Rebuilds every version of the note by applying the deltas from newest to oldest.
+
+        Return Type:
+        - list: (timestamp, text) pairs, starting with the current version.
+        """
+        versions = [(self.timestamp, self.text)]
+        text = self.text
+        for timestamp, delta in reversed(self.get_revisions()):
+            text = decode_delta(text, delta)
+            versions.append((timestamp, text))
+        return versions
 
     def __eq__(self, other: 'Note') -> bool:
         """
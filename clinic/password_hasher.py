@@ -0,0 +1,230 @@
+import base64
+from abc import ABC, abstractmethod
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+class PasswordHasher(ABC):
+    """
+    Hashes passwords into self-describing strings and verifies them.
+
+    An encoded hash starts with the algorithm name followed by its parameters, salt and
+    digest, separated by '$', so hashes made with different algorithms or work factors
+    can live in the same credentials file.
+    """
+    algorithm = None
+
+    @abstractmethod
+    def hash(self, password: str) -> str:
+        """
+        Hashes a password with a new random salt.
+
+        Parameters:
+        - password (str): The plain text password.
+
+        Return Type:
+        - str: The encoded hash.
+        """
+        pass
+
+    @abstractmethod
+    def verify(self, password: str, encoded: str) -> bool:
+        """
+        Checks a password against an encoded hash made by this hasher.
+
+        Parameters:
+        - password (str): The plain text password.
+        - encoded (str): The stored encoded hash.
+
+        Return Type:
+        - bool: True if the password matches, False otherwise.
+        """
+        pass
+
+    def needs_rehash(self, encoded: str) -> bool:
+        """
+        Checks whether a stored hash was made with another algorithm or work factor.
+
+        Parameters:
+        - encoded (str): The stored encoded hash.
+
+        Return Type:
+        - bool: True if the hash should be replaced by one from this hasher.
+        """
+        return not encoded.startswith(f'{self.algorithm}$')
+
+class SHA256Hasher(PasswordHasher):
+    """ The original unsalted SHA-256 hex digest. Kept only to verify old credentials. """
+    algorithm = 'sha256'
+
+    def hash(self, password: str) -> str:
+        return hashlib.sha256(password.encode('utf-8')).hexdigest()
+
+    def verify(self, password: str, encoded: str) -> bool:
+        return hmac.compare_digest(self.hash(password), encoded)
+
+    def needs_rehash(self, encoded: str) -> bool:
+        return '$' in encoded
+
+class PBKDF2Hasher(PasswordHasher):
+    """ PBKDF2-HMAC-SHA256 with a per-user salt and a configurable number of iterations. """
+    algorithm = 'pbkdf2_sha256'
+
+    def __init__(self, iterations: int = 600000) -> None:
+        self.iterations = iterations
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(16)
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, self.iterations)
+        return f'{self.algorithm}${self.iterations}${_b64(salt)}${_b64(digest)}'
+
+    def verify(self, password: str, encoded: str) -> bool:
+        _, iterations, salt, digest = encoded.split('$')
+        candidate = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), _unb64(salt), int(iterations))
+        return hmac.compare_digest(candidate, _unb64(digest))
+
+    def needs_rehash(self, encoded: str) -> bool:
+        return super().needs_rehash(encoded) or int(encoded.split('$')[1]) != self.iterations
+
+class ScryptHasher(PasswordHasher):
+    """ scrypt with a per-user salt and configurable cost (n), block size (r) and parallelism (p). """
+    algorithm = 'scrypt'
+
+    def __init__(self, n: int = 2 ** 14, r: int = 8, p: int = 1) -> None:
+        self.n = n
+        self.r = r
+        self.p = p
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(16)
+        digest = self._derive(password, salt, self.n, self.r, self.p)
+        return f'{self.algorithm}${self.n}${self.r}${self.p}${_b64(salt)}${_b64(digest)}'
+
+    def verify(self, password: str, encoded: str) -> bool:
+        _, n, r, p, salt, digest = encoded.split('$')
+        candidate = self._derive(password, _unb64(salt), int(n), int(r), int(p))
+        return hmac.compare_digest(candidate, _unb64(digest))
+
+    def needs_rehash(self, encoded: str) -> bool:
+        if super().needs_rehash(encoded):
+            return True
+        return [int(value) for value in encoded.split('$')[1:4]] != [self.n, self.r, self.p]
+
+    @staticmethod
+    def _derive(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r * p, dklen=32)
+
+HASHERS = {hasher.algorithm: hasher for hasher in (SHA256Hasher(), PBKDF2Hasher(), ScryptHasher())}
+
+def verify_password(password: str, encoded: str) -> bool:
+    """
+    Checks a password against a stored hash made by any known hasher.
+
+    Parameters:
+    - password (str): The plain text password.
+    - encoded (str): The stored encoded hash.
+
+    Return Type:
+    - bool: True if the password matches, False otherwise.
+    """
+    algorithm = encoded.split('$', 1)[0] if '$' in encoded else SHA256Hasher.algorithm
+    hasher = HASHERS.get(algorithm)
+    if hasher is None:
+        return False
+    try:
+        return hasher.verify(password, encoded)
+    except ValueError:
+        # A malformed stored hash never matches
+        return False
+
+class VerificationCache:
+    """
+    Remembers recently verified credentials for a short time, so re-authenticating the
+    same user does not pay for the slow hash again.
+
+    Passwords are never stored: an entry holds an HMAC of the password under a key
+    generated for this process, together with the stored hash it was verified against.
+    Changing a user's stored hash therefore invalidates the entry.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 1024) -> None:
+        """
+        Initializes an empty VerificationCache.
+
+        Parameters:
+        - ttl (float): How long a verification stays valid, in seconds.
+        - max_entries (int): The maximum number of remembered users.
+
+        Return Type:
+        - None
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.key = os.urandom(32)
+        self.entries = {}  # Maps username -> (password HMAC, stored hash, expiry time)
+        self.lock = threading.Lock()
+
+    def _fingerprint(self, password: str) -> bytes:
+        return hmac.new(self.key, password.encode('utf-8'), hashlib.sha256).digest()
+
+    def check(self, username: str, password: str, stored_hash: str) -> bool:
+        """
+        Checks whether these credentials were verified recently.
+
+        Parameters:
+        - username (str): The username.
+        - password (str): The plain text password.
+        - stored_hash (str): The user's current stored hash.
+
+        Return Type:
+        - bool: True if the same password was verified against the same stored hash
+          within the time to live, False otherwise.
+        """
+        with self.lock:
+            entry = self.entries.get(username)
+        if entry is None:
+            return False
+        fingerprint, verified_hash, expires = entry
+        if expires < time.monotonic() or verified_hash != stored_hash:
+            self.forget(username)
+            return False
+        return hmac.compare_digest(fingerprint, self._fingerprint(password))
+
+    def remember(self, username: str, password: str, stored_hash: str) -> None:
+        """
+        Records a successful verification.
+
+        Parameters:
+        - username (str): The username.
+        - password (str): The verified plain text password.
+        - stored_hash (str): The stored hash the password was verified against.
+
+        Return Type:
+        - None
+        """
+        with self.lock:
+            if len(self.entries) >= self.max_entries and username not in self.entries:
+                # Drop the entry closest to expiry
+                del self.entries[min(self.entries, key=lambda name: self.entries[name][2])]
+            self.entries[username] = (self._fingerprint(password), stored_hash, time.monotonic() + self.ttl)
+
+    def forget(self, username: str) -> None:
+        """
+        Removes a user's remembered verification, if any.
+
+        Parameters:
+        - username (str): The username.
+
+        Return Type:
+        - None
+        """
+        with self.lock:
+            self.entries.pop(username, None)
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode('ascii')
+
+def _unb64(text: str) -> bytes:
+    return base64.b64decode(text)
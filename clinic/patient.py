@@ -30,6 +30,7 @@ class Patient:
         self.email = email
         self.address = address
         self.autosave = autosave
+        self.version = 1  # Incremented on every update, so concurrent editors can detect conflicting changes
         self.record = PatientRecord(self.phn,self.autosave)
         
     def get_patient_record(self) -> 'PatientRecord':
@@ -100,6 +101,30 @@ class Patient:
         """
         return self.record.search_note(code)
 
+    def search_notes(self, codes: list) -> list:
+        """
+        Searches for several notes by their codes in the patient's record.
+
+        Parameters:
+        - codes (list): The unique codes of the notes to search for.
+
+        Return Type:
+        - list: The Note instances in the order of the codes, with None for every code not found.
+        """
+        return self.record.search_notes(codes)
+
+    def note_history(self, code: int) -> list:
+        """
+        Retrieves every version of a note by its code.
+
+        Parameters:
+        - code (int): The unique code of the note.
+
+        Return Type:
+        - list: (timestamp, text) pairs from the current version to the oldest, or None if not found.
+        """
+        return self.record.note_history(code)
+
     def retrieve_notes_by_text(self, search_text: str) -> list:
         """
         Retrieves all notes containing the specified text.
@@ -147,4 +172,29 @@ class Patient:
         Return Type:
         - list: A list of all Note instances in the patient's record.
         """
-        return self.record.list_notes()
\ No newline at end of file
+        return self.record.list_notes()
+
+    def retrieve_notes_by_timestamp(self, start=None, end=None) -> list:
+        """
+        Retrieves notes written within an inclusive time range.
+
+        Parameters:
+        - start (datetime): The earliest timestamp, or None for no lower bound.
+        - end (datetime): The latest timestamp, or None for no upper bound.
+
+        Return Type:
+        - list: A list of Note instances, most recent first.
+        """
+        return self.record.retrieve_notes_by_timestamp(start, end)
+
+    def recent_notes(self, count: int) -> list:
+        """
+        Retrieves the most recently written notes.
+
+        Parameters:
+        - count (int): The maximum number of notes to return.
+
+        Return Type:
+        - list: Up to `count` Note instances, most recent first.
+        """
+        return self.record.recent_notes(count)
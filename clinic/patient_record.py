@@ -45,6 +45,18 @@ class PatientRecord:
         - Note: The note instance if found, otherwise None.
         """
         return self.note_dao.search_note(code)
+
+    def search_notes(self, codes: list) -> list:
+        """
+        Searches for several notes by their unique codes.
+
+        Parameters:
+        - codes (list): The unique identifiers of the notes to search for.
+
+        Return Type:
+        - list: The notes in the order of the codes, with None for every code not found.
+        """
+        return self.note_dao.search_notes(codes)
     
     def update_note(self, code: int, text: str) -> bool:
         """
@@ -60,6 +72,18 @@ class PatientRecord:
         note =  self.note_dao.update_note(code,text)
         return note
 
+    def note_history(self, code: int) -> list:
+        """
+        Retrieves every version of a note.
+
+        Parameters:
+        - code (int): The unique identifier of the note.
+
+        Return Type:
+        - list: (timestamp, text) pairs from the current version to the oldest, or None if not found.
+        """
+        return self.note_dao.note_history(code)
+
     def retrieve_notes_by_text(self, search_text: str) -> list:
         """
         Retrieves notes containing the specified search text.
@@ -92,4 +116,29 @@ class PatientRecord:
         Return Type:
         - bool: Returns True if the note is successfully deleted, otherwise False.
         """
-        return self.note_dao.delete_note(code)
\ No newline at end of file
+        return self.note_dao.delete_note(code)
+
+    def retrieve_notes_by_timestamp(self, start=None, end=None) -> list:
+        """
+        Retrieves notes written within an inclusive time range.
+
+        Parameters:
+        - start (datetime): The earliest timestamp, or None for no lower bound.
+        - end (datetime): The latest timestamp, or None for no upper bound.
+
+        Return Type:
+        - list: The matching notes, most recent first.
+        """
+        return self.note_dao.retrieve_notes_by_timestamp(start, end)
+
+    def recent_notes(self, count: int) -> list:
+        """
+        Retrieves the most recently written notes.
+
+        Parameters:
+        - count (int): The maximum number of notes to return.
+
+        Return Type:
+        - list: Up to `count` notes, most recent first.
+        """
+        return self.note_dao.recent_notes(count)
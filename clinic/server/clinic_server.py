@@ -0,0 +1,403 @@
+import json
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+from clinic.controller import Controller
+from clinic.exception import (
+    DuplicateLoginException, IllegalAccessException, IllegalOperationException, InvalidLoginException, NoCurrentPatientException,
+    VersionConflictException
+)
+
+SESSION_TTL = 30 * 60  # Seconds a session token stays valid without being used
+MAX_BATCH = 1000  # Maximum number of requests in one batch
+
+def patient_to_json(patient) -> dict:
+    """
+    Converts a patient into the JSON representation used by the API.
+
+    Parameters:
+    - patient (Patient): The patient to convert.
+
+    Return Type:
+    - dict: The patient's fields.
+    """
+    return {"phn": patient.phn, "name": patient.name, "birth_date": patient.birth_date,
+            "phone": patient.phone, "email": patient.email, "address": patient.address, "version": patient.version}
+
+def note_to_json(note) -> dict:
+    """
+    Converts a note into the JSON representation used by the API.
+
+    Parameters:
+    - note (Note): The note to convert.
+
+    Return Type:
+    - dict: The note's code, text, ISO timestamp and version.
+    """
+    return {"code": note.code, "text": note.text, "timestamp": note.timestamp.isoformat(), "version": note.get_version()}
+
+def split_keys(value: str) -> list:
+    """
+    Parses a comma-separated list of PHNs or note codes from a query string.
+
+    Parameters:
+    - value (str): The keys, such as '9790012000,9790014444'.
+
+    Return Type:
+    - list: The keys as integers, raising ValueError for a key that is not a number.
+    """
+    return [int(key) for key in value.split(',') if key]
+
+class ClinicAPI:
+    """
+    The JSON API over a Controller, independent of the HTTP transport.
+
+    Every user session gets its own controller, created with `Controller.new_session`,
+    so sessions share one patient DAO but keep their own login state. Requests of one
+    session run one at a time. Requests that change the store and batches hold it for
+    writing, so each sees and leaves a consistent store; reads only hold it inside each
+    controller call, so they do not wait for whole requests of other sessions.
+
+    Routes (all bodies and responses are JSON, requests other than login need an
+    'Authorization: Bearer <token>' header):
+    - POST /login, POST /logout
+    - GET /patients[?name= or ?phns=1,2,...], POST /patients
+    - GET, PUT, DELETE /patients/{phn}
+    - GET /patients/{phn}/notes[?text= or ?codes=1,2,...], POST /patients/{phn}/notes
+    - GET, PUT, DELETE /patients/{phn}/notes/{code}
+    - POST /batch with {"requests": [{"method", "path", "body"}, ...]}, not nested
+
+    Patients and notes carry a version. A PUT or DELETE with a "version" in its body
+    only succeeds if the entity is still at that version, and answers 412 otherwise.
+    """
+
+    def __init__(self, controller: Controller, session_ttl: float = SESSION_TTL) -> None:
+        """
+        Initializes the ClinicAPI.
+
+        Parameters:
+        - controller (Controller): The controller owning the store.
+        - session_ttl (float): Seconds a session stays valid without being used.
+
+        Return Type:
+        - None
+        """
+        self.controller = controller
+        self.session_ttl = session_ttl
+        self.sessions = {}  # Maps token -> [session controller, time of last use, lock of its requests]
+        self.sessions_lock = threading.Lock()
+
+    def handle(self, method: str, path: str, body=None, token: str = None, in_batch: bool = False) -> tuple:
+        """
+        Handles one API request.
+
+        Parameters:
+        - method (str): The HTTP method.
+        - path (str): The request path, with its query string.
+        - body: The decoded JSON body, or None.
+        - token (str): The session token, or None.
+        - in_batch (bool): Whether the request is part of a batch.
+
+        Return Type:
+        - tuple: The HTTP status code and the JSON-compatible response.
+        """
+        url = urlsplit(path)
+        parts = [part for part in url.path.split('/') if part]
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if body is not None and not isinstance(body, dict):
+            return 400, {"error": "bad request: the body must be a JSON object"}
+        try:
+            if parts == ['login'] and method == 'POST':
+                return self.login(body)
+            session, session_lock = self.session(token)
+            if parts == ['logout'] and method == 'POST':
+                return self.logout(token)
+            # Requests of a session share its current patient, so they run one at a time
+            with session_lock:
+                if parts == ['batch'] and method == 'POST':
+                    if in_batch:
+                        return 400, {"error": "bad request: batches cannot be nested"}
+                    with self.controller.patient_dao.writing():
+                        return self.batch(body, token)
+                if method == 'GET':
+                    return self.dispatch(session, method, parts, query, body or {})
+                with self.controller.patient_dao.writing():
+                    return self.dispatch(session, method, parts, query, body or {})
+        except (InvalidLoginException, IllegalAccessException):
+            return 401, {"error": "not authenticated"}
+        except VersionConflictException:
+            return 412, {"error": "changed by someone else, read it again"}
+        except (IllegalOperationException, DuplicateLoginException):
+            return 409, {"error": "operation not allowed"}
+        except NoCurrentPatientException:
+            return 404, {"error": "patient not found"}
+        except (KeyError, ValueError, TypeError) as error:
+            return 400, {"error": f"bad request: {error}"}
+
+    def login(self, body) -> tuple:
+        """
+        Logs a user in and opens a session.
+        """
+        session = self.controller.new_session()
+        session.login(body["username"], body["password"])
+        token = secrets.token_urlsafe(32)
+        now = time.monotonic()
+        with self.sessions_lock:
+            # Drop expired sessions while we hold the lock anyway
+            for expired in [key for key, (_, used, _) in self.sessions.items() if now - used > self.session_ttl]:
+                del self.sessions[expired]
+            self.sessions[token] = [session, now, threading.RLock()]
+        return 200, {"token": token}
+
+    def logout(self, token: str) -> tuple:
+        """
+        Closes a session.
+        """
+        with self.sessions_lock:
+            self.sessions.pop(token, None)
+        return 200, {"logged_out": True}
+
+    def session(self, token: str) -> tuple:
+        """
+        Finds the controller of a valid session.
+
+        Parameters:
+        - token (str): The session token.
+
+        Return Type:
+        - tuple: The session's controller and the lock its requests run under, raising
+          IllegalAccessException if the token is unknown or expired.
+        """
+        now = time.monotonic()
+        with self.sessions_lock:
+            entry = self.sessions.get(token)
+            if entry is None or now - entry[1] > self.session_ttl:
+                self.sessions.pop(token, None)
+                raise IllegalAccessException
+            entry[1] = now
+            return entry[0], entry[2]
+
+    def batch(self, body, token: str) -> tuple:
+        """
+        Runs several requests in one round trip, in order, without other requests in between.
+        """
+        requests = body["requests"]
+        if len(requests) > MAX_BATCH:
+            return 413, {"error": f"at most {MAX_BATCH} requests per batch"}
+        responses = []
+        for request in requests:
+            status, payload = self.handle(request["method"].upper(), request["path"], request.get("body"), token, in_batch=True)
+            responses.append({"status": status, "body": payload})
+        return 200, {"responses": responses}
+
+    def dispatch(self, session: Controller, method: str, parts: list, query: dict, body: dict) -> tuple:
+        """
+        Routes a request on patients and notes to the session's controller.
+        """
+        if not parts or parts[0] != 'patients' or len(parts) > 4:
+            return 404, {"error": "unknown resource"}
+
+        if len(parts) == 1:
+            if method == 'GET' and "phns" in query:
+                # Multi-get: results in the order asked for, null for a PHN not found
+                patients = session.search_patients(split_keys(query["phns"]))
+                return 200, [patient_to_json(patient) if patient is not None else None for patient in patients]
+            if method == 'GET':
+                patients = session.retrieve_patients(query["name"]) if "name" in query else session.list_patients()
+                return 200, [patient_to_json(patient) for patient in patients]
+            if method == 'POST':
+                patient = session.create_patient(int(body["phn"]), body["name"], body.get("birth_date"),
+                                                 body.get("phone"), body.get("email"), body.get("address"))
+                return 201, patient_to_json(patient)
+            return 405, {"error": "method not allowed"}
+
+        phn = int(parts[1])
+        patient = session.search_patient(phn)
+        if patient is None:
+            return 404, {"error": "patient not found"}
+
+        if len(parts) == 2:
+            if method == 'GET':
+                return 200, patient_to_json(patient)
+            if method == 'PUT':
+                fields = {**patient_to_json(patient), **body}
+                session.update_patient(phn, int(fields["phn"]), fields["name"], fields["birth_date"],
+                                       fields["phone"], fields["email"], fields["address"], body.get("version"))
+                return 200, patient_to_json(patient)
+            if method == 'DELETE':
+                session.delete_patient(phn, body.get("version"))
+                return 200, {"deleted": True}
+            return 405, {"error": "method not allowed"}
+
+        if parts[2] != 'notes':
+            return 404, {"error": "unknown resource"}
+        session.set_current_patient(phn)
+        try:
+            return self.dispatch_notes(session, method, parts, query, body)
+        finally:
+            session.unset_current_patient()
+
+    def dispatch_notes(self, session: Controller, method: str, parts: list, query: dict, body: dict) -> tuple:
+        """
+        Routes a request on the notes of the session's current patient.
+        """
+        if len(parts) == 3:
+            if method == 'GET' and "codes" in query:
+                notes = session.search_notes(split_keys(query["codes"]))
+                return 200, [note_to_json(note) if note is not None else None for note in notes]
+            if method == 'GET':
+                notes = session.retrieve_notes(query["text"]) if "text" in query else session.list_notes()
+                return 200, [note_to_json(note) for note in notes]
+            if method == 'POST':
+                return 201, note_to_json(session.create_note(body["text"]))
+            return 405, {"error": "method not allowed"}
+
+        code = int(parts[3])
+        note = session.search_note(code)
+        if note is None:
+            return 404, {"error": "note not found"}
+        if method == 'GET':
+            return 200, note_to_json(note)
+        if method == 'PUT':
+            session.update_note(code, body["text"], body.get("version"))
+            return 200, note_to_json(session.search_note(code))
+        if method == 'DELETE':
+            session.delete_note(code, body.get("version"))
+            return 200, {"deleted": True}
+        return 405, {"error": "method not allowed"}
+
+class ClinicRequestHandler(BaseHTTPRequestHandler):
+    """
+    Translates HTTP/1.1 requests to ClinicAPI calls. Connections are kept alive
+    between requests until the client closes them or stays idle for `timeout` seconds.
+    """
+    protocol_version = 'HTTP/1.1'
+    server_version = 'ClinicServer/1.0'
+    timeout = 30  # Seconds an idle keep-alive connection may hold a worker
+    # Headers and body are written separately; with Nagle's algorithm the body would wait
+    # for the client's delayed ACK, adding ~40ms to every request on a kept-alive connection
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.respond()
+
+    def do_POST(self):
+        self.respond()
+
+    def do_PUT(self):
+        self.respond()
+
+    def do_DELETE(self):
+        self.respond()
+
+    def respond(self):
+        length = self.body_length()
+        if length is None:
+            # Where the body ends is unknown, so the connection cannot serve another request
+            self.close_connection = True
+            status, payload = 400, {"error": "missing or invalid Content-Length"}
+        else:
+            raw = self.rfile.read(length) if length else b''
+            try:
+                body = json.loads(raw) if raw else None
+            except ValueError:
+                status, payload = 400, {"error": "invalid JSON"}
+            else:
+                authorization = self.headers.get('Authorization', '')
+                token = authorization[len('Bearer '):] if authorization.startswith('Bearer ') else None
+                status, payload = self.server.api.handle(self.command, self.path, body, token)
+        self.send_json(status, payload)
+
+    def body_length(self):
+        """
+        Reads the length of the request body from the Content-Length header. POST and PUT
+        requests must send it; other requests without it have no body.
+
+        Return Type:
+        - int: The number of bytes of the body, or None if the header is missing from a
+          POST or PUT request, not a number or negative.
+        """
+        value = self.headers.get('Content-Length')
+        if value is None:
+            return None if self.command in ('POST', 'PUT') else 0
+        value = value.strip()
+        return int(value) if value.isascii() and value.isdigit() else None
+
+    def send_json(self, status: int, payload) -> None:
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class ClinicServer(HTTPServer):
+    """
+    An HTTP server handling connections on a fixed pool of worker threads.
+
+    Each kept-alive connection holds one worker, so `workers` bounds the number of
+    connections served at the same time; further connections wait in the queue.
+    """
+
+    def __init__(self, address: tuple, api: ClinicAPI, workers: int = 16, verbose: bool = False) -> None:
+        """
+        Initializes and binds the ClinicServer.
+
+        Parameters:
+        - address (tuple): The (host, port) to listen on, port 0 for any free port.
+        - api (ClinicAPI): The API serving the requests.
+        - workers (int): The number of worker threads.
+        - verbose (bool): Whether to log every request.
+
+        Return Type:
+        - None
+        """
+        self.api = api
+        self.verbose = verbose
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='clinic-server')
+        super().__init__(address, ClinicRequestHandler)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_request_in_worker, request, client_address)
+
+    def process_request_in_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+def serve(host: str = '127.0.0.1', port: int = 8080, workers: int = 16, autosave: bool = True) -> None:
+    """
+    Runs the API server until interrupted. This process owns the data files, so every
+    terminal on the network shares one consistent store through it.
+
+    Parameters:
+    - host (str): The address to listen on.
+    - port (int): The port to listen on.
+    - workers (int): The number of worker threads.
+    - autosave (bool): Whether changes are saved to disk.
+
+    Return Type:
+    - None
+    """
+    server = ClinicServer((host, port), ClinicAPI(Controller(autosave=autosave)), workers, verbose=True)
+    print(f'Serving the clinic API on http://{host}:{server.server_address[1]}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,137 @@
+# backup_test.py
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from clinic.controller import Controller
+from clinic.dao.credential_store import USERS_FILE
+from clinic.dao.backup_manager import list_snapshots, read_wal, restore
+
+class TestBackup(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a persisting Controller over an empty store before each test.
+        """
+        self.clear_persistence()
+        # Logins may upgrade stored hashes, so they use a copy of the credentials
+        self.users = tempfile.TemporaryDirectory()
+        self.users_file = os.path.join(self.users.name, 'users.txt')
+        shutil.copy(USERS_FILE, self.users_file)
+        self.controller = Controller(autosave=True, users_file=self.users_file)
+        self.controller.login("user", "123456")
+
+    def tearDown(self):
+        self.clear_persistence()
+        self.users.cleanup()
+
+    def clear_persistence(self):
+        for path in ('clinic/patients.json', 'clinic/patients.log'):
+            if os.path.exists(path):
+                os.remove(path)
+        for path in ('clinic/records', 'clinic/backups'):
+            if os.path.exists(path):
+                shutil.rmtree(path)
+
+    def reopen(self):
+        controller = Controller(autosave=True, users_file=self.users_file)
+        controller.login("user", "123456")
+        return controller
+
+    def test_restore_to_point_in_time(self):
+        """
+        Test that restoring replays the logged changes up to the requested time only.
+        """
+        self.controller.create_patient(9790012000, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        self.controller.set_current_patient(9790012000)
+        note = self.controller.create_note("Patient reports mild headache.")
+        created = note.timestamp
+        time.sleep(0.01)
+        restore_point = datetime.now()
+        time.sleep(0.01)
+        self.controller.update_note(note.code, "Patient reports severe headache.")
+        self.controller.create_patient(9790014444, "Mary Doe", "1995-07-01", "250 203 2020", "mary.doe@gmail.com", "300 Moss St, Victoria")
+
+        result = restore(restore_point)
+        self.assertEqual(result["replayed"], 2)
+        controller = self.reopen()
+        self.assertEqual([patient.phn for patient in controller.list_patients()], [9790012000])
+        controller.set_current_patient(9790012000)
+        restored = controller.search_note(note.code)
+        self.assertEqual(restored.text, "Patient reports mild headache.")
+        self.assertEqual(restored.timestamp, created)
+
+    def test_periodic_snapshots(self):
+        """
+        Test that snapshots are taken at the configured interval and used by restore.
+        """
+        self.controller.backup.snapshot_interval = 2
+        for phn in (9790000001, 9790000002, 9790000003):
+            self.controller.create_patient(phn, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        self.controller.backup.snapshot_thread.join()
+        self.assertEqual(len(list_snapshots()), 2)
+        self.assertEqual(restore()["replayed"], 1)
+        self.assertEqual(len(self.reopen().list_patients()), 3)
+
+    def test_restored_note_versions(self):
+        """
+        Test that replayed notes get the versions recorded in the log, even when the snapshot
+        already holds a logged update, as records saved while a snapshot is taken can.
+        """
+        self.controller.create_patient(9790012000, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        self.controller.set_current_patient(9790012000)
+        note = self.controller.create_note("Patient reports mild headache.")
+        self.controller.update_note(note.code, "Patient reports severe headache.")
+        path = self.controller.backup.snapshot(background=False)
+        # Make the snapshot claim it was taken before the update
+        with open(os.path.join(path, 'manifest.json')) as file:
+            manifest = json.load(file)
+        manifest["seq"] -= 1
+        with open(os.path.join(path, 'manifest.json'), 'w') as file:
+            json.dump(manifest, file)
+        logged = [entry["args"]["version"] for entry in read_wal('clinic/backups/wal.log') if entry["op"] == "update_note"]
+
+        restore()
+        controller = self.reopen()
+        controller.set_current_patient(9790012000)
+        self.assertEqual(controller.search_note(note.code).get_version(), logged[-1])
+
+    def test_sequence_across_controllers(self):
+        """
+        Test that controllers logging to the same store continue each other's sequence numbers.
+        """
+        other = self.reopen()
+        for phn in range(9790000001, 9790000007):
+            controller = self.controller if phn % 2 else other
+            controller.create_patient(phn, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        self.assertEqual([entry["seq"] for entry in read_wal('clinic/backups/wal.log')], list(range(1, 7)))
+
+    def test_trim_log(self):
+        """
+        Test that the log only keeps the mutations after the oldest kept snapshot.
+        """
+        self.controller.backup.snapshot_interval = 2
+        self.controller.backup.keep_snapshots = 2
+        for phn in range(9790000001, 9790000008):
+            self.controller.create_patient(phn, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+            if self.controller.backup.snapshot_thread is not None:
+                self.controller.backup.snapshot_thread.join()
+        snapshots = list_snapshots()
+        self.assertEqual([snapshot[1] for snapshot in snapshots], [4, 6])
+        self.assertEqual([entry["seq"] for entry in read_wal('clinic/backups/wal.log')], [5, 6, 7])
+        self.assertEqual(restore(snapshots[0][0])["replayed"], 0)
+        self.assertEqual(len(self.reopen().list_patients()), 4)
+
+    def test_restore_before_first_snapshot(self):
+        """
+        Test that a time before every snapshot cannot be restored.
+        """
+        with self.assertRaises(ValueError):
+            restore(datetime(2000, 1, 1))
+
+if __name__ == '__main__':
+    unittest.main()
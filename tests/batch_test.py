@@ -0,0 +1,119 @@
+# batch_test.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from clinic.controller import Controller
+from clinic.dao.credential_store import USERS_FILE
+from clinic.dao.backup_manager import read_wal
+from clinic.exception import IllegalOperationException
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a persisting Controller over an empty store with one patient and note.
+        """
+        self.clear_persistence()
+        # Logins may upgrade stored hashes, so they use a copy of the credentials
+        self.users = tempfile.TemporaryDirectory()
+        self.users_file = os.path.join(self.users.name, 'users.txt')
+        shutil.copy(USERS_FILE, self.users_file)
+        self.controller = Controller(autosave=True, users_file=self.users_file)
+        self.controller.login("user", "123456")
+        self.controller.create_patient(9790012000, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        self.controller.set_current_patient(9790012000)
+        self.note = self.controller.create_note("Patient reports mild headache.")
+        self.controller.unset_current_patient()
+
+    def tearDown(self):
+        self.clear_persistence()
+        self.users.cleanup()
+
+    def clear_persistence(self):
+        for path in ('clinic/patients.json', 'clinic/patients.log'):
+            if os.path.exists(path):
+                os.remove(path)
+        for path in ('clinic/records', 'clinic/backups'):
+            if os.path.exists(path):
+                shutil.rmtree(path)
+
+    def reopen(self):
+        controller = Controller(autosave=True, users_file=self.users_file)
+        controller.login("user", "123456")
+        return controller
+
+    def read_log(self):
+        with open('clinic/patients.log') as log:
+            return log.readlines()
+
+    def test_commit_persists_once(self):
+        """
+        Test that a batch writes nothing until it ends, then persists every change.
+        """
+        log_lines = len(self.read_log())
+        wal_entries = len(list(read_wal('clinic/backups/wal.log')))
+        with self.controller.batch():
+            for phn in range(9790000000, 9790000005):
+                self.controller.create_patient(phn, "Mary Doe", "1995-07-01", "250 203 2020", "mary.doe@gmail.com", "300 Moss St, Victoria")
+                self.controller.set_current_patient(phn)
+                self.controller.create_note(f"Note for {phn}")
+                self.controller.unset_current_patient()
+            self.controller.update_patient(9790000004, 9790000009, "Mary Smith", "1995-07-01", "250 203 2020", "mary.doe@gmail.com", "300 Moss St, Victoria")
+            self.assertEqual(len(self.read_log()), log_lines)
+            self.assertFalse(os.path.exists('clinic/records/9790000000.dat'))
+        self.assertEqual(len(self.read_log()), log_lines + 6)
+        self.assertEqual(len(list(read_wal('clinic/backups/wal.log'))), wal_entries + 11)
+
+        controller = self.reopen()
+        self.assertEqual(controller.search_patient(9790000009).name, "Mary Smith")
+        self.assertIsNone(controller.search_patient(9790000004))
+        controller.set_current_patient(9790000009)
+        self.assertEqual(controller.list_notes()[0].text, "Note for 9790000004")
+
+    def test_rollback_on_failure(self):
+        """
+        Test that a failing operation undoes every change of the batch, in memory and on disk.
+        """
+        log_lines = self.read_log()
+        code, written = self.note.code, self.note.timestamp
+        with self.assertRaises(IllegalOperationException):
+            with self.controller.batch():
+                self.controller.create_patient(9790014444, "Mary Doe", "1995-07-01", "250 203 2020", "mary.doe@gmail.com", "300 Moss St, Victoria")
+                self.controller.set_current_patient(9790012000)
+                self.controller.update_note(self.note.code, "Patient reports severe headache.")
+                self.controller.create_note("Prescribed ibuprofen.")
+                self.controller.unset_current_patient()
+                self.controller.update_patient(9790012000, 9790012001, "John Smith", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+                self.controller.set_current_patient(9790012001)
+                self.controller.delete_note(self.note.code)
+                self.controller.unset_current_patient()
+                self.controller.create_patient(9790014444, "Mary Doe", "1995-07-01", "250 203 2020", "mary.doe@gmail.com", "300 Moss St, Victoria")
+
+        self.assertEqual(self.read_log(), log_lines)
+        self.assertFalse(os.path.exists('clinic/records/9790014444.dat'))
+        for controller in (self.controller, self.reopen()):
+            self.assertEqual([patient.phn for patient in controller.list_patients()], [9790012000])
+            self.assertEqual(controller.search_patient(9790012000).name, "John Doe")
+            controller.set_current_patient(9790012000)
+            notes = controller.list_notes()
+            self.assertEqual([(note.code, note.text) for note in notes], [(code, "Patient reports mild headache.")])
+            self.assertEqual(controller.note_history(code), [(written, "Patient reports mild headache.")])
+        # The code of the rolled back note is free again
+        self.controller.set_current_patient(9790012000)
+        self.assertEqual(self.controller.create_note("Next note").code, code + 1)
+
+    def test_nested_batch(self):
+        """
+        Test that a batch opened inside another one joins it.
+        """
+        with self.assertRaises(ValueError):
+            with self.controller.batch():
+                with self.controller.batch():
+                    self.controller.delete_patient(9790012000)
+                raise ValueError
+        self.assertIsNotNone(self.controller.search_patient(9790012000))
+
+if __name__ == '__main__':
+    unittest.main()
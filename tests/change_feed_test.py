@@ -0,0 +1,143 @@
+# change_feed_test.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from clinic.controller import Controller
+from clinic.dao.change_feed import ChangeFeed, last_sequence, tail
+from clinic.dao.credential_store import USERS_FILE
+
+class TestChangeFeed(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a logged in Controller that keeps changes in memory, and record its events.
+        """
+        self.controller = Controller(autosave=False)
+        self.controller.login("user", "123456")
+        self.events = []
+        self.controller.change_feed.subscribe(self.events.append)
+
+    def tearDown(self):
+        for path in ('clinic/patients.json', 'clinic/patients.log', 'clinic/changes.log', 'clinic/changes.log.1'):
+            if os.path.exists(path):
+                os.remove(path)
+        for path in ('clinic/records', 'clinic/backups'):
+            if os.path.exists(path):
+                shutil.rmtree(path)
+
+    def ops(self):
+        return [(event["seq"], event["op"]) for event in self.events]
+
+    def test_events(self):
+        """
+        Test that every change is published with the next sequence number and what a view needs to apply it.
+        """
+        self.controller.create_patient(9790012000, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        self.controller.update_patient(9790012000, 9790012001, "John Roe", "2000-10-10", "250 203 1010", "john.roe@gmail.com", "300 Moss St, Victoria")
+        self.controller.set_current_patient(9790012001)
+        note = self.controller.create_note("Patient reports mild headache.")
+        self.controller.update_note(note.code, "Patient reports severe headache.")
+        self.controller.delete_note(note.code)
+        self.controller.unset_current_patient()
+        self.controller.delete_patient(9790012001)
+        self.assertEqual(self.ops(), [(1, "create_patient"), (2, "update_patient"), (3, "create_note"), (4, "update_note"),
+                                      (5, "delete_note"), (6, "delete_patient")])
+        self.assertEqual(self.events[1]["args"]["old_phn"], 9790012000)
+        self.assertEqual(self.events[1]["args"]["name"], "John Roe")
+        self.assertEqual(self.events[3]["args"]["text"], "Patient reports severe headache.")
+        self.assertEqual(self.events[3]["args"]["version"], 2)
+
+        # Failed operations publish nothing, and unsubscribed views hear nothing
+        with self.assertRaises(Exception):
+            self.controller.delete_patient(9790012001)
+        self.controller.change_feed.unsubscribe(self.events.append)
+        self.controller.create_patient(9790012002, "Jane Doe", "2000-10-10", "250 203 1010", "jane.doe@gmail.com", "300 Moss St, Victoria")
+        self.assertEqual(len(self.events), 6)
+        self.assertEqual(self.controller.change_feed.sequence, 7)
+
+    def test_batch(self):
+        """
+        Test that a batch publishes its events when committed, and none when rolled back.
+        """
+        with self.controller.batch():
+            self.controller.create_patient(9790012000, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+            self.controller.create_patient(9790012001, "Mary Doe", "2000-10-10", "250 203 1010", "mary.doe@gmail.com", "300 Moss St, Victoria")
+            self.assertEqual(self.events, [])
+        self.assertEqual(self.ops(), [(1, "create_patient"), (2, "create_patient")])
+
+        with self.assertRaises(ZeroDivisionError):
+            with self.controller.batch():
+                self.controller.delete_patient(9790012000)
+                1 / 0
+        self.assertEqual(len(self.events), 2)
+
+    def test_failing_subscriber(self):
+        """
+        Test that a view raising on an event does not fail the change or keep other views from hearing it.
+        """
+        def fail(event):
+            raise ValueError("broken view")
+        self.controller.change_feed.subscribers.insert(0, fail)
+        with self.assertLogs('clinic.dao.change_feed', 'ERROR') as logs:
+            patient = self.controller.create_patient(9790012000, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        self.assertIn("broken view", logs.output[0])
+        self.assertIsNotNone(patient)
+        self.assertEqual(self.ops(), [(1, "create_patient")])
+
+    def test_other_process(self):
+        """
+        Test that a controller hears the changes another one logged, and continues its sequence numbers.
+        """
+        self.tearDown()
+        # Logins may upgrade stored hashes, so they use a copy of the credentials
+        users = tempfile.TemporaryDirectory()
+        self.addCleanup(users.cleanup)
+        users_file = os.path.join(users.name, 'users.txt')
+        shutil.copy(USERS_FILE, users_file)
+        first, second = Controller(autosave=True, users_file=users_file), Controller(autosave=True, users_file=users_file)
+        first.login("user", "123456")
+        second.login("user", "123456")
+        heard = []
+        second.change_feed.subscribe(heard.append)
+        first.create_patient(9790012000, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        first.create_patient(9790012001, "Mary Doe", "2000-10-10", "250 203 1010", "mary.doe@gmail.com", "300 Moss St, Victoria")
+        self.assertEqual(heard, [])
+        self.assertEqual([event["seq"] for event in second.change_feed.poll()], [1, 2])
+        self.assertEqual([event["args"]["phn"] for event in heard], [9790012000, 9790012001])
+        self.assertEqual(second.change_feed.poll(), [])
+
+        second.delete_patient(9790012001)
+        self.assertEqual(heard[-1]["seq"], 3)
+        self.assertEqual([event["op"] for event in first.change_feed.poll()], ["delete_patient"])
+        self.assertEqual(last_sequence(), 3)
+        self.assertEqual(Controller(autosave=True, users_file=users_file).change_feed.sequence, 3)
+
+    def test_tail(self):
+        """
+        Test that tailing the log returns every event after a sequence number, across a rotation.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'changes.log')
+            feed = ChangeFeed(filename, rotate_bytes=200)
+            for code in range(10):
+                feed.publish([("create_note", {"phn": 9790012000, "code": code, "text": "Note"})])
+            self.assertTrue(os.path.exists(filename + '.1'))
+            rotated = [event["seq"] for event in tail(filename=filename)]
+            self.assertEqual(rotated, list(range(10 - len(rotated) + 1, 11)))
+            self.assertEqual([event["seq"] for event in tail(8, filename=filename)], [9, 10])
+
+            # A partly written line is read once it is complete
+            reader = ChangeFeed(filename)
+            with open(filename, 'ab') as log:
+                log.write(b'{"seq": 11, "time": "", "op": "delete_note", ')
+            self.assertEqual(reader.poll(), [])
+            with open(filename, 'ab') as log:
+                log.write(b'"args": {"phn": 9790012000, "code": 0}}\n')
+            self.assertEqual([event["seq"] for event in reader.poll()], [11])
+            reader.close()
+            feed.close()
+
+if __name__ == '__main__':
+    unittest.main()
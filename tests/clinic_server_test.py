@@ -0,0 +1,144 @@
+# clinic_server_test.py
+
+import http.client
+import json
+import threading
+import unittest
+from clinic.controller import Controller
+from clinic.server.clinic_server import ClinicAPI, ClinicServer
+
+class TestClinicServer(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Start a server that does not save changes on any free port.
+        """
+        self.server = ClinicServer(('127.0.0.1', 0), ClinicAPI(Controller(autosave=False)), workers=4)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.connection = http.client.HTTPConnection('127.0.0.1', self.server.server_address[1])
+        self.token = None
+
+    def tearDown(self):
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def call(self, method, path, body=None):
+        headers = {'Authorization': f'Bearer {self.token}'} if self.token else {}
+        self.connection.request(method, path, json.dumps(body) if body is not None else None, headers)
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    def login(self):
+        status, response = self.call('POST', '/login', {"username": "user", "password": "123456"})
+        self.assertEqual(status, 200)
+        self.token = response["token"]
+
+    def test_authentication(self):
+        """
+        Test that requests need a valid session token.
+        """
+        self.assertEqual(self.call('GET', '/patients')[0], 401)
+        self.assertEqual(self.call('POST', '/login', {"username": "user", "password": "wrong"})[0], 401)
+        self.login()
+        self.assertEqual(self.call('GET', '/patients')[0], 200)
+        self.assertEqual(self.call('POST', '/logout')[0], 200)
+        self.assertEqual(self.call('GET', '/patients')[0], 401)
+
+    def test_patients(self):
+        """
+        Test creating, reading, updating and deleting a patient over one kept-alive connection.
+        """
+        self.login()
+        patient = {"phn": 9792225555, "name": "Joe Hancock", "birth_date": "1990-01-15",
+                   "phone": "278 456 7890", "email": "john.hancock@outlook.com", "address": "5000 Douglas St, Saanich"}
+        expected = {**patient, "version": 1}
+        self.assertEqual(self.call('POST', '/patients', patient), (201, expected))
+        self.assertEqual(self.call('POST', '/patients', patient)[0], 409)
+        self.assertEqual(self.call('GET', '/patients/9792225555'), (200, expected))
+        self.assertIn(expected, self.call('GET', '/patients?name=Hancock')[1])
+
+        status, updated = self.call('PUT', '/patients/9792225555', {"phone": "250 111 2222", "version": 1})
+        self.assertEqual((status, updated["phone"], updated["name"], updated["version"]), (200, "250 111 2222", "Joe Hancock", 2))
+        # A write based on a version someone else already changed is refused
+        self.assertEqual(self.call('PUT', '/patients/9792225555', {"phone": "250 333 4444", "version": 1})[0], 412)
+        self.assertEqual(self.call('DELETE', '/patients/9792225555', {"version": 1})[0], 412)
+        self.assertEqual(self.call('DELETE', '/patients/9792225555', {"version": 2})[0], 200)
+        self.assertEqual(self.call('GET', '/patients/9792225555')[0], 404)
+        self.assertEqual(self.call('GET', '/patients/not-a-phn')[0], 400)
+
+    def test_notes(self):
+        """
+        Test the notes of a patient.
+        """
+        self.login()
+        self.call('POST', '/patients', {"phn": 9792225555, "name": "Joe Hancock"})
+        status, note = self.call('POST', '/patients/9792225555/notes', {"text": "Patient comes with headache."})
+        self.assertEqual((status, note["text"]), (201, "Patient comes with headache."))
+        path = f'/patients/9792225555/notes/{note["code"]}'
+        self.assertEqual(self.call('GET', path), (200, note))
+        self.assertEqual(self.call('PUT', path, {"text": "Patient has a migraine.", "version": 1})[1]["version"], 2)
+        self.assertEqual(self.call('PUT', path, {"text": "Patient has a cold.", "version": 1})[0], 412)
+        self.assertEqual(len(self.call('GET', '/patients/9792225555/notes?text=migraine')[1]), 1)
+        self.assertEqual(self.call('DELETE', path)[0], 200)
+        self.assertEqual(self.call('GET', path)[0], 404)
+        self.assertEqual(self.call('GET', '/patients/9790000000/notes')[0], 404)
+
+    def test_multi_get(self):
+        """
+        Test that multi-gets return results in the order asked for, with null for missing keys.
+        """
+        self.login()
+        self.call('POST', '/patients', {"phn": 9792225555, "name": "Joe Hancock"})
+        status, patients = self.call('GET', '/patients?phns=9790000000,9792225555')
+        self.assertEqual((status, patients[0], patients[1]["name"]), (200, None, "Joe Hancock"))
+        note = self.call('POST', '/patients/9792225555/notes', {"text": "Patient comes with headache."})[1]
+        self.assertEqual(self.call('GET', f'/patients/9792225555/notes?codes={note["code"]},99'), (200, [note, None]))
+        self.assertEqual(self.call('GET', '/patients?phns=abc')[0], 400)
+
+    def test_batch(self):
+        """
+        Test that a batch runs its requests in order and reports each result.
+        """
+        self.login()
+        status, response = self.call('POST', '/batch', {"requests": [
+            {"method": "POST", "path": "/patients", "body": {"phn": 9792225555, "name": "Joe Hancock"}},
+            {"method": "GET", "path": "/patients/9792225555"},
+            {"method": "GET", "path": "/patients/9790000000"},
+            {"method": "DELETE", "path": "/patients/9792225555"},
+        ]})
+        self.assertEqual(status, 200)
+        self.assertEqual([result["status"] for result in response["responses"]], [201, 200, 404, 200])
+        self.assertEqual(response["responses"][1]["body"]["name"], "Joe Hancock")
+
+    def test_malformed_requests(self):
+        """
+        Test that bodies other than objects and nested batches are refused, keeping the connection open.
+        """
+        self.assertEqual(self.call('POST', '/login', ["user", "123456"])[0], 400)
+        self.login()
+        self.assertEqual(self.call('POST', '/patients', [1, 2])[0], 400)
+        status, response = self.call('POST', '/batch', {"requests": [
+            {"method": "POST", "path": "/batch", "body": {"requests": []}},
+            {"method": "PUT", "path": "/patients/9790000000", "body": "text"},
+        ]})
+        self.assertEqual((status, [result["status"] for result in response["responses"]]), (200, [400, 400]))
+        self.assertEqual(self.call('GET', '/patients?phns=9790000000'), (200, [None]))
+
+    def test_invalid_content_length(self):
+        """
+        Test that a missing, non-numeric or negative Content-Length is refused without waiting for a body.
+        """
+        for length in (None, 'abc', '-1'):
+            connection = http.client.HTTPConnection('127.0.0.1', self.server.server_address[1], timeout=5)
+            connection.putrequest('POST', '/login')
+            if length is not None:
+                connection.putheader('Content-Length', length)
+            connection.endheaders()
+            response = connection.getresponse()
+            self.assertEqual((response.status, json.loads(response.read())), (400, {"error": "missing or invalid Content-Length"}))
+            connection.close()
+
+if __name__ == '__main__':
+    unittest.main()
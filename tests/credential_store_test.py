@@ -0,0 +1,78 @@
+# credential_store_test.py
+
+import os
+import tempfile
+import unittest
+from clinic.controller import Controller
+from clinic.dao.credential_store import CredentialStore
+
+class CountingStore(CredentialStore):
+    """ A CredentialStore that counts how often the file is parsed. """
+
+    def __init__(self, filename):
+        super().__init__(filename)
+        self.parses = 0
+
+    def parse(self):
+        self.parses += 1
+        return super().parse()
+
+class TestCredentialStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, 'users.txt')
+        with open(self.filename, 'w') as file:
+            file.write("user,hash1\nali,hash2\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_file_is_parsed_once(self):
+        """
+        Test that repeated lookups do not parse the file again.
+        """
+        store = CountingStore(self.filename)
+        for _ in range(100):
+            self.assertEqual(store.get("ali"), "hash2")
+        self.assertIsNone(store.get("nobody"))
+        self.assertEqual(store.parses, 1)
+
+    def test_reload_when_file_changes(self):
+        """
+        Test that a changed file is parsed again on the next lookup.
+        """
+        store = CountingStore(self.filename)
+        self.assertIsNone(store.get("kala"))
+        with open(self.filename, 'a') as file:
+            file.write("kala,hash3\n")
+        self.assertEqual(store.get("kala"), "hash3")
+        self.assertEqual(store.parses, 2)
+
+    def test_missing_file(self):
+        """
+        Test that a missing file means no users.
+        """
+        store = CredentialStore(os.path.join(self.directory.name, 'missing.txt'))
+        self.assertIsNone(store.get("user"))
+
+    def test_malformed_lines(self):
+        """
+        Test that lines without a password hash are skipped.
+        """
+        with open(self.filename, 'a') as file:
+            file.write("broken line\n\nkala,hash3\n")
+        store = CredentialStore(self.filename)
+        self.assertEqual(store.get("kala"), "hash3")
+        self.assertIsNone(store.get("broken line"))
+        self.assertEqual(len(store.users), 3)
+
+    def test_controllers_share_store(self):
+        """
+        Test that controllers of the same process share the credential store.
+        """
+        self.assertIs(Controller().credentials, Controller().credentials)
+        self.assertIn("user", Controller().load_patients())
+
+if __name__ == '__main__':
+    unittest.main()
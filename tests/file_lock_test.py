@@ -0,0 +1,120 @@
+# file_lock_test.py
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from clinic.dao import PatientDAOJSON
+from clinic.dao.file_lock import FileLock, fcntl
+from clinic.patient import Patient
+
+class TestFileLock(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Run each test in an empty working directory, since storage paths are relative to it.
+        """
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        os.makedirs('clinic')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def create_patient(self, dao, phn, name="John Doe"):
+        patient = Patient(phn, name, "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria", autosave=True)
+        dao.create_patient(patient)
+        return patient
+
+    def test_nesting(self):
+        """
+        Test that locks nest, that an inner exclusive lock upgrades a shared one and that the generation counts writers.
+        """
+        lock = FileLock.for_path()
+        self.assertIs(lock, FileLock.for_path(os.path.join(self.directory.name, 'clinic', 'store.lock')))
+        self.assertEqual(lock.generation(), 0)
+        with lock.shared():
+            self.assertFalse(lock.is_exclusive())
+            with lock.exclusive() as acquired:
+                self.assertTrue(acquired)
+                self.assertTrue(lock.is_exclusive())
+                with lock.exclusive() as nested:
+                    self.assertFalse(nested)
+                self.assertEqual(lock.bump(), 1)
+            self.assertFalse(lock.is_exclusive())
+        self.assertEqual(lock.holds, [])
+        self.assertEqual(lock.generation(), 1)
+
+    @unittest.skipIf(fcntl is None, "file locks need fcntl")
+    def test_exclusion(self):
+        """
+        Test that another process cannot take the lock while this one holds it exclusively.
+        """
+        probe = ("import fcntl, os, sys; fd = os.open('clinic/store.lock', os.O_RDWR | os.O_CREAT);\n"
+                 "try:\n    fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)\nexcept BlockingIOError:\n    sys.exit(1)")
+        lock = FileLock.for_path()
+        with lock.exclusive():
+            self.assertEqual(subprocess.run([sys.executable, '-c', probe]).returncode, 1)
+        with lock.shared():
+            self.assertEqual(subprocess.run([sys.executable, '-c', probe]).returncode, 0)
+
+    def test_sees_changes(self):
+        """
+        Test that a DAO picks up the changes another DAO of the same data directory made.
+        """
+        writer, reader = PatientDAOJSON(True), PatientDAOJSON(True)
+        self.assertEqual(reader.list_patients(), [])
+        self.create_patient(writer, 9790012000)
+        self.create_patient(writer, 9790012001, "Mary Doe")
+        self.assertEqual(reader.search_patient(9790012000).name, "John Doe")
+        self.assertEqual(len(reader.list_patients()), 2)
+
+        patient = reader.search_patient(9790012001)
+        writer.update_patient(9790012001, Patient(9790012002, "Mary Roe", "2000-10-10", "250 203 1010", "mary.roe@gmail.com", "300 Moss St, Victoria", autosave=True))
+        writer.delete_patient(9790012000)
+        self.assertIsNone(reader.search_patient(9790012000))
+        self.assertIsNone(reader.search_patient(9790012001))
+        self.assertIs(reader.search_patient(9790012002), patient)  # Changed in place, not replaced
+        self.assertEqual(patient.name, "Mary Roe")
+        self.assertEqual([patient.name for patient in reader.retrieve_patients("Roe")], ["Mary Roe"])
+
+        # The reader replays the log from where it stopped, then reloads the shard once it is compacted
+        self.create_patient(writer, 9790012003, "Jane Doe")
+        writer.compact()
+        self.assertEqual(sorted(patient.phn for patient in reader.list_patients()), [9790012002, 9790012003])
+        self.assertEqual(reader.store_generation, writer.store_generation)
+
+    def test_sees_note_changes(self):
+        """
+        Test that a DAO reads a patient record again once another DAO changed it.
+        """
+        writer, reader = PatientDAOJSON(True), PatientDAOJSON(True)
+        self.create_patient(writer, 9790012000).create_note("First note")
+        patient = reader.search_patient(9790012000)
+        self.assertEqual([note.text for note in patient.list_notes()], ["First note"])
+
+        with writer.writing():  # As the controller does around note changes
+            writer.search_patient(9790012000).create_note("Second note")
+        self.assertIs(reader.search_patient(9790012000), patient)
+        self.assertEqual([note.text for note in patient.list_notes()], ["Second note", "First note"])
+
+    def test_clinic_notes_see_unloaded_records(self):
+        """
+        Test that a clinic-wide time query finds notes another DAO added to a record not loaded here.
+        """
+        writer, reader = PatientDAOJSON(True), PatientDAOJSON(True)
+        self.create_patient(writer, 9790012000).create_note("First note")
+        self.assertEqual([note.text for _, note in reader.retrieve_notes_by_timestamp()], ["First note"])
+        reader.record_cache.clear()
+
+        with writer.writing():
+            writer.search_patient(9790012000).create_note("Second note")
+        with reader.reading():
+            self.assertFalse(reader.search_patient(9790012000).get_patient_record().note_dao.is_hydrated())
+        self.assertEqual([note.text for _, note in reader.retrieve_notes_by_timestamp()], ["Second note", "First note"])
+
+if __name__ == '__main__':
+    unittest.main()
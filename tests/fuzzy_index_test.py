@@ -0,0 +1,67 @@
+# fuzzy_index_test.py
+
+import unittest
+from unittest import mock
+from clinic.dao.fuzzy_index import FuzzyIndex, edit_distance, soundex
+
+class TestFuzzyIndex(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a FuzzyIndex with a few names before each test.
+        """
+        self.index = FuzzyIndex()
+        self.index.add(1, "John Smith")
+        self.index.add(2, "Joan Smithers")
+        self.index.add(3, "Mary Doe")
+        self.index.add(4, "Jon Smith")
+
+    def test_soundex(self):
+        """
+        Test Soundex codes of similar sounding names.
+        """
+        self.assertEqual(soundex("Smith"), "S530")
+        self.assertEqual(soundex("Smyth"), "S530")
+        self.assertEqual(soundex("Robert"), soundex("Rupert"))
+        self.assertEqual(soundex("Ashcraft"), "A261")
+
+    def test_edit_distance(self):
+        """
+        Test the bounded edit distance.
+        """
+        self.assertEqual(edit_distance("smyth", "smith", 2), 1)
+        self.assertEqual(edit_distance("kitten", "sitting", 3), 3)
+        self.assertEqual(edit_distance("abc", "xyzxyz", 1), 2, "distance past the bound is capped")
+
+    def test_misspelled_name_ranked(self):
+        """
+        Test that a misspelled name finds the closest patients first.
+        """
+        phns = self.index.search("Jon Smyth", 10)
+        self.assertEqual(phns[:2], [4, 1], "closest spellings should rank first")
+        self.assertNotIn(3, phns, "unrelated names should not match")
+
+    def test_remove(self):
+        """
+        Test that removed names are no longer found.
+        """
+        self.index.remove(4)
+        self.assertEqual(self.index.search("Jon Smyth", 10)[0], 1)
+        self.index.add(3, "Mary Smith")
+        self.assertIn(3, self.index.search("smyth", 10), "re-indexed name should be found")
+
+    def test_common_name(self):
+        """
+        Test that a name whose Soundex code and trigrams are all too common still finds close matches.
+        """
+        for phn in range(10, 30):
+            self.index.add(phn, f"Patient{phn} Smith")
+        with mock.patch('clinic.dao.fuzzy_index.MAX_POSTING_SIZE', 5):
+            self.assertEqual(len(self.index._candidates(["smyth"])), 5)
+            matches = self.index.search("Smyth", 3)
+        self.assertEqual(len(matches), 3)
+        for phn in matches:
+            self.assertIn("smith", self.index.tokens[phn])
+
+if __name__ == '__main__':
+    unittest.main()
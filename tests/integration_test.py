@@ -1,7 +1,10 @@
 import os
+import shutil
+import tempfile
 from unittest import TestCase
 from unittest import main
 from clinic.controller import Controller
+from clinic.dao.credential_store import USERS_FILE
 from clinic.patient import Patient
 from clinic.patient_record import PatientRecord
 from clinic.note import Note
@@ -18,13 +21,24 @@ class IntegrationTest(TestCase):
 		# set autosave to False to avoid testing persistence
 		# self.controller = Controller(autosave=False)
 
+		# logins may upgrade stored hashes, so they use a copy of the credentials
+		self.users = tempfile.TemporaryDirectory()
+		self.users_file = os.path.join(self.users.name, 'users.txt')
+		shutil.copy(USERS_FILE, self.users_file)
+
 		# set autosave to True to test persistence
-		self.controller = Controller(autosave=True)
+		self.controller = Controller(autosave=True, users_file=self.users_file)
 
 	# comment the tearDown method to see the file when the test ends.
 	def tearDown(self):
 		patients_file = 'clinic/patients.json'
 		patients_file_exists = os.path.exists(patients_file)
+		patients_log = 'clinic/patients.log'
+		if os.path.exists(patients_log):
+			os.remove(patients_log)
+		backups_path = 'clinic/backups'
+		if os.path.exists(backups_path):
+			shutil.rmtree(backups_path)
 		records_path = 'clinic/records'
 		if os.path.exists(records_path):
 			filenames = os.listdir(records_path)
@@ -35,12 +49,13 @@ class IntegrationTest(TestCase):
 		# removing the patients file later to avoid concurrency issues
 		if patients_file_exists:
 			os.remove(patients_file)
+		self.users.cleanup()
 
 	def reset_persistence(self):
 		# reset persistence will be ignored if autosave is False
 		# otherwise it will reinstantiate the controller and reload every file
 		if self.controller.autosave:
-			self.controller = Controller(autosave=True)
+			self.controller = Controller(autosave=True, users_file=self.users_file)
 			self.controller.login("user", "123456")       
 
 	def test_login_logout(self):
@@ -488,6 +503,38 @@ class IntegrationTest(TestCase):
 		self.assertEqual(actual_note, expected_note_1, "note 1 was created, retrieved and its data are correct regardless of search order")
 
 
+	def test_multi_get(self):
+		# cannot search several patients or notes without logging in
+		with self.assertRaises(IllegalAccessException, msg="cannot search patients without logging in"):
+			self.controller.search_patients([9792225555])
+		with self.assertRaises(IllegalAccessException, msg="cannot search notes without logging in"):
+			self.controller.search_notes([1])
+
+		self.assertTrue(self.controller.login("user", "123456"), "login correctly")
+		expected_patient_1 = Patient(9792225555, "Joe Hancock", "1990-01-15", "278 456 7890", "john.hancock@outlook.com", "5000 Douglas St, Saanich")
+		expected_patient_2 = Patient(9790012000, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+		self.controller.create_patient(9792225555, "Joe Hancock", "1990-01-15", "278 456 7890", "john.hancock@outlook.com", "5000 Douglas St, Saanich")
+		self.controller.create_patient(9790012000, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+		self.reset_persistence()
+
+		# results come in the order asked for, with None for a PHN not found
+		self.assertEqual(self.controller.search_patients([9790012000, 9790010000, 9792225555]), [expected_patient_2, None, expected_patient_1],
+			"patients are found in input order with missing markers")
+		self.assertEqual(self.controller.search_patients([]), [], "no PHNs, no patients")
+
+		with self.assertRaises(NoCurrentPatientException, msg="cannot search notes without a valid current patient"):
+			self.controller.search_notes([1])
+
+		self.controller.set_current_patient(9792225555)
+		self.controller.create_note("Patient comes with headache and high blood pressure.")
+		self.controller.create_note("Patient complains of a strong headache on the back of neck.")
+		self.reset_persistence()
+		self.controller.set_current_patient(9792225555)
+		expected_note_1 = Note(1, "Patient comes with headache and high blood pressure.")
+		expected_note_2 = Note(2, "Patient complains of a strong headache on the back of neck.")
+		self.assertEqual(self.controller.search_notes([2, 3, 1, 2]), [expected_note_2, None, expected_note_1, expected_note_2],
+			"notes are found in input order with missing markers")
+
 	def test_retrieve_notes(self):
 		# some notes that may be retrieved
 		expected_note_1 = Note(1, "Patient comes with headache and high blood pressure.")
@@ -0,0 +1,49 @@
+# name_index_test.py
+
+import unittest
+from clinic.controller import Controller
+from clinic.dao.name_index import NameIndex
+
+class TestNameIndex(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a Controller without persistence and a few patients before each test.
+        """
+        self.controller = Controller(autosave=False)
+        self.controller.patient_dao.patients = {}
+        self.controller.patient_dao.name_index = NameIndex()
+        self.controller.login("user", "123456")
+        self.controller.create_patient(9790012000, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        self.controller.create_patient(9790014444, "Mary Doe", "1995-07-01", "250 203 2020", "mary.doe@gmail.com", "300 Moss St, Victoria")
+        self.controller.create_patient(9792225555, "Joe Hancock", "1990-01-15", "278 456 7890", "john.hancock@outlook.com", "5000 Douglas St, Saanich")
+
+    def test_prefix_search(self):
+        """
+        Test that autocompletion returns names starting with the prefix in alphabetical order.
+        """
+        patients = self.controller.autocomplete_patients("jo")
+        self.assertEqual([patient.name for patient in patients], ["Joe Hancock", "John Doe"])
+        patients = self.controller.autocomplete_patients("JOHN  d")
+        self.assertEqual([patient.name for patient in patients], ["John Doe"], "prefix should be normalized")
+        self.assertEqual(self.controller.autocomplete_patients("doe"), [], "only name prefixes should match")
+
+    def test_limit(self):
+        """
+        Test that autocompletion returns at most `limit` patients.
+        """
+        self.assertEqual(len(self.controller.autocomplete_patients("", 2)), 2)
+
+    def test_index_follows_updates_and_deletes(self):
+        """
+        Test that the index is maintained when patients are renamed, re-keyed and deleted.
+        """
+        self.controller.update_patient(9790012000, 9790019999, "Jane Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        patients = self.controller.autocomplete_patients("ja")
+        self.assertEqual([patient.phn for patient in patients], [9790019999], "renamed patient should be found by its new PHN")
+        self.assertEqual([patient.name for patient in self.controller.autocomplete_patients("jo")], ["Joe Hancock"])
+        self.controller.delete_patient(9792225555)
+        self.assertEqual(self.controller.autocomplete_patients("jo"), [], "deleted patient should not be suggested")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -41,6 +41,16 @@ class NoteTests(unittest.TestCase):
         note.update_details("Updated text.")
         self.assertEqual(note.text, "Updated text.", "The note's text should be updated correctly.")
 
+    def test_version(self):
+        """Test that every update increments the version, starting from 1."""
+        note = Note(1, "Initial text.")
+        self.assertEqual(note.version, 1, "A new note should be at version 1")
+        note.update_details("Updated text.")
+        note.update_details("Updated text.")
+        self.assertEqual(note.version, 3, "Each update should increment the version")
+        del note.version  # As for notes unpickled from before versions existed
+        self.assertEqual(note.get_version(), 1, "A note without a version should start at 1")
+
     def test_update_details_with_same_text(self):
         """Test updating details with the same text."""
         note = Note(1, "Repeated text.")
@@ -53,6 +63,22 @@ class NoteTests(unittest.TestCase):
         note = Note(1, "Checking timestamp.")
         self.assertIsInstance(note.timestamp, datetime, "Timestamp should be an instance of datetime")
 
+    def test_timestamp_preserved(self):
+        """Test that a given timestamp is kept, e.g. for loaded or imported notes."""
+        note = Note(1, "Imported note.", self.timestamp)
+        self.assertEqual(note.timestamp, self.timestamp, "Given timestamp should be preserved")
+
+    def test_revision_history(self):
+        """Test that previous versions are kept and rebuilt from their deltas."""
+        original = "Patient reports mild headache. " * 20
+        note = Note(1, original, self.timestamp)
+        note.update_details(original + "Prescribed rest.")
+        note.update_details(original.replace("mild", "severe") + "Prescribed rest.")
+        texts = [text for _, text in note.history()]
+        self.assertEqual(texts, [original.replace("mild", "severe") + "Prescribed rest.", original + "Prescribed rest.", original])
+        self.assertEqual(note.history()[-1][0], self.timestamp, "Oldest version should keep its timestamp")
+        self.assertLess(sum(len(delta) for _, delta in note.revisions), len(original) // 4, "Small edits should store small deltas")
+
     def test_string_representation(self):
         """Test the string representation of a Note."""
         note = Note(1, "Sample note text.")
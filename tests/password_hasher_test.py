@@ -0,0 +1,88 @@
+# password_hasher_test.py
+
+import hashlib
+import os
+import tempfile
+import unittest
+from clinic.controller import Controller
+from clinic.exception.invalid_login_exception import InvalidLoginException
+from clinic.password_hasher import PBKDF2Hasher, ScryptHasher, SHA256Hasher, VerificationCache, verify_password
+
+class TestPasswordHasher(unittest.TestCase):
+
+    def test_round_trip_with_unique_salts(self):
+        """
+        Test that every hasher verifies its own hashes and salts each hash differently.
+        """
+        for hasher in (PBKDF2Hasher(1000), ScryptHasher(2 ** 10)):
+            first, second = hasher.hash("123456"), hasher.hash("123456")
+            self.assertNotEqual(first, second)
+            self.assertTrue(verify_password("123456", first))
+            self.assertFalse(verify_password("654321", first))
+
+    def test_legacy_hash(self):
+        """
+        Test that unsalted SHA-256 hashes still verify and are flagged for rehashing.
+        """
+        legacy = hashlib.sha256(b"123456").hexdigest()
+        self.assertTrue(verify_password("123456", legacy))
+        self.assertTrue(PBKDF2Hasher(1000).needs_rehash(legacy))
+        self.assertFalse(SHA256Hasher().needs_rehash(legacy))
+
+    def test_work_factor_change_needs_rehash(self):
+        """
+        Test that a hash made with another work factor is flagged for rehashing.
+        """
+        encoded = PBKDF2Hasher(1000).hash("123456")
+        self.assertFalse(PBKDF2Hasher(1000).needs_rehash(encoded))
+        self.assertTrue(PBKDF2Hasher(2000).needs_rehash(encoded))
+        self.assertTrue(ScryptHasher(2 ** 10).needs_rehash(encoded))
+
+    def test_verification_cache(self):
+        """
+        Test that the cache only vouches for the same password and stored hash within its lifetime.
+        """
+        cache = VerificationCache(ttl=60)
+        cache.remember("user", "123456", "stored")
+        self.assertTrue(cache.check("user", "123456", "stored"))
+        self.assertFalse(cache.check("user", "wrong", "stored"))
+        self.assertFalse(cache.check("user", "123456", "changed"))
+        expired = VerificationCache(ttl=-1)
+        expired.remember("user", "123456", "stored")
+        self.assertFalse(expired.check("user", "123456", "stored"))
+
+    def test_rehash_on_login(self):
+        """
+        Test that logging in with a legacy hash stores a salted hash in its place.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'users.txt')
+            with open(filename, 'w') as file:
+                file.write(f"user,{hashlib.sha256(b'123456').hexdigest()}\n")
+            controller = Controller(autosave=True, password_hasher=PBKDF2Hasher(1000), users_file=filename)
+            self.assertTrue(controller.login("user", "123456"))
+            with open(filename) as file:
+                self.assertTrue(file.read().startswith("user,pbkdf2_sha256$1000$"))
+
+            controller.logout()
+            self.assertTrue(controller.login("user", "123456"))
+            controller.logout()
+            with self.assertRaises(InvalidLoginException):
+                controller.login("user", "abadpassword")
+
+    def test_no_rehash_without_autosave(self):
+        """
+        Test that logins leave the credentials file untouched when changes are not persisted.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'users.txt')
+            legacy = f"user,{hashlib.sha256(b'123456').hexdigest()}\n"
+            with open(filename, 'w') as file:
+                file.write(legacy)
+            controller = Controller(password_hasher=PBKDF2Hasher(1000), users_file=filename)
+            self.assertTrue(controller.login("user", "123456"))
+            with open(filename) as file:
+                self.assertEqual(file.read(), legacy)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# patient_log_test.py
+
+import os
+import tempfile
+import unittest
+from clinic.dao import PatientDAOJSON
+from clinic.patient import Patient
+
+class TestPatientLog(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a DAO that autosaves into a temporary directory.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.dao = self.open_dao()
+        self.dao.autosave = True
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def open_dao(self):
+        """
+        Returns a DAO loaded from the temporary patients file and its log.
+        """
+        dao = PatientDAOJSON(False)
+        dao.filename = os.path.join(self.directory.name, 'patients.json')
+        dao.log_filename = os.path.join(self.directory.name, 'patients.log')
+        dao.patients = {}
+        dao.log_entries = 0
+        dao.dirty.clear()
+        dao.load_patients()
+        return dao
+
+    def patient(self, phn, name):
+        return Patient(phn, name, "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria", autosave=False)
+
+    def test_changes_are_appended_not_rewritten(self):
+        """
+        Test that changes only append to the log and leave the JSON file untouched.
+        """
+        self.dao.create_patient(self.patient(9790012000, "John Doe"))
+        self.dao.create_patient(self.patient(9790014444, "Mary Doe"))
+        self.assertFalse(os.path.exists(self.dao.filename))
+        self.assertEqual(self.dao.log_entries, 2)
+        self.assertEqual(self.dao.dirty, {9790012000, 9790014444})
+
+    def test_load_replays_log(self):
+        """
+        Test that loading applies creates, PHN changes and deletes from the log.
+        """
+        self.dao.create_patient(self.patient(9790012000, "John Doe"))
+        self.dao.create_patient(self.patient(9790014444, "Mary Doe"))
+        self.dao.compact()
+        self.dao.update_patient(9790012000, self.patient(9790013000, "John Doe"))
+        self.dao.delete_patient(9790014444)
+        reloaded = self.open_dao()
+        self.assertEqual(list(reloaded.patients), [9790013000])
+        self.assertEqual(reloaded.patients[9790013000].name, "John Doe")
+
+    def test_compaction(self):
+        """
+        Test that reaching the threshold folds the log into the JSON file.
+        """
+        self.dao.compaction_threshold = 3
+        for phn in range(9790000001, 9790000004):
+            self.dao.create_patient(self.patient(phn, "John Doe"))
+        self.assertTrue(os.path.exists(self.dao.filename))
+        self.assertFalse(os.path.exists(self.dao.log_filename))
+        self.assertEqual((self.dao.log_entries, self.dao.dirty), (0, set()))
+        self.assertEqual(len(self.open_dao().patients), 3)
+
+    def test_torn_last_line_is_ignored(self):
+        """
+        Test that an entry cut short by a crash is skipped on load.
+        """
+        self.dao.create_patient(self.patient(9790012000, "John Doe"))
+        with open(self.dao.log_filename, 'a') as log:
+            log.write('{"op": "put", "key": 97900')
+        self.assertEqual(list(self.open_dao().patients), [9790012000])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# patient_query_test.py
+
+import unittest
+from clinic.controller import Controller
+from clinic.dao import PatientDAOJSON
+from clinic.dao.patient_dao import PatientDAO
+from clinic.dao.patient_query import NameContains, BirthDateBetween, EmailDomain, PhnEquals
+
+class ListPatientDAO(PatientDAO):
+    """ A DAO keeping patients in a list, relying on the default query. """
+
+    def __init__(self, patients):
+        self.patients = list(patients)
+
+    def search_patient(self, key):
+        return next((patient for patient in self.patients if patient.phn == key), None)
+
+    def create_patient(self, patient):
+        self.patients.append(patient)
+
+    def retrieve_patients(self, search_string):
+        return [patient for patient in self.patients if search_string.lower() in patient.name.lower()]
+
+    def update_patient(self, key, patient):
+        self.patients = [patient if current.phn == key else current for current in self.patients]
+
+    def delete_patient(self, key):
+        self.patients = [patient for patient in self.patients if patient.phn != key]
+
+    def list_patients(self):
+        return list(self.patients)
+
+class TestPatientQuery(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a Controller without persistence and a few patients before each test.
+        """
+        self.controller = Controller(autosave=False)
+        self.controller.patient_dao = self._empty_dao()
+        self.controller.login("user", "123456")
+        self.controller.create_patient(1001, "Bruce Lee", "1955-11-27", "250 000 0001", "bruce@example.org", "1 Main St")
+        self.controller.create_patient(1002, "Lee Marvin", "1950-02-19", "250 000 0002", "lee@example.com", "2 Main St")
+        self.controller.create_patient(1003, "Ashlee Simpson", "1984-10-03", "250 000 0003", "ashlee@example.org", "3 Main St")
+        self.controller.create_patient(1004, "Stan Lee", "1922-12-28", "250 000 0004", "stan@example.org", "4 Main St")
+
+    @staticmethod
+    def _empty_dao():
+        """
+        Builds a DAO without persistence and removes the patients loaded from file.
+        """
+        dao = PatientDAOJSON(False)
+        for phn in list(dao.patients):
+            dao.delete_patient(phn)
+        return dao
+
+    def test_combined_filters(self):
+        """
+        Test that every predicate is applied to the results.
+        """
+        query = self.controller.query_patients(NameContains("lee"), BirthDateBetween("1950-01-01", "1960-12-31"), EmailDomain("example.org"))
+        self.assertEqual([patient.phn for patient in query], [1001])
+
+    def test_order_and_limit(self):
+        """
+        Test sorting and limiting query results.
+        """
+        query = self.controller.query_patients(NameContains("lee"), order_by="birth_date", descending=True, limit=2)
+        self.assertEqual([patient.phn for patient in query], [1003, 1001])
+
+    def test_plan_chooses_most_selective_index(self):
+        """
+        Test that the planner drives the query from the most selective index.
+        """
+        query = self.controller.query_patients(NameContains("lee"), PhnEquals(1004))
+        self.assertTrue(query.explain().startswith("primary key lookup"), query.explain())
+        self.assertEqual([patient.phn for patient in query], [1004])
+        query = self.controller.query_patients(NameContains("ashlee"), BirthDateBetween("1900-01-01", "2000-01-01"))
+        self.assertTrue(query.explain().startswith("name trigram index"), query.explain())
+        query = self.controller.query_patients(EmailDomain("example.org"))
+        self.assertTrue(query.explain().startswith("full scan"), query.explain())
+        self.assertEqual(len(list(query)), 3)
+
+    def test_default_query(self):
+        """
+        Test that a DAO without indexes answers queries by filtering every patient.
+        """
+        dao = ListPatientDAO(self.controller.list_patients())
+        patients = dao.query([NameContains("lee"), EmailDomain("example.org")], order_by="birth_date", descending=True, limit=2)
+        self.assertEqual([patient.phn for patient in patients], [1003, 1001])
+
+if __name__ == '__main__':
+    unittest.main()
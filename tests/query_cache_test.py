@@ -0,0 +1,78 @@
+# query_cache_test.py
+
+import unittest
+from clinic.controller import Controller
+
+class TestQueryCache(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a Controller without persistence and a few patients before each test.
+        """
+        self.controller = Controller(autosave=False)
+        self.controller.patient_dao.patients = {}
+        self.controller.login("user", "123456")
+        self.controller.create_patient(9790012000, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        self.controller.create_patient(9790014444, "Mary Doe", "1995-07-01", "250 203 2020", "mary.doe@gmail.com", "300 Moss St, Victoria")
+        self.controller.create_patient(9792225555, "Joe Hancock", "1990-01-15", "278 456 7890", "john.hancock@outlook.com", "5000 Douglas St, Saanich")
+        self.query_cache = self.controller.patient_dao.query_cache
+
+    def test_repeated_query_hits_cache(self):
+        """
+        Test that repeating a search is answered from the cache.
+        """
+        first = self.controller.retrieve_patients("Doe")
+        second = self.controller.retrieve_patients("doe")
+        self.assertEqual(first, second, "normalized queries should return the same patients")
+        self.assertEqual(self.query_cache.hits, 1, "second query should hit the cache")
+
+    def test_narrowing_query_filters_superset(self):
+        """
+        Test that extending a cached search string filters the cached results.
+        """
+        self.controller.retrieve_patients("jo")
+        patients = self.controller.retrieve_patients("joh")
+        self.assertEqual([patient.name for patient in patients], ["John Doe"])
+        self.assertEqual(self.query_cache.narrowed, 1, "longer query should narrow the cached superset")
+
+    def test_writes_invalidate_cache(self):
+        """
+        Test that creating, updating and deleting patients invalidate cached results.
+        """
+        self.assertEqual(len(self.controller.retrieve_patients("doe")), 2)
+        self.controller.create_patient(9798884444, "Jane Doe", "1980-03-03", "250 301 6060", "jane.doe@gmail.com", "500 Fairfield Rd")
+        self.assertEqual(len(self.controller.retrieve_patients("doe")), 3, "created patient should be found")
+        self.controller.update_patient(9798884444, 9798884444, "Jane Smith", "1980-03-03", "250 301 6060", "jane.doe@gmail.com", "500 Fairfield Rd")
+        self.assertEqual(len(self.controller.retrieve_patients("doe")), 2, "renamed patient should not be found")
+        self.controller.delete_patient(9790014444)
+        self.assertEqual(len(self.controller.retrieve_patients("doe")), 1, "deleted patient should not be found")
+
+    def test_scan_in_chunks(self):
+        """
+        Test that a chunked scan finds the same patients, caches them, and skips patients deleted during the scan.
+        """
+        chunks = list(self.controller.scan_patients("Jo", chunk_size=1))
+        self.assertTrue(all(len(chunk) <= 1 for chunk in chunks), "each chunk should check at most one candidate")
+        self.assertEqual([patient.name for chunk in chunks for patient in chunk], ["Joe Hancock", "John Doe"])
+        self.assertEqual(self.controller.retrieve_patients("jo"), [patient for chunk in chunks for patient in chunk])
+        self.assertEqual(self.query_cache.hits, 1, "a completed scan should be cached")
+
+        scan = self.controller.scan_patients("Doe", chunk_size=1)
+        chunk = next(scan)
+        while not chunk:
+            chunk = next(scan)
+        self.assertEqual([patient.name for patient in chunk], ["John Doe"])
+        self.controller.delete_patient(9790014444)
+        self.assertEqual([patient for chunk in scan for patient in chunk], [])
+        self.assertEqual([patient.name for patient in self.controller.retrieve_patients("Doe")], ["John Doe"])
+
+    def test_scan_narrows_through_trigrams(self):
+        """
+        Test that a scan whose trigram candidates fit in a chunk reads only those candidates.
+        """
+        chunks = list(self.controller.scan_patients("Hancock", chunk_size=1))
+        self.assertEqual(len(chunks), 1, "the trigram candidates should fit in one chunk")
+        self.assertEqual([patient.name for patient in chunks[0]], ["Joe Hancock"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+# record_cache_test.py
+
+import os
+import unittest
+from clinic.dao.note_dao_pickle import NoteDAOPickle
+from clinic.dao.record_cache import RecordCache
+
+class TestRecordCache(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a small cache and two file-backed note DAOs before each test.
+        """
+        self.cache = RecordCache(max_bytes=20)
+        self.phns = [9990000001, 9990000002]
+        self.daos = []
+        for phn in self.phns:
+            note_dao = NoteDAOPickle(phn, True)
+            note_dao.cache = self.cache
+            self.daos.append(note_dao)
+
+    def tearDown(self):
+        for phn in self.phns:
+            filepath = f'clinic/records/{phn}.dat'
+            if os.path.exists(filepath):
+                os.remove(filepath)
+
+    def test_notes_load_lazily(self):
+        """
+        Test that notes are only hydrated on first access.
+        """
+        self.assertFalse(self.daos[0].is_hydrated(), "notes should not be loaded on creation")
+        self.daos[0].list_notes()
+        self.assertTrue(self.daos[0].is_hydrated(), "notes should be loaded after first access")
+        self.assertEqual(self.cache.misses, 1, "first access is a cache miss")
+        self.daos[0].list_notes()
+        self.assertEqual(self.cache.hits, 1, "second access is a cache hit")
+
+    def test_one_count_per_operation(self):
+        """
+        Test that an operation reading the notes several times counts a single hit or miss.
+        """
+        self.daos[0].create_note("kept")
+        note = self.daos[0].create_note("deleted")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.daos[0].delete_note(note.code)
+        self.daos[0].recent_notes(1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (3, 1))
+
+    def test_evicts_least_recently_used(self):
+        """
+        Test that exceeding the memory budget evicts the least recently used record.
+        """
+        self.daos[0].create_note("0123456789")
+        self.daos[1].create_note("0123456789abcdef")
+        self.assertFalse(self.daos[0].is_hydrated(), "oldest record should be evicted")
+        self.assertTrue(self.daos[1].is_hydrated(), "newest record should stay hydrated")
+        self.assertEqual(self.cache.evictions, 1, "one eviction should be counted")
+        self.assertLessEqual(self.cache.current_bytes, self.cache.max_bytes)
+
+    def test_evicted_record_reloads_from_disk(self):
+        """
+        Test that an evicted record is reloaded with its notes and keeps unique codes.
+        """
+        first = self.daos[0].create_note("0123456789")
+        self.daos[1].create_note("0123456789abcdef")
+        self.assertEqual(self.daos[0].search_note(first.code), first, "evicted note should reload from disk")
+        second = self.daos[0].create_note("next")
+        self.assertEqual(second.code, first.code + 1, "codes should continue after rehydration")
+
+    def test_dirty_record_flushed_before_eviction(self):
+        """
+        Test that a dirty record is written to disk before it is evicted.
+        """
+        self.daos[0].create_note("kept")
+        self.daos[0].notes_in_memory()[0].text = "changed"
+        self.daos[0].dirty = True
+        self.cache.clear()
+        self.assertFalse(self.daos[0].dirty, "evicted record should have been flushed")
+        reloaded = NoteDAOPickle(self.phns[0], True)
+        self.assertEqual([note.text for note in reloaded.list_notes()], ["changed"])
+
+if __name__ == '__main__':
+    unittest.main()
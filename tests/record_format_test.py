@@ -0,0 +1,105 @@
+# record_format_test.py
+
+import io
+import os
+import pickle
+import unittest
+from clinic.dao.note_dao_pickle import NoteDAOPickle
+from clinic.dao.record_format import MAGIC, FORMAT_JSONL, iter_notes, read_record, write_record
+from clinic.dao.record_migration import migrate_records
+from clinic.note import Note
+
+class TestRecordFormat(unittest.TestCase):
+
+    def setUp(self):
+        self.data = {'notes': [Note(1, "Patient reports mild headache. " * 10), Note(2, "Follow up in two weeks.")]}
+        self.phn = 9990000101
+
+    def tearDown(self):
+        filepath = f'clinic/records/{self.phn}.dat'
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+    def test_round_trip(self):
+        """
+        Test that every compression mode reads back the same notes.
+        """
+        for mode in (None, 'none', 'zlib', 'lzma'):
+            buffer = io.BytesIO()
+            write_record(buffer, self.data, mode)
+            self.assertTrue(buffer.getvalue().startswith(MAGIC + bytes([FORMAT_JSONL])), f"header for {mode}")
+            self.assertEqual(read_record(io.BytesIO(buffer.getvalue()))['notes'], self.data['notes'], f"round trip for {mode}")
+
+    def test_compression_shrinks_file(self):
+        """
+        Test that compressed records are smaller than uncompressed ones for repetitive text.
+        """
+        plain, compressed = io.BytesIO(), io.BytesIO()
+        write_record(plain, self.data)
+        write_record(compressed, self.data, 'zlib')
+        self.assertLess(len(compressed.getvalue()), len(plain.getvalue()))
+
+    def test_legacy_file_loads_and_is_rewritten_compressed(self):
+        """
+        Test that a note DAO reads an old plain pickle file and saves it compressed.
+        """
+        os.makedirs('clinic/records', exist_ok=True)
+        with open(f'clinic/records/{self.phn}.dat', 'wb') as f:
+            pickle.dump(self.data, f)
+        note_dao = NoteDAOPickle(self.phn, True)
+        note_dao.compression = 'zlib'
+        self.assertEqual(note_dao.list_notes(), list(reversed(self.data['notes'])))
+        note_dao.create_note("New note.")
+        with open(f'clinic/records/{self.phn}.dat', 'rb') as f:
+            self.assertTrue(f.read().startswith(MAGIC), "saved file should have a header")
+        self.assertEqual(len(NoteDAOPickle(self.phn, True).list_notes()), 3)
+
+    def test_timestamps_and_revisions_survive(self):
+        """
+        Test that timestamps and revision history are kept by the JSON-lines format.
+        """
+        note = self.data['notes'][1]
+        note.update_details("Follow up in three weeks.")
+        buffer = io.BytesIO()
+        write_record(buffer, self.data, 'zlib')
+        restored = read_record(io.BytesIO(buffer.getvalue()))['notes'][1]
+        self.assertEqual(restored.timestamp, note.timestamp)
+        self.assertEqual(restored.history(), note.history())
+
+    def test_streaming_decoder(self):
+        """
+        Test that notes can be consumed one at a time without reading the whole record.
+        """
+        buffer = io.BytesIO()
+        write_record(buffer, {'notes': [Note(code, f"Note {code}") for code in range(1, 3001)]}, 'zlib')
+        notes = iter_notes(io.BytesIO(buffer.getvalue()))
+        self.assertEqual(next(notes).text, "Note 1")
+        self.assertEqual(sum(1 for _ in notes), 2999)
+
+    def test_pickle_can_be_refused(self):
+        """
+        Test that loading pickle files can be disabled for untrusted records.
+        """
+        with self.assertRaises(ValueError):
+            read_record(io.BytesIO(pickle.dumps(self.data)), allow_pickle=False)
+
+    def test_migration(self):
+        """
+        Test that the migration tool rewrites pickle files once and keeps their notes.
+        """
+        directory = f'clinic/records/migration_{self.phn}'
+        os.makedirs(directory, exist_ok=True)
+        filepath = os.path.join(directory, f'{self.phn}.dat')
+        try:
+            with open(filepath, 'wb') as f:
+                pickle.dump(self.data, f)
+            self.assertEqual(migrate_records(directory), (1, 0))
+            self.assertEqual(migrate_records(directory), (0, 1))
+            with open(filepath, 'rb') as f:
+                self.assertEqual(read_record(f, allow_pickle=False)['notes'], self.data['notes'])
+        finally:
+            os.remove(filepath)
+            os.rmdir(directory)
+
+if __name__ == '__main__':
+    unittest.main()
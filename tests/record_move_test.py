@@ -0,0 +1,72 @@
+# record_move_test.py
+
+import json
+import os
+import unittest
+from clinic.controller import Controller
+from clinic.dao import PatientDAOJSON, NoteDAOPickle
+from clinic.dao.patient_dao_json import REKEY_JOURNAL
+
+class TestRecordMove(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a Controller without persistence and remember the record files the test may create.
+        """
+        self.controller = Controller(autosave=False)
+        self.controller.patient_dao = PatientDAOJSON(False)
+        for phn in list(self.controller.patient_dao.patients):
+            self.controller.patient_dao.delete_patient(phn)
+        self.controller.login("user", "123456")
+        self.old_phn, self.new_phn = 9990000201, 9990000202
+        os.makedirs('clinic/records', exist_ok=True)
+
+    def tearDown(self):
+        for path in (f'clinic/records/{self.old_phn}.dat', f'clinic/records/{self.new_phn}.dat', REKEY_JOURNAL):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_note_file_is_renamed(self):
+        """
+        Test that re-keying a record renames its file and later saves go to the new file.
+        """
+        note_dao = NoteDAOPickle(self.old_phn, True)
+        note_dao.create_note("Patient reports mild headache.")
+        note_dao.rekey(self.new_phn)
+        self.assertFalse(os.path.exists(f'clinic/records/{self.old_phn}.dat'))
+        self.assertTrue(os.path.exists(f'clinic/records/{self.new_phn}.dat'))
+        note_dao.create_note("Follow up in two weeks.")
+        self.assertEqual(len(NoteDAOPickle(self.new_phn, True).list_notes()), 2)
+
+    def test_phn_change_moves_record(self):
+        """
+        Test that changing a PHN through the controller moves the record and its note index entries.
+        """
+        self.controller.create_patient(self.old_phn, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        self.controller.set_current_patient(self.old_phn)
+        note = self.controller.create_note("Patient reports mild headache.")
+        self.controller.retrieve_clinic_notes_by_timestamp()  # Build the clinic-wide index
+        self.controller.unset_current_patient()
+        self.controller.update_patient(self.old_phn, self.new_phn, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+
+        record = self.controller.search_patient(self.new_phn).get_patient_record()
+        self.assertEqual(record.phn, self.new_phn)
+        self.assertEqual(record.note_dao.filepath, f'clinic/records/{self.new_phn}.dat')
+        results = self.controller.retrieve_clinic_notes_by_timestamp()
+        self.assertEqual([(patient.phn, found.code) for patient, found in results], [(self.new_phn, note.code)])
+
+    def test_interrupted_move_is_undone(self):
+        """
+        Test that a move whose patients.json was never saved is undone on recovery.
+        """
+        with open(f'clinic/records/{self.new_phn}.dat', 'wb') as f:
+            f.write(b'notes')
+        with open(REKEY_JOURNAL, 'w') as journal:
+            json.dump({"old": self.old_phn, "new": self.new_phn}, journal)
+        self.controller.patient_dao.recover_record_move()
+        self.assertTrue(os.path.exists(f'clinic/records/{self.old_phn}.dat'))
+        self.assertFalse(os.path.exists(f'clinic/records/{self.new_phn}.dat'))
+        self.assertFalse(os.path.exists(REKEY_JOURNAL))
+
+if __name__ == '__main__':
+    unittest.main()
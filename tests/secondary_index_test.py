@@ -0,0 +1,61 @@
+# secondary_index_test.py
+
+import unittest
+from clinic.controller import Controller
+from clinic.dao.secondary_index import HashIndex, SortedIndex, normalize_phone, normalize_email, normalize_birth_date
+
+class TestSecondaryIndex(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a Controller without persistence and a few patients before each test.
+        """
+        self.controller = Controller(autosave=False)
+        dao = self.controller.patient_dao
+        dao.patients = {}
+        dao.phone_index = HashIndex(normalize_phone)
+        dao.email_index = HashIndex(normalize_email)
+        dao.birth_date_index = SortedIndex(normalize_birth_date)
+        self.controller.login("user", "123456")
+        self.controller.create_patient(9790012000, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        self.controller.create_patient(9790014444, "Mary Doe", "1995-07-01", "250 203 2020", "mary.doe@gmail.com", "300 Moss St, Victoria")
+        self.controller.create_patient(9792225555, "Joe Hancock", "1990-01-15", "278 456 7890", "john.hancock@outlook.com", "5000 Douglas St, Saanich")
+
+    def test_search_by_phone(self):
+        """
+        Test that phone lookups ignore formatting.
+        """
+        patients = self.controller.search_patients_by_phone("(250) 203-2020")
+        self.assertEqual([patient.name for patient in patients], ["Mary Doe"])
+        self.assertEqual(self.controller.search_patients_by_phone("000"), [])
+
+    def test_search_by_email(self):
+        """
+        Test that email lookups are case-insensitive.
+        """
+        patients = self.controller.search_patients_by_email(" John.Hancock@Outlook.com")
+        self.assertEqual([patient.name for patient in patients], ["Joe Hancock"])
+
+    def test_birth_date_range(self):
+        """
+        Test inclusive and open-ended birth date ranges.
+        """
+        patients = self.controller.retrieve_patients_by_birth_date("1990-01-15", "1995-07-01")
+        self.assertEqual([patient.name for patient in patients], ["Joe Hancock", "Mary Doe"])
+        patients = self.controller.retrieve_patients_by_birth_date(start="1996-01-01")
+        self.assertEqual([patient.name for patient in patients], ["John Doe"])
+
+    def test_indexes_follow_updates_and_deletes(self):
+        """
+        Test that the indexes are maintained when patients are updated and deleted.
+        """
+        self.controller.update_patient(9790012000, 9790019999, "John Doe", "1985-05-05", "250 999 0000", "jd@example.org", "300 Moss St, Victoria")
+        self.assertEqual(self.controller.search_patients_by_phone("250 203 1010"), [])
+        self.assertEqual([patient.phn for patient in self.controller.search_patients_by_email("jd@example.org")], [9790019999])
+        patients = self.controller.retrieve_patients_by_birth_date("1980-01-01", "1989-12-31")
+        self.assertEqual([patient.phn for patient in patients], [9790019999])
+        self.controller.delete_patient(9790019999)
+        self.assertEqual(self.controller.search_patients_by_email("jd@example.org"), [])
+
+if __name__ == '__main__':
+    unittest.main()
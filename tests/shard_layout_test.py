@@ -0,0 +1,93 @@
+# shard_layout_test.py
+
+import os
+import tempfile
+import unittest
+from clinic.dao import PatientDAOJSON
+from clinic.dao.shard_layout import ShardLayout, rebalance
+from clinic.patient import Patient
+
+class TestShardLayout(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Run each test in an empty working directory, since storage paths are relative to it.
+        """
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        os.makedirs('clinic')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def create_patients(self, dao, phns):
+        for phn in phns:
+            patient = Patient(phn, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria", autosave=True)
+            dao.create_patient(patient)
+            patient.create_note(f"Note for {phn}")
+
+    def test_paths(self):
+        """
+        Test that one shard keeps the original layout and more shards split it by PHN.
+        """
+        self.assertEqual(ShardLayout().record_path(9790012000), 'clinic/records/9790012000.dat')
+        self.assertEqual(ShardLayout().patients_path(0), 'clinic/patients.json')
+        layout = ShardLayout(4)
+        self.assertEqual(layout.shard_of(9790012001), 1)
+        self.assertEqual(layout.record_path(9790012001), 'clinic/records/4/001/9790012001.dat')
+        self.assertEqual(layout.log_path(3), 'clinic/patients/4/003.log')
+
+    def test_sharded_storage(self):
+        """
+        Test that a change only touches its shard and loading reads every shard.
+        """
+        ShardLayout(4).save()
+        dao = PatientDAOJSON(True)
+        self.create_patients(dao, range(9790000000, 9790000008))
+        self.assertEqual(dao.shard_log_entries, {0: 2, 1: 2, 2: 2, 3: 2})
+        dao.compact()
+        dao.delete_patient(9790000002)
+        self.assertEqual(sorted(os.listdir('clinic/patients/4')), ['000.json', '001.json', '002.json', '002.log', '003.json'])
+        self.assertEqual(dao.shard_log_entries, {2: 1})
+        self.assertTrue(os.path.exists('clinic/records/4/001/9790000001.dat'))
+
+        reloaded = PatientDAOJSON(True)
+        self.assertEqual(sorted(reloaded.patients), [phn for phn in range(9790000000, 9790000008) if phn != 9790000002])
+        self.assertEqual(reloaded.search_patient(9790000005).list_notes()[0].text, "Note for 9790000005")
+
+    def test_phn_change_across_shards(self):
+        """
+        Test that moving a patient to a PHN in another shard survives a reload.
+        """
+        ShardLayout(4).save()
+        dao = PatientDAOJSON(True)
+        self.create_patients(dao, [9790000001])
+        patient = dao.search_patient(9790000001)
+        patient.phn = 9790000002
+        dao.update_patient(9790000001, patient)
+        reloaded = PatientDAOJSON(True)
+        self.assertEqual(list(reloaded.patients), [9790000002])
+        self.assertEqual(reloaded.search_patient(9790000002).list_notes()[0].text, "Note for 9790000001")
+
+    def test_rebalance(self):
+        """
+        Test that rebalancing moves patients and notes to the new layout and back.
+        """
+        self.create_patients(PatientDAOJSON(True), range(9790000000, 9790000006))
+        result = rebalance(3)
+        self.assertEqual((result["from"], result["to"], result["records"]), (1, 3, 6))
+        self.assertFalse(os.path.exists('clinic/patients.json'))
+        self.assertEqual(ShardLayout.load().shards, 3)
+        dao = PatientDAOJSON(True)
+        self.assertEqual(len(dao.patients), 6)
+        self.assertEqual(dao.search_patient(9790000004).list_notes()[0].text, "Note for 9790000004")
+
+        rebalance(1)
+        self.assertEqual(sorted(os.listdir('clinic/records')), [f'{phn}.dat' for phn in range(9790000000, 9790000006)])
+        self.assertFalse(os.path.exists('clinic/patients'))
+        self.assertEqual(len(PatientDAOJSON(True).patients), 6)
+
+if __name__ == '__main__':
+    unittest.main()
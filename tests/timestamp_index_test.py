@@ -0,0 +1,80 @@
+# timestamp_index_test.py
+
+import unittest
+from datetime import datetime, timedelta
+from clinic.controller import Controller
+from clinic.dao import PatientDAOJSON
+from clinic.dao.timestamp_index import TimestampIndex
+
+class TestTimestampIndex(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a Controller without persistence, two patients and dated notes before each test.
+        """
+        self.controller = Controller(autosave=False)
+        self.controller.patient_dao = PatientDAOJSON(False)
+        for phn in list(self.controller.patient_dao.patients):
+            self.controller.patient_dao.delete_patient(phn)
+        self.controller.login("user", "123456")
+        self.controller.create_patient(9790012000, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        self.controller.create_patient(9790014444, "Mary Doe", "1995-07-01", "250 203 2020", "mary.doe@gmail.com", "300 Moss St, Victoria")
+        self.now = datetime(2026, 10, 19, 12, 0)
+        self.controller.set_current_patient(9790012000)
+        for days_ago in (40, 20, 10, 0):
+            note = self.controller.create_note(f"note from {days_ago} days ago")
+            note.timestamp = self.now - timedelta(days=days_ago)
+
+    def test_range_query(self):
+        """
+        Test retrieving the current patient's notes from the last 30 days.
+        """
+        notes = self.controller.retrieve_notes_by_timestamp(self.now - timedelta(days=30), self.now)
+        self.assertEqual([note.text for note in notes], ["note from 0 days ago", "note from 10 days ago", "note from 20 days ago"])
+
+    def test_recent_notes(self):
+        """
+        Test retrieving the most recent notes, including after an update refreshes a timestamp.
+        """
+        self.assertEqual([note.code for note in self.controller.recent_notes(2)], [4, 3])
+        self.controller.update_note(1, "updated oldest note")
+        self.assertEqual([note.code for note in self.controller.recent_notes(2)], [1, 4])
+        self.controller.delete_note(1)
+        self.assertEqual([note.code for note in self.controller.recent_notes(2)], [4, 3])
+
+    def test_clinic_wide_query(self):
+        """
+        Test retrieving notes written by the whole clinic within a time range.
+        """
+        today = self.now.replace(hour=0)
+        results = self.controller.retrieve_clinic_notes_by_timestamp(today, None)
+        self.assertEqual([(patient.phn, note.code) for patient, note in results], [(9790012000, 4)])
+        self.controller.set_current_patient(9790014444)
+        self.controller.create_note("written later today")
+        results = self.controller.retrieve_clinic_notes_by_timestamp(today, None)
+        self.assertEqual([patient.phn for patient, note in results], [9790014444, 9790012000])
+
+    def test_clinic_wide_query_after_phn_change(self):
+        """
+        Test that clinic-wide results follow a patient to a new PHN, and see updated notes.
+        """
+        today = self.now.replace(hour=0)
+        self.controller.retrieve_clinic_notes_by_timestamp(today, None)
+        self.controller.unset_current_patient()
+        self.controller.update_patient(9790012000, 9790012001, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        self.controller.set_current_patient(9790012001)
+        self.controller.update_note(3, "updated note")
+        results = self.controller.retrieve_clinic_notes_by_timestamp(today, None)
+        self.assertEqual([(patient.phn, note.code, note.text) for patient, note in results],
+                         [(9790012001, 3, "updated note"), (9790012001, 4, "note from 0 days ago")])
+
+    def test_inclusive_bounds(self):
+        """
+        Test that both range bounds are inclusive.
+        """
+        index = TimestampIndex([(self.now, 1), (self.now, 2), (self.now + timedelta(seconds=1), 3)])
+        self.assertEqual(index.range(self.now, self.now), [2, 1])
+        self.assertEqual(index.latest(1), [3])
+
+if __name__ == '__main__':
+    unittest.main()
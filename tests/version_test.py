@@ -0,0 +1,98 @@
+# version_test.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from clinic.controller import Controller
+from clinic.dao.credential_store import USERS_FILE
+from clinic.exception import VersionConflictException
+
+class TestVersion(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up two sessions over one persisting store holding a patient with a note.
+        """
+        self.clear_persistence()
+        # Logins may upgrade stored hashes, so they use a copy of the credentials
+        self.users = tempfile.TemporaryDirectory()
+        self.users_file = os.path.join(self.users.name, 'users.txt')
+        shutil.copy(USERS_FILE, self.users_file)
+        self.controller = Controller(autosave=True, users_file=self.users_file)
+        self.controller.login("user", "123456")
+        self.other = self.controller.new_session()
+        self.other.login("user", "123456")
+        self.patient = self.controller.create_patient(9790012000, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        self.controller.set_current_patient(9790012000)
+        self.note = self.controller.create_note("Patient reports mild headache.")
+        self.controller.unset_current_patient()
+
+    def tearDown(self):
+        self.clear_persistence()
+        self.users.cleanup()
+
+    def clear_persistence(self):
+        for path in ('clinic/patients.json', 'clinic/patients.log'):
+            if os.path.exists(path):
+                os.remove(path)
+        for path in ('clinic/records', 'clinic/backups'):
+            if os.path.exists(path):
+                shutil.rmtree(path)
+
+    def reopen(self):
+        controller = Controller(autosave=True, users_file=self.users_file)
+        controller.login("user", "123456")
+        return controller
+
+    def test_patient_conflict(self):
+        """
+        Test that an update based on an outdated version fails and leaves the patient unchanged.
+        """
+        version = self.controller.search_patient(9790012000).version
+        self.other.update_patient(9790012000, 9790012000, "John Doe", "2000-10-10", "250 999 9999", "john.doe@gmail.com", "300 Moss St, Victoria",
+                                  expected_version=version)
+        with self.assertRaises(VersionConflictException):
+            self.controller.update_patient(9790012000, 9790012000, "John Smith", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria",
+                                           expected_version=version)
+        with self.assertRaises(VersionConflictException):
+            self.controller.delete_patient(9790012000, expected_version=version)
+
+        patient = self.reopen().search_patient(9790012000)
+        self.assertEqual((patient.name, patient.phone, patient.version), ("John Doe", "250 999 9999", version + 1))
+
+    def test_note_conflict(self):
+        """
+        Test that a note update based on an outdated version fails and versions survive a reload.
+        """
+        self.controller.set_current_patient(9790012000)
+        self.other.set_current_patient(9790012000)
+        self.other.update_note(self.note.code, "Patient reports severe headache.", expected_version=1)
+        with self.assertRaises(VersionConflictException):
+            self.controller.update_note(self.note.code, "Patient reports no headache.", expected_version=1)
+        with self.assertRaises(VersionConflictException):
+            self.controller.delete_note(self.note.code, expected_version=1)
+        self.assertTrue(self.controller.update_note(self.note.code, "Patient reports no headache.", expected_version=2))
+
+        controller = self.reopen()
+        controller.set_current_patient(9790012000)
+        note = controller.search_note(self.note.code)
+        self.assertEqual((note.text, note.version), ("Patient reports no headache.", 3))
+
+    def test_unchecked_update_still_versions(self):
+        """
+        Test that updates without an expected version still move the version forward,
+        and that a rolled back batch restores it.
+        """
+        self.controller.update_patient(9790012000, 9790012000, "John Smith", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria")
+        self.assertEqual(self.patient.version, 2)
+        with self.assertRaises(VersionConflictException):
+            with self.controller.batch():
+                self.controller.update_patient(9790012000, 9790012000, "John Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria",
+                                               expected_version=2)
+                self.controller.update_patient(9790012000, 9790012000, "Johnny Doe", "2000-10-10", "250 203 1010", "john.doe@gmail.com", "300 Moss St, Victoria",
+                                               expected_version=2)
+        self.assertEqual((self.patient.name, self.patient.version), ("John Smith", 2))
+
+if __name__ == '__main__':
+    unittest.main()